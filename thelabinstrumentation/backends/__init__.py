@@ -1,8 +1,13 @@
-from .base import MetricData, MetricsBackend
-from .factory import get_backend
+from .base import AsyncMetricsBackend, HistogramData, MetricData, MetricsBackend
+from .factory import get_async_backend, get_backend
+from .histogram import Histogram
 
 __all__ = (
+    "AsyncMetricsBackend",
+    "Histogram",
+    "HistogramData",
     "MetricData",
     "MetricsBackend",
+    "get_async_backend",
     "get_backend",
 )
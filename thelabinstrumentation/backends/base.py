@@ -5,6 +5,7 @@ from datetime import datetime
 from typing import TYPE_CHECKING, NotRequired, TypedDict
 
 from ..conf import config
+from .histogram import Histogram
 
 if TYPE_CHECKING:
     from mypy_boto3_cloudwatch.literals import StandardUnitType
@@ -20,7 +21,64 @@ class MetricData(TypedDict):
     timestamp: NotRequired[datetime]
 
 
-class MetricsBackend(ABC):
+class HistogramData(TypedDict):
+    """Type definition for a distribution metric."""
+
+    name: str
+    histogram: Histogram
+    unit: NotRequired[StandardUnitType]
+    dimensions: NotRequired[dict[str, str]]
+    timestamp: NotRequired[datetime]
+
+
+def summarize_histogram(data: HistogramData) -> list[MetricData]:
+    """Flatten a histogram into scalar count, min, max and percentile metrics.
+
+    Used by backends which have no native representation for distributions.
+    """
+    histogram = data["histogram"]
+    if not histogram.count:
+        return []
+    stats = {"min": histogram.min, "max": histogram.max} | histogram.percentiles()
+    base: MetricData = {"name": data["name"], "value": float(histogram.count)}
+    if "dimensions" in data:
+        base["dimensions"] = data["dimensions"]
+    if "timestamp" in data:
+        base["timestamp"] = data["timestamp"]
+    metrics: list[MetricData] = [
+        base | {"name": f"{data['name']}.count", "unit": "Count"}
+    ]
+    for stat, value in stats.items():
+        metric: MetricData = base | {"name": f"{data['name']}.{stat}", "value": value}
+        if "unit" in data:
+            metric["unit"] = data["unit"]
+        metrics.append(metric)
+    return metrics
+
+
+def describe_histogram(histogram: Histogram) -> dict[str, float]:
+    """Summary statistics of a histogram, for log-style backends."""
+    return {
+        "count": histogram.count,
+        "sum": histogram.sum,
+        "min": histogram.min,
+        "max": histogram.max,
+    } | histogram.percentiles()
+
+
+class _BaseMetricsBackend:
+    def close(self) -> None:
+        """Release any resources (threads, clients, files) held by the backend."""
+
+    def _get_all_dimensions(
+        self, dimensions: dict[str, str] | None = None
+    ) -> dict[str, str]:
+        if dimensions:
+            return {**config.snapshot.dimensions, **dimensions}
+        return dict(config.snapshot.dimensions)
+
+
+class MetricsBackend(_BaseMetricsBackend, ABC):
     """Abstract base class for metrics backends."""
 
     def send_metric(self, metric: MetricData) -> None:
@@ -29,9 +87,30 @@ class MetricsBackend(ABC):
     @abstractmethod
     def send_metrics(self, metrics: list[MetricData]) -> None:
         """Send a batch of metrics."""
-        pass
 
-    def _get_all_dimensions(
-        self, dimensions: dict[str, str] | None = None
-    ) -> dict[str, str]:
-        return config.dimensions | (dimensions or {})
+    def send_histograms(self, histograms: list[HistogramData]) -> None:
+        """Send a batch of distribution metrics.
+
+        Backends with a native distribution type should override this; the
+        default publishes summary statistics through ``send_metrics``.
+        """
+        metrics = [m for data in histograms for m in summarize_histogram(data)]
+        if metrics:
+            self.send_metrics(metrics)
+
+
+class AsyncMetricsBackend(_BaseMetricsBackend, ABC):
+    """Abstract base class for asyncio-native metrics backends."""
+
+    async def send_metric(self, metric: MetricData) -> None:
+        await self.send_metrics([metric])
+
+    @abstractmethod
+    async def send_metrics(self, metrics: list[MetricData]) -> None:
+        """Send a batch of metrics without blocking the event loop."""
+
+    async def send_histograms(self, histograms: list[HistogramData]) -> None:
+        """Send a batch of distribution metrics without blocking the event loop."""
+        metrics = [m for data in histograms for m in summarize_histogram(data)]
+        if metrics:
+            await self.send_metrics(metrics)
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Any, Literal, cast
+from weakref import WeakSet
+import atexit
+import logging
+import os
+import threading
+import time
+
+from .base import HistogramData, MetricData, MetricsBackend
+from .factory import build_backend
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_BACKEND = "thelabinstrumentation.backends.logging.LoggingBackend"
+
+OverflowPolicy = Literal["drop-oldest", "drop-newest", "block"]
+
+_OVERFLOW_POLICIES: tuple[OverflowPolicy, ...] = ("drop-oldest", "drop-newest", "block")
+
+# Live instances, reset in the child after a fork.
+_instances: WeakSet[BufferedBackend] = WeakSet()
+
+
+class BufferedBackend(MetricsBackend):
+    """Non-blocking wrapper which publishes metrics from a background thread.
+
+    ``send_metrics`` only appends to a bounded in-memory buffer. A daemon
+    thread drains the buffer into the wrapped backend whenever it holds
+    ``flush_size`` datapoints, or every ``flush_interval`` seconds, whichever
+    comes first. When the buffer is full, ``overflow`` decides whether to drop
+    the oldest datapoints, drop the new ones, or block the caller until the
+    flusher catches up. Dropped datapoints are counted in ``dropped``.
+
+    In a forked child the buffer starts out empty (the parent still sends
+    what it had buffered) and the flusher restarts on the next send.
+    """
+
+    def __init__(
+        self,
+        backend: str | MetricsBackend = _DEFAULT_BACKEND,
+        options: dict[str, Any] | None = None,
+        max_size: int = 10_000,
+        flush_size: int = 1_000,
+        flush_interval: float = 10.0,
+        overflow: OverflowPolicy = "drop-oldest",
+        **kwargs: Any,
+    ) -> None:
+        if overflow not in _OVERFLOW_POLICIES:
+            raise ValueError(
+                f"overflow must be one of {_OVERFLOW_POLICIES}, not {overflow!r}"
+            )
+        # Wrapped backends built from a class path are owned, and closed, by
+        # this backend.
+        self._owns_backend = not isinstance(backend, MetricsBackend)
+        if isinstance(backend, MetricsBackend):
+            self.backend = backend
+        else:
+            self.backend = build_backend(backend, options or {})
+        self.max_size = max_size
+        self.flush_size = min(flush_size, max_size)
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.dropped = 0
+        # ``deque.append`` and ``deque.popleft`` are atomic, so the hot path
+        # only takes a lock when the buffer is full.
+        self._buffer: deque[MetricData | HistogramData] = deque()
+        self._thread: threading.Thread | None = None
+        self._init_sync()
+        _instances.add(self)
+
+    def _init_sync(self) -> None:
+        self._overflow_lock = threading.Lock()
+        self._not_full = threading.Condition(self._overflow_lock)
+        self._flush_requested = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._stopping = False
+        self._thread_lock = threading.Lock()
+
+    def _after_fork(self) -> None:
+        # The flusher thread didn't survive the fork, and any lock may have
+        # been held by it. ``_thread`` is kept so the exit hook, which the
+        # child inherited, isn't registered twice.
+        self._buffer.clear()
+        self._init_sync()
+
+    def send_metrics(self, metrics: list[MetricData]) -> None:
+        self._enqueue(metrics)
+
+    def send_histograms(self, histograms: list[HistogramData]) -> None:
+        self._enqueue(histograms)
+
+    def _enqueue(self, items: list[MetricData] | list[HistogramData]) -> None:
+        self._ensure_flusher_running()
+        for item in items:
+            if len(self._buffer) >= self.max_size and not self._make_room():
+                continue
+            self._buffer.append(item)
+        if len(self._buffer) >= self.flush_size:
+            self._flush_requested.set()
+
+    def _make_room(self) -> bool:
+        """Apply the overflow policy to a full buffer.
+
+        Returns whether the new datapoint should be appended.
+        """
+        with self._overflow_lock:
+            if self.overflow == "block":
+                self._flush_requested.set()
+                while len(self._buffer) >= self.max_size and not self._stopping:
+                    self._not_full.wait(self.flush_interval)
+                return True
+            self.dropped += 1
+            if self.overflow == "drop-newest":
+                return False
+            try:
+                self._buffer.popleft()
+            except IndexError:
+                pass
+            return True
+
+    def flush(self) -> None:
+        """Synchronously send everything currently in the buffer."""
+        with self._flush_lock:
+            while self._buffer:
+                metrics: list[MetricData] = []
+                histograms: list[HistogramData] = []
+                try:
+                    while len(metrics) + len(histograms) < self.flush_size:
+                        item = self._buffer.popleft()
+                        if "histogram" in item:
+                            histograms.append(cast(HistogramData, item))
+                        else:
+                            metrics.append(item)
+                except IndexError:
+                    pass
+                with self._not_full:
+                    self._not_full.notify_all()
+                try:
+                    if metrics:
+                        self.backend.send_metrics(metrics)
+                    if histograms:
+                        self.backend.send_histograms(histograms)
+                except Exception:
+                    logger.exception("Error flushing buffered metrics")
+
+    def close(self, timeout: float | None = None) -> None:
+        """Stop the flusher thread and send any remaining metrics."""
+        self._stopping = True
+        self._flush_requested.set()
+        with self._not_full:
+            self._not_full.notify_all()
+        with self._thread_lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            atexit.unregister(self.close)
+            if thread is not threading.current_thread():
+                thread.join(timeout)
+        self.flush()
+        if self._owns_backend:
+            self.backend.close()
+
+    def _ensure_flusher_running(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            if self._thread is None:
+                atexit.register(self.close, timeout=self.flush_interval)
+            self._stopping = False
+            self._thread = threading.Thread(
+                target=self._run,
+                name="thelabinstrumentation-buffered-flush",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        last_flush = time.monotonic()
+        while not self._stopping:
+            timeout = max(0.0, last_flush + self.flush_interval - time.monotonic())
+            self._flush_requested.wait(timeout)
+            self._flush_requested.clear()
+            if self._stopping:
+                break
+            self.flush()
+            last_flush = time.monotonic()
+
+
+def _reset_instances_after_fork() -> None:
+    for backend in list(_instances):
+        backend._after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_instances_after_fork)
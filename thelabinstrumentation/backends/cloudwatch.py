@@ -1,12 +1,19 @@
 from __future__ import annotations
 
+from collections import Counter
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from typing import TYPE_CHECKING, Any
+import asyncio
+import json
 import logging
+import threading
 
 from botocore.exceptions import BotoCoreError, ClientError
 import boto3
 
-from .base import MetricData, MetricsBackend
+from .base import AsyncMetricsBackend, HistogramData, MetricData, MetricsBackend
 
 if TYPE_CHECKING:
     from mypy_boto3_cloudwatch import CloudWatchClient
@@ -14,26 +21,145 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# PutMetricData limits: https://docs.aws.amazon.com/AmazonCloudWatch/latest/APIReference/API_PutMetricData.html
+_MAX_DATUMS_PER_REQUEST = 1000
+_MAX_REQUEST_BYTES = 1_000_000
+# Headroom for the namespace, envelope, and protocol framing around the datums.
+_REQUEST_OVERHEAD_BYTES = 16_384
+# A single datum may carry at most this many distinct entries in ``Values``.
+_MAX_VALUES_PER_DATUM = 150
+
+_AggregationKey = tuple[str, str, tuple[tuple[str, str], ...], datetime | None]
+
+
+def _estimate_datum_size(datum: MetricDatumTypeDef) -> int:
+    """Conservatively estimate the serialized size of a single datum.
+
+    The wire protocol (CBOR or JSON) is never larger than the JSON encoding,
+    so this is a safe upper bound without paying for an actual serialization.
+    """
+    return len(json.dumps(datum, default=str)) + 1
+
+
+def _truncate_timestamp(timestamp: datetime, period: int) -> datetime:
+    """Round a timestamp down to the start of its aggregation period."""
+    return timestamp - timedelta(seconds=timestamp.timestamp() % period)
+
+
+def _aggregate_metric_data(
+    metric_data: list[MetricDatumTypeDef],
+    period: int,
+) -> list[MetricDatumTypeDef]:
+    """Fold datums sharing a name, dimensions, unit and period into one datum.
+
+    Groups with a single datapoint are passed through untouched. Larger groups
+    become a ``Values``/``Counts`` datum when they have few enough distinct
+    values (which preserves percentiles), and a ``StatisticValues`` datum
+    otherwise.
+    """
+    groups: dict[_AggregationKey, list[MetricDatumTypeDef]] = {}
+    for datum in metric_data:
+        timestamp = datum.get("Timestamp")
+        key: _AggregationKey = (
+            datum["MetricName"],
+            datum.get("Unit", "None"),
+            tuple(sorted((d["Name"], d["Value"]) for d in datum.get("Dimensions", []))),
+            (
+                _truncate_timestamp(timestamp, period)
+                if isinstance(timestamp, datetime)
+                else None
+            ),
+        )
+        groups.setdefault(key, []).append(datum)
+
+    aggregated: list[MetricDatumTypeDef] = []
+    for (_, _, _, bucket), datums in groups.items():
+        if len(datums) == 1:
+            aggregated.append(datums[0])
+            continue
+        first = datums[0]
+        folded: MetricDatumTypeDef = {
+            "MetricName": first["MetricName"],
+            "Unit": first.get("Unit", "None"),
+        }
+        if "Dimensions" in first:
+            folded["Dimensions"] = first["Dimensions"]
+        if bucket is not None:
+            folded["Timestamp"] = bucket
+        values = [d["Value"] for d in datums]
+        counts = Counter(values)
+        if len(counts) <= _MAX_VALUES_PER_DATUM:
+            folded["Values"] = list(counts.keys())
+            folded["Counts"] = [float(count) for count in counts.values()]
+        else:
+            folded["StatisticValues"] = {
+                "SampleCount": float(len(values)),
+                "Sum": sum(values),
+                "Minimum": min(values),
+                "Maximum": max(values),
+            }
+        aggregated.append(folded)
+    return aggregated
+
+
+def _chunk_metric_data(
+    metric_data: list[MetricDatumTypeDef],
+) -> Iterator[list[MetricDatumTypeDef]]:
+    """Split datums into chunks which respect the PutMetricData limits."""
+    max_bytes = _MAX_REQUEST_BYTES - _REQUEST_OVERHEAD_BYTES
+    chunk: list[MetricDatumTypeDef] = []
+    chunk_bytes = 0
+    for datum in metric_data:
+        size = _estimate_datum_size(datum)
+        if chunk and (
+            len(chunk) >= _MAX_DATUMS_PER_REQUEST or chunk_bytes + size > max_bytes
+        ):
+            yield chunk
+            chunk = []
+            chunk_bytes = 0
+        chunk.append(datum)
+        chunk_bytes += size
+    if chunk:
+        yield chunk
+
 
 class CloudWatchBackend(MetricsBackend):
-    """CloudWatch metrics backend implementation."""
+    """CloudWatch metrics backend implementation.
+
+    Datapoints which share a name, dimensions, unit and ``aggregation_period``
+    are folded into a single datum client-side (unless ``aggregate`` is
+    disabled). Batches larger than a single ``PutMetricData`` request allows
+    are split into chunks and published concurrently over a small, bounded
+    thread pool. All chunks share the backend's (thread-safe) boto3 client.
+    """
 
     client: CloudWatchClient
 
     def __init__(
         self,
         namespace: str,
+        max_workers: int = 4,
+        aggregate: bool = True,
+        aggregation_period: int = 60,
         **kwargs: Any,
     ) -> None:
         self.namespace = namespace
+        self.max_workers = max_workers
+        self.aggregate = aggregate
+        self.aggregation_period = aggregation_period
         self.client = boto3.client("cloudwatch", **kwargs)
+        self._executor: ThreadPoolExecutor | None = None
+        self._executor_lock = threading.Lock()
 
     def send_metrics(
         self,
         metrics: list[MetricData],
     ) -> None:
-        assert len(metrics) <= 1000  # TODO: autobatch this case.
-        cw_batch = []
+        self._send_chunked(self._build_metric_data(metrics))
+
+    def _build_metric_data(self, metrics: list[MetricData]) -> list[MetricDatumTypeDef]:
+        """Convert metrics into (aggregated) CloudWatch datums."""
+        cw_batch: list[MetricDatumTypeDef] = []
         for metric in metrics:
             datum: MetricDatumTypeDef = {
                 "MetricName": metric["name"],
@@ -49,7 +175,73 @@ class CloudWatchBackend(MetricsBackend):
                     {"Name": name, "Value": value} for name, value in dimensions.items()
                 ]
             cw_batch.append(datum)
-        self._send_batch(cw_batch)
+        if self.aggregate:
+            cw_batch = _aggregate_metric_data(cw_batch, self.aggregation_period)
+        return cw_batch
+
+    def send_histograms(self, histograms: list[HistogramData]) -> None:
+        """Publish each histogram natively as ``Values``/``Counts`` datums."""
+        self._send_chunked(self._build_histogram_data(histograms))
+
+    def _build_histogram_data(
+        self, histograms: list[HistogramData]
+    ) -> list[MetricDatumTypeDef]:
+        """Convert histograms into ``Values``/``Counts`` CloudWatch datums.
+
+        Histograms with more buckets than one datum can hold are spread over
+        several datums; CloudWatch merges them back into one distribution.
+        """
+        cw_batch: list[MetricDatumTypeDef] = []
+        for data in histograms:
+            buckets = list(data["histogram"].buckets())
+            dimensions = self._get_all_dimensions(data.get("dimensions"))
+            timestamp = data.get("timestamp")
+            for i in range(0, len(buckets), _MAX_VALUES_PER_DATUM):
+                values = buckets[i : i + _MAX_VALUES_PER_DATUM]
+                datum: MetricDatumTypeDef = {
+                    "MetricName": data["name"],
+                    "Values": [value for value, _ in values],
+                    "Counts": [float(count) for _, count in values],
+                    "Unit": data.get("unit") or "None",
+                }
+                if timestamp:
+                    datum["Timestamp"] = timestamp
+                if dimensions:
+                    datum["Dimensions"] = [
+                        {"Name": name, "Value": value}
+                        for name, value in dimensions.items()
+                    ]
+                cw_batch.append(datum)
+        return cw_batch
+
+    def _send_chunked(self, metric_data: list[MetricDatumTypeDef]) -> None:
+        """Send datums in as many requests as needed, in parallel."""
+        chunks = list(_chunk_metric_data(metric_data))
+        if len(chunks) <= 1 or self.max_workers <= 1:
+            # Avoid the thread hop for the common single-request case.
+            for chunk in chunks:
+                self._send_batch(chunk)
+            return
+        executor = self._get_executor()
+        # Consume the iterator so that we wait for every request to finish.
+        list(executor.map(self._send_batch, chunks))
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="cloudwatch-put-metric-data",
+                    )
+        return self._executor
+
+    def close(self) -> None:
+        """Shut down the request thread pool, waiting for pending requests."""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
 
     def _send_batch(self, metric_data: list[MetricDatumTypeDef]) -> None:
         """Send a batch of metrics to CloudWatch."""
@@ -69,5 +261,48 @@ class CloudWatchBackend(MetricsBackend):
             logger.error(f"CloudWatch ClientError [{error_code}]: {error_message}")
         except BotoCoreError as e:
             logger.error(f"CloudWatch BotoCoreError: {e}")
-        except Exception as e:
+        except Exception as e:  # noqa: BLE001 - publishing must never break callers
             logger.error(f"Unexpected error sending metrics to CloudWatch: {e}")
+
+
+class AsyncCloudWatchBackend(AsyncMetricsBackend):
+    """Asyncio CloudWatch metrics backend implementation.
+
+    boto3 has no asyncio transport, so each ``PutMetricData`` request runs on
+    the wrapped :class:`CloudWatchBackend`'s bounded thread pool and is
+    awaited from the event loop. Coroutines never block on the network and no
+    per-call ``sync_to_async`` thread is needed.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        **kwargs: Any,
+    ) -> None:
+        self.backend = CloudWatchBackend(namespace, **kwargs)
+
+    @property
+    def namespace(self) -> str:
+        return self.backend.namespace
+
+    def close(self) -> None:
+        self.backend.close()
+
+    async def send_metrics(self, metrics: list[MetricData]) -> None:
+        await self._send_chunked(self.backend._build_metric_data(metrics))
+
+    async def send_histograms(self, histograms: list[HistogramData]) -> None:
+        await self._send_chunked(self.backend._build_histogram_data(histograms))
+
+    async def _send_chunked(self, metric_data: list[MetricDatumTypeDef]) -> None:
+        chunks = list(_chunk_metric_data(metric_data))
+        if not chunks:
+            return
+        loop = asyncio.get_running_loop()
+        executor = self.backend._get_executor()
+        await asyncio.gather(
+            *(
+                loop.run_in_executor(executor, self.backend._send_batch, chunk)
+                for chunk in chunks
+            )
+        )
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from typing import IO, Any
+import json
+import sys
+import threading
+
+from django.utils import timezone
+
+from .base import MetricData, MetricsBackend
+
+# https://docs.aws.amazon.com/AmazonCloudWatch/latest/monitoring/CloudWatch_Embedded_Metric_Format_Specification.html
+_MAX_METRICS_PER_DOCUMENT = 100
+_MAX_VALUES_PER_METRIC = 100
+
+_STREAMS = ("stdout", "stderr")
+
+
+class _Document:
+    """A single EMF document under construction."""
+
+    def __init__(self, dimensions: dict[str, str], timestamp_ms: int) -> None:
+        self.dimensions = dimensions
+        self.timestamp_ms = timestamp_ms
+        self.units: dict[str, str] = {}
+        self.values: dict[str, list[float]] = {}
+
+    def can_add(self, name: str) -> bool:
+        if name in self.values:
+            return len(self.values[name]) < _MAX_VALUES_PER_METRIC
+        return len(self.values) < _MAX_METRICS_PER_DOCUMENT
+
+    def add(self, name: str, value: float, unit: str) -> None:
+        self.units.setdefault(name, unit)
+        self.values.setdefault(name, []).append(value)
+
+    def serialize(self, namespace: str) -> str:
+        doc: dict[str, Any] = {
+            "_aws": {
+                "Timestamp": self.timestamp_ms,
+                "CloudWatchMetrics": [
+                    {
+                        "Namespace": namespace,
+                        "Dimensions": [list(self.dimensions.keys())],
+                        "Metrics": [
+                            {"Name": name, "Unit": unit}
+                            for name, unit in self.units.items()
+                        ],
+                    }
+                ],
+            },
+        }
+        doc.update(self.dimensions)
+        for name, values in self.values.items():
+            doc[name] = values[0] if len(values) == 1 else values
+        return json.dumps(doc, separators=(",", ":"))
+
+
+class EMFBackend(MetricsBackend):
+    """CloudWatch Embedded Metric Format backend implementation.
+
+    Writes each batch as EMF JSON lines (one document per dimension set and
+    timestamp) to stdout, stderr, or a file. The CloudWatch agent or Lambda
+    runtime picks the lines up and publishes them asynchronously, so sending
+    metrics never makes a synchronous call to the CloudWatch API.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        stream: str = "stdout",
+        path: str | None = None,
+        **kwargs: Any,
+    ) -> None:
+        if path is None and stream not in _STREAMS:
+            raise ValueError(f"stream must be one of {_STREAMS}, not {stream!r}")
+        self.namespace = namespace
+        self.stream = stream
+        self.path = path
+        self._file: IO[str] | None = None
+        self._lock = threading.Lock()
+
+    def send_metrics(self, metrics: list[MetricData]) -> None:
+        if not metrics:
+            return
+        now_ms = int(timezone.now().timestamp() * 1000)
+        documents: dict[tuple[tuple[tuple[str, str], ...], int], list[_Document]] = {}
+        for metric in metrics:
+            dimensions = self._get_all_dimensions(metric.get("dimensions"))
+            timestamp = metric.get("timestamp")
+            timestamp_ms = int(timestamp.timestamp() * 1000) if timestamp else now_ms
+            key = (tuple(sorted(dimensions.items())), timestamp_ms)
+            docs = documents.setdefault(key, [])
+            name = metric["name"]
+            if not docs or not docs[-1].can_add(name):
+                docs.append(_Document(dimensions, timestamp_ms))
+            docs[-1].add(name, metric["value"], metric.get("unit") or "None")
+        lines = "".join(
+            doc.serialize(self.namespace) + "\n"
+            for docs in documents.values()
+            for doc in docs
+        )
+        with self._lock:
+            output = self._get_output()
+            output.write(lines)
+            output.flush()
+
+    def _get_output(self) -> IO[str]:
+        if self.path is None:
+            # Looked up on every write so that redirected streams are honoured.
+            return sys.stdout if self.stream == "stdout" else sys.stderr
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")  # noqa: SIM115
+        return self._file
+
+    def close(self) -> None:
+        """Close the output file, if one was opened."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -1,13 +1,165 @@
+from typing import Any
+import os
+import threading
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 from django.utils.module_loading import import_string
 
-from ..conf import config
-from .base import MetricsBackend
+from ..conf import DEFAULT_BACKEND_ALIAS, config
+from .base import AsyncMetricsBackend, MetricsBackend
+
+# Backend instances are built lazily and shared by every thread in the
+# process. The cache is discarded after a fork, so that children never reuse
+# clients (sockets, thread pools) inherited from their parent.
+_backends: dict[str, MetricsBackend] = {}
+_async_backend: AsyncMetricsBackend | None = None
+_cache_pid = os.getpid()
+_cache_lock = threading.Lock()
+
+# Async counterparts of the built-in backends, used when only BACKEND is set.
+_ASYNC_BACKENDS = {
+    "thelabinstrumentation.backends.cloudwatch.CloudWatchBackend": (
+        "thelabinstrumentation.backends.cloudwatch.AsyncCloudWatchBackend"
+    ),
+    "thelabinstrumentation.backends.logging.LoggingBackend": (
+        "thelabinstrumentation.backends.logging.AsyncLoggingBackend"
+    ),
+    "thelabinstrumentation.backends.prometheus.PrometheusBackend": (
+        "thelabinstrumentation.backends.prometheus.AsyncPrometheusBackend"
+    ),
+    "thelabinstrumentation.backends.statsd.StatsDBackend": (
+        "thelabinstrumentation.backends.statsd.AsyncStatsDBackend"
+    ),
+    "thelabinstrumentation.backends.structlog.StructlogBackend": (
+        "thelabinstrumentation.backends.structlog.AsyncStructlogBackend"
+    ),
+}
 
 
-def get_backend() -> MetricsBackend:
+def build_backend(backend_path: str, options: dict[str, Any]) -> MetricsBackend:
     """
-    Get the metrics backend instance based on configuration.
+    Construct a metrics backend from its class path and constructor options.
     """
-    backend_class: type[MetricsBackend] = import_string(config.backend)
+    backend_class: type[MetricsBackend] = import_string(backend_path)
     assert issubclass(backend_class, MetricsBackend)
-    return backend_class(**config.backend_options)
+    return backend_class(**options)
+
+
+def build_async_backend(
+    backend_path: str, options: dict[str, Any]
+) -> AsyncMetricsBackend:
+    """
+    Construct an async metrics backend from its class path and constructor options.
+    """
+    backend_class: type[AsyncMetricsBackend] = import_string(backend_path)
+    assert issubclass(backend_class, AsyncMetricsBackend)
+    return backend_class(**options)
+
+
+def get_backend(name: str = DEFAULT_BACKEND_ALIAS) -> MetricsBackend:
+    """
+    Get the shared metrics backend instance configured under ``name``.
+    """
+    _check_pid()
+    backend = _backends.get(name)
+    if backend is not None:
+        return backend
+    with _cache_lock:
+        backend = _backends.get(name)
+        if backend is None:
+            try:
+                backend_config = config.backends[name]
+            except KeyError:
+                raise ImproperlyConfigured(
+                    f"No metrics backend named {name!r} is configured"
+                ) from None
+            backend = build_backend(
+                backend_config.get("BACKEND", config.backend),
+                backend_config.get("OPTIONS") or {},
+            )
+            _backends[name] = backend
+    return backend
+
+
+def build_default_async_backend() -> AsyncMetricsBackend:
+    """
+    Construct the async counterpart of ``BACKEND``.
+
+    Built-in backends have an asyncio-native twin; any other backend is
+    wrapped in a :class:`~.threaded.ThreadedAsyncBackend`.
+    """
+    async_backend_path = _ASYNC_BACKENDS.get(config.backend)
+    if async_backend_path is not None:
+        return build_async_backend(async_backend_path, config.async_backend_options)
+    from .threaded import ThreadedAsyncBackend
+
+    return ThreadedAsyncBackend(config.backend, config.async_backend_options)
+
+
+def get_async_backend() -> AsyncMetricsBackend:
+    """
+    Get the shared async metrics backend instance based on configuration.
+
+    Without ``ASYNC_BACKEND``, the async counterpart of ``BACKEND`` is used.
+    """
+    global _async_backend
+    _check_pid()
+    backend = _async_backend
+    if backend is not None:
+        return backend
+    with _cache_lock:
+        if _async_backend is None:
+            if config.async_backend is None:
+                _async_backend = build_default_async_backend()
+            else:
+                _async_backend = build_async_backend(
+                    config.async_backend, config.async_backend_options
+                )
+        return _async_backend
+
+
+def reset_backends() -> None:
+    """
+    Close and discard cached backend instances, so they're rebuilt on next use.
+    """
+    for backend in _discard_backends():
+        backend.close()
+
+
+def _discard_backends() -> list[MetricsBackend | AsyncMetricsBackend]:
+    global _async_backend, _cache_pid
+    with _cache_lock:
+        dropped: list[MetricsBackend | AsyncMetricsBackend] = list(_backends.values())
+        if _async_backend is not None:
+            dropped.append(_async_backend)
+        _backends.clear()
+        _async_backend = None
+        _cache_pid = os.getpid()
+    return dropped
+
+
+def _check_pid() -> None:
+    # Instances inherited from the parent process are left alone (their
+    # threads didn't survive the fork, and closing them could flush the
+    # parent's buffered metrics a second time).
+    if _cache_pid != os.getpid():
+        _discard_backends()
+
+
+def _reset_backends_after_fork() -> None:
+    # Another thread may have held the lock when the parent forked.
+    global _cache_lock
+    _cache_lock = threading.Lock()
+    _discard_backends()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_backends_after_fork)
+
+
+@receiver(setting_changed)
+def _reset_backends_on_setting_changed(setting: str, **kwargs: Any) -> None:
+    if setting == "THELAB_INSTRUMENTATION":
+        reset_backends()
@@ -0,0 +1,203 @@
+"""Compact, mergeable histogram sketch for distribution metrics.
+
+:class:`Histogram` uses base-2 exponential buckets, the same layout as
+OpenTelemetry's exponential histogram. A value ``v`` lands in the bucket
+``(base**i, base**(i + 1)]`` where ``base = 2 ** (2 ** -scale)``, so every
+bucket spans the same *relative* range and quantile estimates carry a bounded
+relative error (about 0.14% at the default maximum scale of 8).
+
+Recording a value is O(1). Memory is bounded by ``max_buckets``: when the
+recorded range outgrows it, the sketch halves its resolution (decrements
+``scale``) by merging adjacent buckets pairwise. Two histograms can always be
+merged into one, which lets per-thread or per-process sketches be combined
+before publishing.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+import math
+
+# Percentiles reported by backends which can't publish a full distribution.
+DEFAULT_PERCENTILES: tuple[float, ...] = (50.0, 90.0, 99.0)
+
+_DEFAULT_MAX_SCALE = 8
+_DEFAULT_MAX_BUCKETS = 160
+
+
+class Histogram:
+    """Bounded-memory, mergeable sketch of a distribution of values.
+
+    Instances aren't thread-safe; guard them with a lock when they're shared.
+    """
+
+    def __init__(
+        self,
+        max_buckets: int = _DEFAULT_MAX_BUCKETS,
+        max_scale: int = _DEFAULT_MAX_SCALE,
+    ) -> None:
+        self.max_buckets = max_buckets
+        self.scale = max_scale
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.zero_count = 0
+        # Bucket index -> count, for positive values and (by absolute value)
+        # for negative values.
+        self._positive: dict[int, int] = {}
+        self._negative: dict[int, int] = {}
+        self._scale_factor = math.ldexp(1 / math.log(2), self.scale)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __repr__(self) -> str:
+        return (
+            f"<Histogram count={self.count} sum={self.sum} "
+            f"min={self.min} max={self.max} scale={self.scale}>"
+        )
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def record(self, value: float, count: int = 1) -> None:
+        """Record ``count`` occurrences of ``value``."""
+        if count <= 0 or not math.isfinite(value):
+            return
+        self.count += count
+        self.sum += value * count
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if value == 0:
+            self.zero_count += count
+            return
+        buckets = self._positive if value > 0 else self._negative
+        index = self._index(abs(value))
+        if index not in buckets:
+            index = self._make_room(index, buckets)
+            # Downscaling replaces the bucket dicts.
+            buckets = self._positive if value > 0 else self._negative
+        buckets[index] = buckets.get(index, 0) + count
+
+    def merge(self, other: Histogram) -> None:
+        """Fold another histogram's observations into this one."""
+        if other.count == 0:
+            return
+        if other.scale < self.scale:
+            self._downscale(self.scale - other.scale)
+        shift = other.scale - self.scale
+        for source, target in (
+            (other._positive, self._positive),
+            (other._negative, self._negative),
+        ):
+            for index, count in source.items():
+                index >>= shift
+                target[index] = target.get(index, 0) + count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.zero_count += other.zero_count
+        while self._span() > self.max_buckets:
+            self._downscale(1)
+
+    def copy(self) -> Histogram:
+        """Return an independent copy of this histogram."""
+        clone = Histogram(max_buckets=self.max_buckets, max_scale=self.scale)
+        clone.merge(self)
+        return clone
+
+    def quantile(self, q: float) -> float:
+        """Estimate the value at quantile ``q`` (between 0 and 1)."""
+        if not self.count:
+            return 0.0
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+        rank = q * (self.count - 1)
+        seen = 0
+        for value, count in self.buckets():
+            seen += count
+            if seen > rank:
+                return value
+        return self.max
+
+    def percentiles(
+        self, percentiles: tuple[float, ...] = DEFAULT_PERCENTILES
+    ) -> dict[str, float]:
+        """Estimate several percentiles, keyed as ``"p50"``, ``"p99.9"``, etc."""
+        return {f"p{p:g}": self.quantile(p / 100) for p in percentiles}
+
+    def buckets(self) -> Iterator[tuple[float, int]]:
+        """Yield ``(representative value, count)`` pairs in ascending order.
+
+        Each bucket is represented by its geometric midpoint, clamped to the
+        observed minimum and maximum.
+        """
+        for index in sorted(self._negative, reverse=True):
+            yield self._representative(index, -1), self._negative[index]
+        if self.zero_count:
+            yield 0.0, self.zero_count
+        for index in sorted(self._positive):
+            yield self._representative(index, 1), self._positive[index]
+
+    def dense_buckets(self, negative: bool = False) -> tuple[int, list[int]]:
+        """Return ``(offset, counts)`` for the positive or negative buckets.
+
+        ``counts[i]`` is the count of bucket index ``offset + i``, with empty
+        buckets in between filled with zeros: OpenTelemetry's layout.
+        """
+        buckets = self._negative if negative else self._positive
+        if not buckets:
+            return 0, []
+        offset = min(buckets)
+        return offset, [
+            buckets.get(index, 0) for index in range(offset, max(buckets) + 1)
+        ]
+
+    def _representative(self, index: int, sign: int) -> float:
+        midpoint = sign * math.pow(2, math.ldexp(index + 0.5, -self.scale))
+        return min(max(midpoint, self.min), self.max)
+
+    def _index(self, value: float) -> int:
+        return math.ceil(math.log(value) * self._scale_factor) - 1
+
+    def _span(self) -> int:
+        """Widest range of bucket indexes in use by either sign."""
+        span = 0
+        for buckets in (self._positive, self._negative):
+            if buckets:
+                span = max(span, max(buckets) - min(buckets) + 1)
+        return span
+
+    def _make_room(self, index: int, buckets: dict[int, int]) -> int:
+        """Downscale until ``index`` fits within ``max_buckets`` of ``buckets``.
+
+        Returns ``index`` translated to the (possibly new) scale.
+        """
+        if not buckets:
+            return index
+        low = min(min(buckets), index)
+        high = max(max(buckets), index)
+        change = 0
+        while high - low + 1 > self.max_buckets:
+            low >>= 1
+            high >>= 1
+            index >>= 1
+            change += 1
+        if change:
+            self._downscale(change)
+        return index
+
+    def _downscale(self, change: int) -> None:
+        for attr in ("_positive", "_negative"):
+            merged: dict[int, int] = {}
+            for index, count in getattr(self, attr).items():
+                index >>= change
+                merged[index] = merged.get(index, 0) + count
+            setattr(self, attr, merged)
+        self.scale -= change
+        self._scale_factor = math.ldexp(1 / math.log(2), self.scale)
@@ -6,25 +6,66 @@ import logging
 
 from django.utils import timezone
 
-from .base import MetricData, MetricsBackend
+from .base import (
+    AsyncMetricsBackend,
+    HistogramData,
+    MetricData,
+    MetricsBackend,
+    _BaseMetricsBackend,
+    describe_histogram,
+)
 
 logger = logging.getLogger(__name__)
 
 
-class LoggingBackend(MetricsBackend):
-    """Logging metrics backend implementation."""
-
+class _LoggingBackendMixin(_BaseMetricsBackend):
     def __init__(self, **kwargs: Any) -> None:
         pass
 
-    def send_metrics(
-        self,
-        metrics: list[MetricData],
-    ) -> None:
-        """Log a single metric."""
+    def _log_metrics(self, metrics: list[MetricData]) -> None:
         for metric in metrics:
             _metric = metric | {
                 "dimensions": self._get_all_dimensions(metric.get("dimensions")),
                 "timestamp": (metric.get("timestamp") or timezone.now()).isoformat(),
             }
             logger.info("SENDMETRIC: %s", json.dumps(_metric))
+
+    def _log_histograms(self, histograms: list[HistogramData]) -> None:
+        for data in histograms:
+            if not data["histogram"].count:
+                continue
+            _histogram = {
+                "name": data["name"],
+                "unit": data.get("unit"),
+                "dimensions": self._get_all_dimensions(data.get("dimensions")),
+                "timestamp": (data.get("timestamp") or timezone.now()).isoformat(),
+            } | describe_histogram(data["histogram"])
+            logger.info("SENDHISTOGRAM: %s", json.dumps(_histogram))
+
+
+class LoggingBackend(_LoggingBackendMixin, MetricsBackend):
+    """Logging metrics backend implementation."""
+
+    def send_metrics(
+        self,
+        metrics: list[MetricData],
+    ) -> None:
+        """Log a single metric."""
+        self._log_metrics(metrics)
+
+    def send_histograms(self, histograms: list[HistogramData]) -> None:
+        """Log the count, range and percentiles of each histogram."""
+        self._log_histograms(histograms)
+
+
+class AsyncLoggingBackend(_LoggingBackendMixin, AsyncMetricsBackend):
+    """Asyncio logging metrics backend implementation."""
+
+    async def send_metrics(
+        self,
+        metrics: list[MetricData],
+    ) -> None:
+        self._log_metrics(metrics)
+
+    async def send_histograms(self, histograms: list[HistogramData]) -> None:
+        self._log_histograms(histograms)
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any
+import logging
+import threading
+import time
+
+from ..conf import BackendConfigData
+from .base import HistogramData, MetricData, MetricsBackend
+from .factory import build_backend
+
+logger = logging.getLogger(__name__)
+
+
+class SinkConfigData(BackendConfigData, total=False):
+    TIMEOUT: float
+    MAX_PENDING: int
+
+
+class Sink:
+    """One destination of a :class:`MultiBackend`, with its own worker thread.
+
+    At most ``max_pending`` batches are queued or being sent at once; further
+    batches are dropped until the backend catches up. ``errors`` counts
+    batches the backend raised on, ``timeouts`` counts batches the caller
+    stopped waiting for, and ``dropped`` counts batches which were never
+    queued.
+    """
+
+    def __init__(
+        self,
+        backend: MetricsBackend,
+        timeout: float,
+        index: int,
+        max_pending: int = 10,
+        owned: bool = False,
+    ) -> None:
+        self.backend = backend
+        self.timeout = timeout
+        self.max_pending = max_pending
+        self.owned = owned
+        self.errors = 0
+        self.timeouts = 0
+        self.dropped = 0
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix=f"thelabinstrumentation-multi-{index}",
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"<Sink {type(self.backend).__name__} "
+            f"errors={self.errors} timeouts={self.timeouts} dropped={self.dropped}>"
+        )
+
+    def submit(self, send: Callable[[MetricsBackend], None]) -> Future[None] | None:
+        """Queue a batch, or drop it (returning None) if the sink is busy."""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.dropped += 1
+                return None
+            self._pending += 1
+        return self._executor.submit(self._call, send)
+
+    def _call(self, send: Callable[[MetricsBackend], None]) -> None:
+        try:
+            send(self.backend)
+        except Exception:
+            with self._lock:
+                self.errors += 1
+            logger.exception("Error sending metrics to %s", type(self.backend).__name__)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        if self.owned:
+            self.backend.close()
+
+
+class MultiBackend(MetricsBackend):
+    """Fan-out backend which sends every batch to several backends at once.
+
+    Each sink sends from its own worker thread, so a slow or failing backend
+    doesn't delay the others. ``send_metrics`` waits at most each sink's
+    timeout for it to finish; a sink which is still busy keeps sending in the
+    background, and drops new batches once ``max_pending`` are outstanding.
+
+    ``backends`` is a list of backend class paths, backend instances, or dicts
+    with ``BACKEND``, ``OPTIONS``, ``TIMEOUT`` and ``MAX_PENDING`` keys.
+    Backends built from class paths are closed along with this backend.
+    """
+
+    def __init__(
+        self,
+        backends: list[str | SinkConfigData | MetricsBackend],
+        timeout: float = 5.0,
+        max_pending: int = 10,
+        **kwargs: Any,
+    ) -> None:
+        self.sinks: list[Sink] = []
+        for index, spec in enumerate(backends):
+            sink_timeout = timeout
+            sink_max_pending = max_pending
+            if isinstance(spec, MetricsBackend):
+                backend = spec
+            elif isinstance(spec, str):
+                backend = build_backend(spec, {})
+            else:
+                backend = build_backend(spec["BACKEND"], spec.get("OPTIONS") or {})
+                sink_timeout = spec.get("TIMEOUT", timeout)
+                sink_max_pending = spec.get("MAX_PENDING", max_pending)
+            self.sinks.append(
+                Sink(
+                    backend,
+                    sink_timeout,
+                    index,
+                    max_pending=sink_max_pending,
+                    owned=not isinstance(spec, MetricsBackend),
+                )
+            )
+
+    @property
+    def backends(self) -> list[MetricsBackend]:
+        return [sink.backend for sink in self.sinks]
+
+    def send_metrics(self, metrics: list[MetricData]) -> None:
+        if metrics:
+            self._dispatch(lambda backend: backend.send_metrics(metrics))
+
+    def send_histograms(self, histograms: list[HistogramData]) -> None:
+        if histograms:
+            self._dispatch(lambda backend: backend.send_histograms(histograms))
+
+    def _dispatch(self, send: Callable[[MetricsBackend], None]) -> None:
+        start = time.monotonic()
+        futures = [(sink, sink.submit(send)) for sink in self.sinks]
+        for sink, future in futures:
+            if future is None:
+                logger.warning(
+                    "Dropped metrics for %s, which has %d batches pending",
+                    type(sink.backend).__name__,
+                    sink.max_pending,
+                )
+                continue
+            remaining = start + sink.timeout - time.monotonic()
+            try:
+                future.result(timeout=max(0.0, remaining))
+            except FutureTimeoutError:
+                sink.record_timeout()
+                logger.warning(
+                    "Timed out after %ss sending metrics to %s",
+                    sink.timeout,
+                    type(sink.backend).__name__,
+                )
+
+    def close(self) -> None:
+        """Wait for in-flight sends, then stop the sink threads and owned backends."""
+        for sink in self.sinks:
+            sink.close()
@@ -0,0 +1,382 @@
+"""OpenTelemetry (OTLP/HTTP protobuf) metrics backend.
+
+The ``ExportMetricsServiceRequest`` protobuf is encoded by hand (the message
+subset used here is small and stable), so no OpenTelemetry or protobuf
+packages are needed.
+
+- Metrics are exported as gauges, or as monotonic sums when named in
+  ``counters``.
+- Histograms are exported as exponential histograms, since
+  :class:`~thelabinstrumentation.backends.histogram.Histogram` uses the same
+  bucket layout.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Any, Literal
+from urllib.error import HTTPError, URLError
+import gzip
+import logging
+import random
+import struct
+import threading
+import time
+import urllib.request
+
+from ..conf import config
+from .base import HistogramData, MetricData, MetricsBackend
+from .buffered import BufferedBackend, OverflowPolicy
+from .histogram import Histogram
+
+if TYPE_CHECKING:
+    from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ENDPOINT = "http://localhost:4318/v1/metrics"
+
+Temporality = Literal["delta", "cumulative"]
+
+_TEMPORALITIES: dict[Temporality, int] = {"delta": 1, "cumulative": 2}
+
+# Retried with backoff, per the OTLP/HTTP specification.
+_RETRYABLE_STATUSES = frozenset({429, 502, 503, 504})
+
+# CloudWatch unit names mapped to UCUM, as OpenTelemetry expects.
+_UNITS = {
+    "Seconds": "s",
+    "Milliseconds": "ms",
+    "Microseconds": "us",
+    "Bytes": "By",
+    "Kilobytes": "kBy",
+    "Megabytes": "MBy",
+    "Gigabytes": "GBy",
+    "Terabytes": "TBy",
+    "Bits": "bit",
+    "Kilobits": "kbit",
+    "Megabits": "Mbit",
+    "Gigabits": "Gbit",
+    "Terabits": "Tbit",
+    "Percent": "%",
+    "Count": "1",
+    "Bytes/Second": "By/s",
+    "Kilobytes/Second": "kBy/s",
+    "Megabytes/Second": "MBy/s",
+    "Gigabytes/Second": "GBy/s",
+    "Terabytes/Second": "TBy/s",
+    "Bits/Second": "bit/s",
+    "Kilobits/Second": "kbit/s",
+    "Megabits/Second": "Mbit/s",
+    "Gigabits/Second": "Gbit/s",
+    "Terabits/Second": "Tbit/s",
+    "Count/Second": "1/s",
+    "None": "",
+}
+
+_Attributes = tuple[tuple[str, str], ...]
+_SeriesKey = tuple[str, _Attributes]
+
+
+# Protobuf wire format.
+
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    value &= 0xFFFFFFFFFFFFFFFF
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _key(field: int, wire_type: int) -> bytes:
+    return _varint((field << 3) | wire_type)
+
+
+def _uint(field: int, value: int) -> bytes:
+    return _key(field, 0) + _varint(value)
+
+
+def _sint(field: int, value: int) -> bytes:
+    return _key(field, 0) + _varint((value << 1) ^ (value >> 63))
+
+
+def _fixed64(field: int, value: int) -> bytes:
+    return _key(field, 1) + struct.pack("<Q", value)
+
+
+def _double(field: int, value: float) -> bytes:
+    return _key(field, 1) + struct.pack("<d", value)
+
+
+def _message(field: int, payload: bytes) -> bytes:
+    return _key(field, 2) + _varint(len(payload)) + payload
+
+
+def _string(field: int, value: str) -> bytes:
+    return _message(field, value.encode())
+
+
+def _packed_uints(field: int, values: Iterable[int]) -> bytes:
+    return _message(field, b"".join(_varint(value) for value in values))
+
+
+def _attributes(field: int, attributes: Iterable[tuple[str, str]]) -> bytes:
+    # KeyValue{key = 1, value = AnyValue{string_value = 1}}
+    return b"".join(
+        _message(field, _string(1, key) + _message(2, _string(1, value)))
+        for key, value in attributes
+    )
+
+
+def _timestamp_ns(timestamp: datetime | None) -> int:
+    if timestamp is None:
+        return time.time_ns()
+    return int(timestamp.timestamp() * 1_000_000_000)
+
+
+class OTLPExporter(MetricsBackend):
+    """Synchronous OTLP/HTTP protobuf exporter.
+
+    Each call to ``send_metrics`` or ``send_histograms`` is one export request,
+    retried with exponential backoff on connection errors and retryable
+    statuses (honouring ``Retry-After``). Usually used through
+    :class:`OTLPBackend`, which batches datapoints in the background.
+    """
+
+    def __init__(
+        self,
+        endpoint: str = DEFAULT_ENDPOINT,
+        headers: Mapping[str, str] | None = None,
+        timeout: float = 10.0,
+        compression: Literal["gzip", "none"] = "gzip",
+        max_retries: int = 5,
+        retry_backoff: float = 1.0,
+        max_retry_backoff: float = 30.0,
+        temporality: Temporality = "delta",
+        counters: Iterable[str] = (),
+        resource_attributes: Mapping[str, str] | None = None,
+        scope_name: str = "thelabinstrumentation",
+        **kwargs: Any,
+    ) -> None:
+        if temporality not in _TEMPORALITIES:
+            raise ValueError(
+                f"temporality must be one of {tuple(_TEMPORALITIES)}, "
+                f"not {temporality!r}"
+            )
+        self.endpoint = endpoint
+        self.headers = dict(headers or {})
+        self.timeout = timeout
+        self.compression = compression
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.max_retry_backoff = max_retry_backoff
+        self.temporality: Temporality = temporality
+        self.counters = frozenset(counters)
+        self.resource_attributes = dict(resource_attributes or {})
+        self.scope_name = scope_name
+        # Series state for sum and histogram start times and running totals.
+        self._start_ns = time.time_ns()
+        self._series_start: dict[_SeriesKey, int] = {}
+        self._sum_totals: dict[_SeriesKey, float] = {}
+        self._histogram_totals: dict[_SeriesKey, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def send_metrics(self, metrics: list[MetricData]) -> None:
+        if metrics:
+            self.export(self.encode_metrics(metrics))
+
+    def send_histograms(self, histograms: list[HistogramData]) -> None:
+        histograms = [data for data in histograms if data["histogram"].count]
+        if histograms:
+            self.export(self.encode_histograms(histograms))
+
+    def _start_time(self, key: _SeriesKey, now: int) -> int:
+        """Start of the series' current aggregation period."""
+        start = self._series_start.get(key, self._start_ns)
+        if self.temporality == "delta":
+            self._series_start[key] = now
+        else:
+            self._series_start.setdefault(key, start)
+        return start
+
+    def encode_metrics(self, metrics: list[MetricData]) -> bytes:
+        """Encode an ``ExportMetricsServiceRequest`` of gauges and sums."""
+        points: dict[tuple[str, str], list[bytes]] = {}
+        with self._lock:
+            for metric in metrics:
+                name = metric["name"]
+                attributes = tuple(sorted((metric.get("dimensions") or {}).items()))
+                now = _timestamp_ns(metric.get("timestamp"))
+                # NumberDataPoint{attributes = 7, start = 2, time = 3, as_double = 4}
+                point = _attributes(7, attributes)
+                value = float(metric["value"])
+                if name in self.counters:
+                    key = (name, attributes)
+                    point += _fixed64(2, self._start_time(key, now))
+                    if self.temporality == "cumulative":
+                        value += self._sum_totals.get(key, 0.0)
+                        self._sum_totals[key] = value
+                point += _fixed64(3, now) + _double(4, value)
+                unit = _UNITS.get(metric.get("unit", "None"), metric.get("unit", ""))
+                points.setdefault((name, unit), []).append(point)
+        encoded: list[bytes] = []
+        for (name, unit), data_points in points.items():
+            body = b"".join(_message(1, point) for point in data_points)
+            if name in self.counters:
+                # Sum{data_points = 1, temporality = 2, is_monotonic = 3}
+                body += _uint(2, _TEMPORALITIES[self.temporality]) + _uint(3, 1)
+                data = _message(7, body)
+            else:
+                # Gauge{data_points = 1}
+                data = _message(5, body)
+            encoded.append(self._metric(name, unit, data))
+        return self._request(encoded)
+
+    def encode_histograms(self, histograms: list[HistogramData]) -> bytes:
+        """Encode an ``ExportMetricsServiceRequest`` of exponential histograms."""
+        points: dict[tuple[str, str], list[bytes]] = {}
+        with self._lock:
+            for data in histograms:
+                name = data["name"]
+                attributes = tuple(sorted((data.get("dimensions") or {}).items()))
+                key = (name, attributes)
+                now = _timestamp_ns(data.get("timestamp"))
+                histogram = data["histogram"]
+                if self.temporality == "cumulative":
+                    total = self._histogram_totals.get(key)
+                    if total is None:
+                        total = self._histogram_totals[key] = Histogram()
+                    total.merge(histogram)
+                    histogram = total.copy()
+                point = self._histogram_point(
+                    histogram, attributes, self._start_time(key, now), now
+                )
+                unit = _UNITS.get(data.get("unit", "None"), data.get("unit", ""))
+                points.setdefault((name, unit), []).append(point)
+        encoded: list[bytes] = []
+        for (name, unit), data_points in points.items():
+            # ExponentialHistogram{data_points = 1, temporality = 2}
+            body = b"".join(_message(1, point) for point in data_points)
+            body += _uint(2, _TEMPORALITIES[self.temporality])
+            encoded.append(self._metric(name, unit, _message(10, body)))
+        return self._request(encoded)
+
+    def _histogram_point(
+        self, histogram: Histogram, attributes: _Attributes, start: int, now: int
+    ) -> bytes:
+        # ExponentialHistogramDataPoint{attributes = 1, start = 2, time = 3,
+        # count = 4, sum = 5, scale = 6, zero_count = 7, positive = 8,
+        # negative = 9, min = 12, max = 13}
+        point = (
+            _attributes(1, attributes)
+            + _fixed64(2, start)
+            + _fixed64(3, now)
+            + _fixed64(4, histogram.count)
+            + _double(5, histogram.sum)
+            + _sint(6, histogram.scale)
+            + _fixed64(7, histogram.zero_count)
+        )
+        for field, negative in ((8, False), (9, True)):
+            offset, counts = histogram.dense_buckets(negative=negative)
+            if counts:
+                # Buckets{offset = 1, bucket_counts = 2}
+                point += _message(field, _sint(1, offset) + _packed_uints(2, counts))
+        return point + _double(12, histogram.min) + _double(13, histogram.max)
+
+    def _metric(self, name: str, unit: str, data: bytes) -> bytes:
+        # Metric{name = 1, unit = 3, <data>}
+        return _string(1, name) + (_string(3, unit) if unit else b"") + data
+
+    def _request(self, metrics: list[bytes]) -> bytes:
+        resource = {**config.snapshot.dimensions, **self.resource_attributes}
+        # ScopeMetrics{scope = 1 (InstrumentationScope{name = 1}), metrics = 2}
+        scope_metrics = _message(1, _string(1, self.scope_name)) + b"".join(
+            _message(2, metric) for metric in metrics
+        )
+        # ResourceMetrics{resource = 1 (Resource{attributes = 1}), scope_metrics = 2}
+        resource_metrics = _message(
+            1, _attributes(1, sorted(resource.items()))
+        ) + _message(2, scope_metrics)
+        # ExportMetricsServiceRequest{resource_metrics = 1}
+        return _message(1, resource_metrics)
+
+    def export(self, body: bytes) -> None:
+        """POST an encoded request to the collector, retrying transient failures."""
+        headers = {**self.headers, "Content-Type": "application/x-protobuf"}
+        if self.compression == "gzip":
+            body = gzip.compress(body)
+            headers["Content-Encoding"] = "gzip"
+        for attempt in range(self.max_retries + 1):
+            try:
+                request = urllib.request.Request(
+                    self.endpoint, data=body, headers=headers, method="POST"
+                )
+                with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                    response.read()
+                return
+            except HTTPError as e:
+                if e.code not in _RETRYABLE_STATUSES or attempt == self.max_retries:
+                    raise
+                delay = self._retry_after(e)
+                if delay is None:
+                    delay = self._backoff(attempt)
+                logger.debug(
+                    "OTLP export got HTTP %s, retrying in %.2fs", e.code, delay
+                )
+            except (URLError, OSError) as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                logger.debug("OTLP export failed (%s), retrying in %.2fs", e, delay)
+            time.sleep(delay)
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(self.retry_backoff * 2**attempt, self.max_retry_backoff)
+        # Full jitter, so that many exporters don't retry in lockstep.
+        return random.uniform(delay / 2, delay)
+
+    def _retry_after(self, error: HTTPError) -> float | None:
+        value = error.headers.get("Retry-After") if error.headers else None
+        if not value:
+            return None
+        try:
+            delay = float(value)
+        except ValueError:
+            try:
+                delay = parsedate_to_datetime(value).timestamp() - time.time()
+            except (TypeError, ValueError):
+                return None
+        return min(max(0.0, delay), self.max_retry_backoff)
+
+
+class OTLPBackend(BufferedBackend):
+    """Backend which exports metrics to an OpenTelemetry collector over OTLP/HTTP.
+
+    Datapoints are buffered and exported from a background thread (see
+    :class:`~thelabinstrumentation.backends.buffered.BufferedBackend` for the
+    ``max_size``, ``flush_size``, ``flush_interval`` and ``overflow``
+    options). Every other option configures the :class:`OTLPExporter`.
+    Global ``DIMENSIONS`` are sent as resource attributes, alongside
+    ``resource_attributes`` (e.g. ``{"service.name": "my-app"}``).
+    """
+
+    def __init__(
+        self,
+        max_size: int = 10_000,
+        flush_size: int = 1_000,
+        flush_interval: float = 10.0,
+        overflow: OverflowPolicy = "drop-oldest",
+        **kwargs: Any,
+    ) -> None:
+        self.exporter = OTLPExporter(**kwargs)
+        super().__init__(
+            self.exporter,
+            max_size=max_size,
+            flush_size=flush_size,
+            flush_interval=flush_interval,
+            overflow=overflow,
+        )
@@ -0,0 +1,311 @@
+"""Prometheus text exposition of the metrics sent to this process.
+
+:class:`PrometheusBackend` doesn't push anywhere: it keeps the latest value of
+every series in an in-memory :class:`PrometheusStore`, which Prometheus scrapes
+through :func:`metrics_view` (a Django view) or :func:`metrics_wsgi_app` (a
+standalone WSGI app)::
+
+    urlpatterns = [
+        path("metrics", metrics_view),
+    ]
+
+Each series' exposition lines are rendered when the series is updated, so a
+scrape only joins pre-rendered strings and never takes a store-wide lock.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from itertools import count
+from typing import TYPE_CHECKING, Any, Literal
+import math
+import re
+import threading
+
+from django.http import HttpRequest, HttpResponse
+
+from .base import (
+    AsyncMetricsBackend,
+    HistogramData,
+    MetricData,
+    MetricsBackend,
+    _BaseMetricsBackend,
+)
+from .histogram import Histogram
+
+if TYPE_CHECKING:
+    from _typeshed.wsgi import StartResponse, WSGIEnvironment
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Bucket upper bounds, in milliseconds, suited to request and job durations.
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    5,
+    10,
+    25,
+    50,
+    100,
+    250,
+    500,
+    1_000,
+    2_500,
+    5_000,
+    10_000,
+    30_000,
+    60_000,
+)
+
+MetricType = Literal["gauge", "counter", "histogram"]
+
+_INVALID_NAME_CHARS = re.compile(r"[^a-zA-Z0-9_:]")
+_INVALID_LABEL_CHARS = re.compile(r"[^a-zA-Z0-9_]")
+
+_Labels = tuple[tuple[str, str], ...]
+
+
+def _metric_name(name: str) -> str:
+    name = _INVALID_NAME_CHARS.sub("_", name)
+    return f"_{name}" if name[:1].isdigit() else name
+
+
+def _label_name(name: str) -> str:
+    name = _INVALID_LABEL_CHARS.sub("_", name)
+    return f"_{name}" if name[:1].isdigit() else name
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_labels(labels: _Labels, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in labels]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Family:
+    """Every series sharing a metric name, with their rendered lines."""
+
+    def __init__(self, name: str, metric_type: MetricType) -> None:
+        self.name = name
+        self.type = metric_type
+        self.header = f"# TYPE {name} {metric_type}\n"
+        # Series are only written under ``lock``; scrapes read copies.
+        self.lines: dict[_Labels, str] = {}
+        self.values: dict[_Labels, float] = {}
+        self.histograms: dict[_Labels, Histogram] = {}
+        self.lock = threading.Lock()
+
+
+class PrometheusStore:
+    """Latest value of every series, kept in Prometheus exposition format."""
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self._families: dict[str, _Family] = {}
+        self._families_lock = threading.Lock()
+        self._versions = count(1)
+        self._version = 0
+        self._rendered: tuple[int, bytes] = (0, b"")
+
+    def __len__(self) -> int:
+        return sum(len(family.lines) for family in self._families.copy().values())
+
+    def _family(self, name: str, metric_type: MetricType) -> _Family:
+        family = self._families.get(name)
+        if family is None:
+            with self._families_lock:
+                family = self._families.setdefault(name, _Family(name, metric_type))
+        if family.type != metric_type:
+            raise ValueError(
+                f"{name} is a {family.type}, it can't also be a {metric_type}"
+            )
+        return family
+
+    def _updated(self) -> None:
+        self._version = next(self._versions)
+
+    def set(self, name: str, labels: _Labels, value: float) -> None:
+        """Set a gauge to ``value``."""
+        family = self._family(name, "gauge")
+        with family.lock:
+            family.lines[labels] = (
+                f"{name}{_format_labels(labels)} {_format_value(value)}\n"
+            )
+        self._updated()
+
+    def inc(self, name: str, labels: _Labels, amount: float) -> None:
+        """Add ``amount`` to a counter."""
+        family = self._family(name, "counter")
+        with family.lock:
+            value = family.values.get(labels, 0.0) + amount
+            family.values[labels] = value
+            family.lines[labels] = (
+                f"{name}{_format_labels(labels)} {_format_value(value)}\n"
+            )
+        self._updated()
+
+    def observe(self, name: str, labels: _Labels, histogram: Histogram) -> None:
+        """Fold a histogram's observations into a cumulative histogram."""
+        family = self._family(name, "histogram")
+        with family.lock:
+            total = family.histograms.get(labels)
+            if total is None:
+                total = family.histograms[labels] = Histogram()
+            total.merge(histogram)
+            family.lines[labels] = self._render_histogram(name, labels, total)
+        self._updated()
+
+    def _render_histogram(self, name: str, labels: _Labels, total: Histogram) -> str:
+        lines: list[str] = []
+        observations = total.buckets()
+        pending = next(observations, None)
+        seen = 0
+        for bound in self.buckets:
+            while pending is not None and pending[0] <= bound:
+                seen += pending[1]
+                pending = next(observations, None)
+            le = _format_labels(labels, f'le="{_format_value(bound)}"')
+            lines.append(f"{name}_bucket{le} {seen}\n")
+        le = _format_labels(labels, 'le="+Inf"')
+        lines.append(f"{name}_bucket{le} {total.count}\n")
+        label_text = _format_labels(labels)
+        lines.append(f"{name}_sum{label_text} {_format_value(total.sum)}\n")
+        lines.append(f"{name}_count{label_text} {total.count}\n")
+        return "".join(lines)
+
+    def render(self) -> bytes:
+        """Every series, in the text exposition format.
+
+        The output is cached until the next update, so repeated scrapes of an
+        unchanged store are free.
+        """
+        version = self._version
+        rendered_version, rendered = self._rendered
+        if rendered_version == version:
+            return rendered
+        chunks: list[str] = []
+        families = self._families.copy()
+        for name in sorted(families):
+            family = families[name]
+            lines = family.lines.copy()
+            if lines:
+                chunks.append(family.header)
+                chunks.extend(lines.values())
+        rendered = "".join(chunks).encode()
+        self._rendered = (version, rendered)
+        return rendered
+
+    def clear(self) -> None:
+        """Forget every series."""
+        with self._families_lock:
+            self._families = {}
+        self._updated()
+
+
+# Store shared by backends by default, and served by the views.
+default_store = PrometheusStore()
+
+
+class _PrometheusBackendMixin(_BaseMetricsBackend):
+    def __init__(
+        self,
+        namespace: str = "",
+        counters: Iterable[str] = (),
+        store: PrometheusStore | None = None,
+        **kwargs: Any,
+    ) -> None:
+        self.namespace = namespace
+        self.counters = frozenset(counters)
+        self.store = store if store is not None else default_store
+
+    def _series(
+        self, name: str, dimensions: dict[str, str] | None
+    ) -> tuple[str, _Labels]:
+        if self.namespace:
+            name = f"{self.namespace}_{name}"
+        labels = tuple(
+            sorted(
+                (_label_name(key), value)
+                for key, value in self._get_all_dimensions(dimensions).items()
+            )
+        )
+        return _metric_name(name), labels
+
+    def _store_metrics(self, metrics: list[MetricData]) -> None:
+        for metric in metrics:
+            name, labels = self._series(metric["name"], metric.get("dimensions"))
+            if metric["name"] in self.counters:
+                self.store.inc(f"{name}_total", labels, metric["value"])
+            else:
+                self.store.set(name, labels, metric["value"])
+
+    def _store_histograms(self, histograms: list[HistogramData]) -> None:
+        for data in histograms:
+            if data["histogram"].count:
+                name, labels = self._series(data["name"], data.get("dimensions"))
+                self.store.observe(name, labels, data["histogram"])
+
+
+class PrometheusBackend(_PrometheusBackendMixin, MetricsBackend):
+    """Backend which exposes metrics for Prometheus to scrape.
+
+    Metrics are gauges holding the last value sent, except those named in
+    ``counters``, whose values are treated as increments (e.g. the deltas
+    published by :class:`thelabinstrumentation.metrics.Counter`) and summed
+    into a ``_total`` counter. Histograms accumulate into Prometheus
+    histograms with the store's ``buckets``. Dimensions become labels, and
+    names are prefixed with ``namespace``, if given.
+    """
+
+    def send_metrics(self, metrics: list[MetricData]) -> None:
+        self._store_metrics(metrics)
+
+    def send_histograms(self, histograms: list[HistogramData]) -> None:
+        self._store_histograms(histograms)
+
+
+class AsyncPrometheusBackend(_PrometheusBackendMixin, AsyncMetricsBackend):
+    """Asyncio variant of :class:`PrometheusBackend`; updates never block."""
+
+    async def send_metrics(self, metrics: list[MetricData]) -> None:
+        self._store_metrics(metrics)
+
+    async def send_histograms(self, histograms: list[HistogramData]) -> None:
+        self._store_histograms(histograms)
+
+
+def metrics_view(request: HttpRequest) -> HttpResponse:
+    """Django view serving the default store."""
+    return HttpResponse(default_store.render(), content_type=CONTENT_TYPE)
+
+
+def make_wsgi_app(
+    store: PrometheusStore | None = None,
+) -> Callable[[WSGIEnvironment, StartResponse], list[bytes]]:
+    """WSGI app serving ``store`` (by default, the default store)."""
+    source = store if store is not None else default_store
+
+    def app(environ: WSGIEnvironment, start_response: StartResponse) -> list[bytes]:
+        body = source.render()
+        start_response(
+            "200 OK",
+            [("Content-Type", CONTENT_TYPE), ("Content-Length", str(len(body)))],
+        )
+        return [body]
+
+    return app
+
+
+metrics_wsgi_app = make_wsgi_app()
@@ -0,0 +1,192 @@
+"""StatsD / DogStatsD backend.
+
+Metrics are formatted as DogStatsD lines (``name:value|type|#tag:value,...``)
+and coalesced into as few datagrams as fit in ``max_packet_size``. Sends are
+non-blocking and never raise, so a missing or overloaded agent only costs the
+datagrams it drops.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator, Mapping
+from typing import Any
+import logging
+import re
+import socket
+import threading
+
+from ..conf import config
+from .base import (
+    AsyncMetricsBackend,
+    HistogramData,
+    MetricData,
+    MetricsBackend,
+    _BaseMetricsBackend,
+)
+
+logger = logging.getLogger(__name__)
+
+# Largest UDP payload which avoids IP fragmentation on a 1500 byte MTU network.
+DEFAULT_UDP_PACKET_SIZE = 1432
+# The Datadog agent's default buffer size for Unix domain sockets.
+DEFAULT_UDS_PACKET_SIZE = 8192
+
+# Upper bound on the number of distinct dimension sets whose tags are cached.
+_TAG_CACHE_SIZE = 4096
+
+_INVALID_NAME_CHARS = re.compile(r"[:|@#\s]")
+_INVALID_TAG_CHARS = re.compile(r"[,|#\s]")
+
+
+def _format_value(value: float) -> str:
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _tag(text: str) -> str:
+    return _INVALID_TAG_CHARS.sub("_", text)
+
+
+class _StatsDBackendMixin(_BaseMetricsBackend):
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 8125,
+        socket_path: str | None = None,
+        prefix: str = "",
+        counters: Iterable[str] = (),
+        max_packet_size: int | None = None,
+        **kwargs: Any,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.socket_path = socket_path
+        self.prefix = f"{prefix}." if prefix else ""
+        self.counters = frozenset(counters)
+        if max_packet_size is None:
+            max_packet_size = (
+                DEFAULT_UDS_PACKET_SIZE if socket_path else DEFAULT_UDP_PACKET_SIZE
+            )
+        self.max_packet_size = max_packet_size
+        self.dropped = 0
+        self._tags: dict[tuple[tuple[tuple[str, str], ...], str | None], str] = {}
+        self._tag_defaults: Mapping[str, str] | None = None
+        self._socket: socket.socket | None = None
+        self._socket_lock = threading.Lock()
+
+    def _get_socket(self) -> socket.socket:
+        sock = self._socket
+        if sock is not None:
+            return sock
+        with self._socket_lock:
+            if self._socket is None:
+                if self.socket_path:
+                    sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+                    sock.connect(self.socket_path)
+                else:
+                    family, _, _, _, address = socket.getaddrinfo(
+                        self.host, self.port, type=socket.SOCK_DGRAM
+                    )[0]
+                    sock = socket.socket(family, socket.SOCK_DGRAM)
+                    sock.connect(address)
+                sock.setblocking(False)
+                self._socket = sock
+            return self._socket
+
+    def close(self) -> None:
+        """Close the socket; it's reopened on the next send."""
+        with self._socket_lock:
+            if self._socket is not None:
+                self._socket.close()
+                self._socket = None
+
+    def _tag_suffix(self, dimensions: dict[str, str] | None, unit: str | None) -> str:
+        # Cached by the metric's own dimensions; the global ones only change
+        # with the settings, which empties the cache.
+        defaults = config.snapshot.dimensions
+        if defaults is not self._tag_defaults:
+            self._tags = {}
+            self._tag_defaults = defaults
+        key = (tuple(dimensions.items()) if dimensions else (), unit)
+        suffix = self._tags.get(key)
+        if suffix is None:
+            tags = sorted(self._get_all_dimensions(dimensions).items())
+            if unit and unit != "None":
+                tags.append(("unit", unit))
+            text = ",".join(f"{_tag(name)}:{_tag(value)}" for name, value in tags)
+            suffix = f"|#{text}" if text else ""
+            if len(self._tags) >= _TAG_CACHE_SIZE:
+                self._tags = {}
+            self._tags[key] = suffix
+        return suffix
+
+    def _name(self, name: str) -> str:
+        return _INVALID_NAME_CHARS.sub("_", f"{self.prefix}{name}")
+
+    def _metric_lines(self, metrics: list[MetricData]) -> Iterator[str]:
+        for metric in metrics:
+            metric_type = "c" if metric["name"] in self.counters else "g"
+            tags = self._tag_suffix(metric.get("dimensions"), metric.get("unit"))
+            yield (
+                f"{self._name(metric['name'])}:{_format_value(metric['value'])}"
+                f"|{metric_type}{tags}"
+            )
+
+    def _histogram_lines(self, histograms: list[HistogramData]) -> Iterator[str]:
+        # Each bucket is sent as one distribution sample whose sample rate
+        # stands for the bucket's count, so the agent weights it accordingly.
+        for data in histograms:
+            name = self._name(data["name"])
+            tags = self._tag_suffix(data.get("dimensions"), data.get("unit"))
+            for value, count in data["histogram"].buckets():
+                rate = f"|@{1 / count:.6g}" if count > 1 else ""
+                yield f"{name}:{value:.6g}|d{rate}{tags}"
+
+    def _send_lines(self, lines: Iterable[str]) -> None:
+        packet: list[bytes] = []
+        size = 0
+        for line in lines:
+            encoded = line.encode()
+            if packet and size + 1 + len(encoded) > self.max_packet_size:
+                self._send_packet(b"\n".join(packet))
+                packet, size = [], 0
+            size += len(encoded) + (1 if packet else 0)
+            packet.append(encoded)
+        if packet:
+            self._send_packet(b"\n".join(packet))
+
+    def _send_packet(self, packet: bytes) -> None:
+        try:
+            self._get_socket().send(packet)
+        except OSError as e:
+            # Agent missing, or its buffer is full: statsd is fire-and-forget.
+            self.dropped += 1
+            logger.debug("Dropped a StatsD packet: %s", e)
+
+
+class StatsDBackend(_StatsDBackendMixin, MetricsBackend):
+    """Backend which sends metrics to a StatsD or DogStatsD agent.
+
+    Sends over UDP to ``host``:``port``, or over a Unix datagram socket when
+    ``socket_path`` is set. Metrics are gauges, except those named in
+    ``counters``, which are sent as counts. Dimensions and the unit become
+    DogStatsD tags, and names are prefixed with ``prefix``. Histograms are sent
+    as distributions. ``dropped`` counts datagrams which couldn't be sent.
+    """
+
+    def send_metrics(self, metrics: list[MetricData]) -> None:
+        self._send_lines(self._metric_lines(metrics))
+
+    def send_histograms(self, histograms: list[HistogramData]) -> None:
+        self._send_lines(self._histogram_lines(histograms))
+
+
+class AsyncStatsDBackend(_StatsDBackendMixin, AsyncMetricsBackend):
+    """Asyncio variant of :class:`StatsDBackend`; sends never block."""
+
+    async def send_metrics(self, metrics: list[MetricData]) -> None:
+        self._send_lines(self._metric_lines(metrics))
+
+    async def send_histograms(self, histograms: list[HistogramData]) -> None:
+        self._send_lines(self._histogram_lines(histograms))
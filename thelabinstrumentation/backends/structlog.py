@@ -5,18 +5,23 @@ from typing import Any
 from django.utils import timezone
 import structlog
 
-from .base import MetricData, MetricsBackend
+from .base import (
+    AsyncMetricsBackend,
+    HistogramData,
+    MetricData,
+    MetricsBackend,
+    _BaseMetricsBackend,
+    describe_histogram,
+)
 
 logger = structlog.get_logger(__name__)
 
 
-class StructlogBackend(MetricsBackend):
-    """Structlog metrics backend implementation."""
-
+class _StructlogBackendMixin(_BaseMetricsBackend):
     def __init__(self, **kwargs: Any) -> None:
         pass
 
-    def send_metrics(self, metrics: list[MetricData]) -> None:
+    def _log_metrics(self, metrics: list[MetricData]) -> None:
         for metric in metrics:
             event_kwargs: dict[str, Any] = {
                 "name": metric["name"],
@@ -28,3 +33,42 @@ class StructlogBackend(MetricsBackend):
             if unit is not None:
                 event_kwargs["unit"] = unit
             logger.info("send_metric", **event_kwargs)
+
+    def _log_histograms(self, histograms: list[HistogramData]) -> None:
+        for data in histograms:
+            if not data["histogram"].count:
+                continue
+            event_kwargs: dict[str, Any] = {
+                "name": data["name"],
+                "dimensions": self._get_all_dimensions(data.get("dimensions")),
+                "timestamp": (data.get("timestamp") or timezone.now()).isoformat(),
+                **describe_histogram(data["histogram"]),
+            }
+            unit = data.get("unit")
+            if unit is not None:
+                event_kwargs["unit"] = unit
+            logger.info("send_histogram", **event_kwargs)
+
+
+class StructlogBackend(_StructlogBackendMixin, MetricsBackend):
+    """Structlog metrics backend implementation."""
+
+    def send_metrics(self, metrics: list[MetricData]) -> None:
+        self._log_metrics(metrics)
+
+    def send_histograms(self, histograms: list[HistogramData]) -> None:
+        self._log_histograms(histograms)
+
+
+class AsyncStructlogBackend(_StructlogBackendMixin, AsyncMetricsBackend):
+    """Asyncio structlog metrics backend implementation.
+
+    Uses the synchronous logging methods rather than structlog's ``ainfo``,
+    which would hop to a thread pool for every event.
+    """
+
+    async def send_metrics(self, metrics: list[MetricData]) -> None:
+        self._log_metrics(metrics)
+
+    async def send_histograms(self, histograms: list[HistogramData]) -> None:
+        self._log_histograms(histograms)
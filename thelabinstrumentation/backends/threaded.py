@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from typing import Any
+import asyncio
+
+from .base import AsyncMetricsBackend, HistogramData, MetricData, MetricsBackend
+from .factory import build_backend
+
+_DEFAULT_BACKEND = "thelabinstrumentation.backends.logging.LoggingBackend"
+
+
+class ThreadedAsyncBackend(AsyncMetricsBackend):
+    """Async wrapper which runs a synchronous backend in a worker thread.
+
+    Each batch is handed to ``asyncio.to_thread``, so coroutines never block
+    on the wrapped backend. ``get_async_backend()`` uses it for a ``BACKEND``
+    which has no async counterpart when no ``ASYNC_BACKEND`` is configured.
+    """
+
+    def __init__(
+        self,
+        backend: str | MetricsBackend = _DEFAULT_BACKEND,
+        options: dict[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> None:
+        # Wrapped backends built from a class path are owned, and closed, by
+        # this backend.
+        self._owns_backend = not isinstance(backend, MetricsBackend)
+        if isinstance(backend, MetricsBackend):
+            self.backend = backend
+        else:
+            self.backend = build_backend(backend, options or {})
+
+    def close(self) -> None:
+        if self._owns_backend:
+            self.backend.close()
+
+    async def send_metrics(self, metrics: list[MetricData]) -> None:
+        await asyncio.to_thread(self.backend.send_metrics, metrics)
+
+    async def send_histograms(self, histograms: list[HistogramData]) -> None:
+        await asyncio.to_thread(self.backend.send_histograms, histograms)
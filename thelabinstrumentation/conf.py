@@ -1,62 +1,313 @@
+from collections.abc import Mapping
+from types import MappingProxyType
 from typing import Any, TypedDict, cast
 
 from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+DEFAULT_BACKEND_ALIAS = "default"
+
+
+class BackendConfigData(TypedDict, total=False):
+    BACKEND: str
+    OPTIONS: dict[str, Any]
 
 
 class InstrumentationConfigData(TypedDict, total=False):
     BACKEND: str
     OPTIONS: dict[str, Any]
+    BACKENDS: dict[str, BackendConfigData]
+    ASYNC_BACKEND: str
+    ASYNC_OPTIONS: dict[str, Any]
     DIMENSIONS: dict[str, str]
     UPDATE_INTERVAL: int
+    UPDATE_JITTER: float
+    RQ_IN_PROCESS_SENDER: bool
+    RQ_RESTART_SENDER_AFTER_FORK: bool
+    RQ_LEADER_ELECTION: bool
+    RQ_LEADER_LEASE_TTL: float
     STRUCTLOG_REQUEST_HEADERS: dict[str, str]
     OUTGOING_HTTP_EXCLUDE_HOSTS: list[str]
+    OUTGOING_HTTP_SAMPLE_RATE: float
+    OUTGOING_HTTP_SAMPLE_RATES: dict[str, float]
+    OUTGOING_HTTP_SLOW_MS: float | None
+    OUTGOING_HTTP_RATE_LIMIT: float | None
+    OUTGOING_HTTP_RATE_LIMIT_BURST: float
+    OUTGOING_HTTP_LOG_BODY: bool
+    OUTGOING_HTTP_LOG_START: bool
+    OUTGOING_HTTP_METRICS: bool
+    OUTGOING_HTTP_METRICS_HOSTS: list[str] | None
+    OUTGOING_HTTP_METRICS_MAX_HOSTS: int
+
+
+_DEFAULT_BACKEND = "thelabinstrumentation.backends.logging.LoggingBackend"
+_DEFAULT_STRUCTLOG_REQUEST_HEADERS = {
+    "x-amz-cf-id": "cf_id",
+    "x-amzn-trace-id": "x_amzn_trace_id",
+}
+
+# Bumped whenever THELAB_INSTRUMENTATION changes, to invalidate snapshots.
+_generation = 0
+
+
+class ConfigSnapshot:
+    """Immutable, precomputed view of the ``THELAB_INSTRUMENTATION`` setting.
+
+    Built once per settings change, so hot paths only do attribute loads.
+    """
+
+    __slots__ = (
+        "async_backend",
+        "async_backend_options",
+        "backend",
+        "backend_options",
+        "backends",
+        "dimensions",
+        "outgoing_http_exclude_hosts",
+        "outgoing_http_log_body",
+        "outgoing_http_log_start",
+        "outgoing_http_metrics",
+        "outgoing_http_metrics_hosts",
+        "outgoing_http_metrics_max_hosts",
+        "outgoing_http_rate_limit",
+        "outgoing_http_rate_limit_burst",
+        "outgoing_http_sample_rate",
+        "outgoing_http_sample_rates",
+        "outgoing_http_slow_ms",
+        "rq_in_process_sender",
+        "rq_leader_election",
+        "rq_leader_lease_ttl",
+        "rq_restart_sender_after_fork",
+        "structlog_request_headers",
+        "structlog_request_meta_keys",
+        "update_interval",
+        "update_jitter",
+    )
+
+    def __init__(self, data: InstrumentationConfigData) -> None:
+        self.backend: str = data.get("BACKEND", _DEFAULT_BACKEND)
+        self.backend_options: dict[str, Any] = data.get("OPTIONS") or {}
+        backends = dict(data.get("BACKENDS", {}))
+        backends.setdefault(
+            DEFAULT_BACKEND_ALIAS,
+            {"BACKEND": self.backend, "OPTIONS": self.backend_options},
+        )
+        self.backends: Mapping[str, BackendConfigData] = MappingProxyType(backends)
+        self.async_backend: str | None = data.get("ASYNC_BACKEND")
+        async_options = data.get("ASYNC_OPTIONS")
+        self.async_backend_options: dict[str, Any] = (
+            self.backend_options if async_options is None else async_options
+        )
+        self.dimensions: Mapping[str, str] = MappingProxyType(
+            dict(data.get("DIMENSIONS", {}))
+        )
+        self.update_interval: int = data.get("UPDATE_INTERVAL", 60)
+        self.update_jitter: float = data.get("UPDATE_JITTER", 0.0)
+        self.rq_in_process_sender: bool = data.get("RQ_IN_PROCESS_SENDER", True)
+        self.rq_restart_sender_after_fork: bool = data.get(
+            "RQ_RESTART_SENDER_AFTER_FORK", False
+        )
+        self.rq_leader_election: bool = data.get("RQ_LEADER_ELECTION", True)
+        self.rq_leader_lease_ttl: float = data.get(
+            "RQ_LEADER_LEASE_TTL", self.update_interval * 2
+        )
+        self.outgoing_http_exclude_hosts = frozenset(
+            data.get("OUTGOING_HTTP_EXCLUDE_HOSTS", [])
+        )
+        self.outgoing_http_sample_rate: float = data.get(
+            "OUTGOING_HTTP_SAMPLE_RATE", 1.0
+        )
+        self.outgoing_http_sample_rates: Mapping[str, float] = MappingProxyType(
+            dict(data.get("OUTGOING_HTTP_SAMPLE_RATES", {}))
+        )
+        self.outgoing_http_slow_ms: float | None = data.get("OUTGOING_HTTP_SLOW_MS")
+        self.outgoing_http_rate_limit: float | None = data.get(
+            "OUTGOING_HTTP_RATE_LIMIT"
+        )
+        self.outgoing_http_rate_limit_burst: float = data.get(
+            "OUTGOING_HTTP_RATE_LIMIT_BURST", self.outgoing_http_rate_limit or 1.0
+        )
+        self.outgoing_http_log_start: bool = data.get("OUTGOING_HTTP_LOG_START", True)
+        self.outgoing_http_log_body: bool = data.get("OUTGOING_HTTP_LOG_BODY", False)
+        self.outgoing_http_metrics: bool = data.get("OUTGOING_HTTP_METRICS", False)
+        metrics_hosts = data.get("OUTGOING_HTTP_METRICS_HOSTS")
+        self.outgoing_http_metrics_hosts: frozenset[str] | None = (
+            None if metrics_hosts is None else frozenset(metrics_hosts)
+        )
+        self.outgoing_http_metrics_max_hosts: int = data.get(
+            "OUTGOING_HTTP_METRICS_MAX_HOSTS", 50
+        )
+        headers = data.get(
+            "STRUCTLOG_REQUEST_HEADERS", _DEFAULT_STRUCTLOG_REQUEST_HEADERS
+        )
+        self.structlog_request_headers: Mapping[str, str] = MappingProxyType(
+            dict(headers)
+        )
+        self.structlog_request_meta_keys: tuple[tuple[str, str], ...] = tuple(
+            ("HTTP_" + header_name.upper().replace("-", "_"), context_key)
+            for header_name, context_key in headers.items()
+        )
 
 
 class InstrumentationConfig:
     """Configuration manager for TheLab Instrumentation settings."""
 
+    def __init__(self) -> None:
+        self._snapshot: ConfigSnapshot | None = None
+        self._generation = -1
+
     @property
     def config(self) -> InstrumentationConfigData:
         config = getattr(settings, "THELAB_INSTRUMENTATION", {})
         return cast(InstrumentationConfigData, config)
 
+    @property
+    def snapshot(self) -> ConfigSnapshot:
+        """Precomputed configuration, rebuilt only when the setting changes."""
+        snapshot = self._snapshot
+        if snapshot is None or self._generation != _generation:
+            generation = _generation
+            snapshot = ConfigSnapshot(self.config)
+            self._snapshot, self._generation = snapshot, generation
+        return snapshot
+
     @property
     def backend(self) -> str:
         """Backend class path to use for metrics."""
-        return self.config.get(
-            "BACKEND", "thelabinstrumentation.backends.logging.LoggingBackend"
-        )
+        return self.snapshot.backend
 
     @property
     def backend_options(self) -> dict[str, Any]:
         """Options to pass to the backend constructor as kwargs."""
-        return self.config.get("OPTIONS") or {}
+        return self.snapshot.backend_options
+
+    @property
+    def backends(self) -> Mapping[str, BackendConfigData]:
+        """Named backend configurations.
+
+        The ``"default"`` entry falls back to ``BACKEND`` and ``OPTIONS``.
+        """
+        return self.snapshot.backends
+
+    @property
+    def async_backend(self) -> str | None:
+        """Backend class path to use for metrics sent from async code.
+
+        ``None`` uses the async counterpart of ``BACKEND``.
+        """
+        return self.snapshot.async_backend
 
     @property
-    def dimensions(self) -> dict[str, str]:
+    def async_backend_options(self) -> dict[str, Any]:
+        """Options to pass to the async backend constructor as kwargs.
+
+        Falls back to ``OPTIONS`` so that sync and async backends can share
+        their configuration.
+        """
+        return self.snapshot.async_backend_options
+
+    @property
+    def dimensions(self) -> Mapping[str, str]:
         """Dimensions to include with every metric"""
-        return self.config.get("DIMENSIONS", {})
+        return self.snapshot.dimensions
 
     @property
     def update_interval(self) -> int:
         """Interval in seconds between metric updates."""
-        return self.config.get("UPDATE_INTERVAL", 60)
+        return self.snapshot.update_interval
+
+    @property
+    def update_jitter(self) -> float:
+        """Max seconds by which to offset each process's update schedule."""
+        return self.snapshot.update_jitter
+
+    @property
+    def rq_in_process_sender(self) -> bool:
+        """Whether every Django process runs a background RQ metrics sender."""
+        return self.snapshot.rq_in_process_sender
+
+    @property
+    def rq_restart_sender_after_fork(self) -> bool:
+        """Whether forked children start their own background RQ metrics sender."""
+        return self.snapshot.rq_restart_sender_after_fork
 
     @property
-    def outgoing_http_exclude_hosts(self) -> set[str]:
+    def rq_leader_election(self) -> bool:
+        """Whether only one process in the cluster should publish RQ metrics."""
+        return self.snapshot.rq_leader_election
+
+    @property
+    def rq_leader_lease_ttl(self) -> float:
+        """Seconds before the RQ metrics leader's lease expires if not renewed."""
+        return self.snapshot.rq_leader_lease_ttl
+
+    @property
+    def outgoing_http_exclude_hosts(self) -> frozenset[str]:
         """Set of hostnames to exclude from outgoing HTTP logging."""
-        return set(self.config.get("OUTGOING_HTTP_EXCLUDE_HOSTS", []))
+        return self.snapshot.outgoing_http_exclude_hosts
 
     @property
-    def structlog_request_headers(self) -> dict[str, str]:
+    def outgoing_http_sample_rate(self) -> float:
+        """Probability of logging an outgoing HTTP request by default."""
+        return self.snapshot.outgoing_http_sample_rate
+
+    @property
+    def outgoing_http_sample_rates(self) -> Mapping[str, float]:
+        """Sampling probabilities by hostname or HTTP method."""
+        return self.snapshot.outgoing_http_sample_rates
+
+    @property
+    def outgoing_http_slow_ms(self) -> float | None:
+        """Duration from which outgoing HTTP requests are always logged."""
+        return self.snapshot.outgoing_http_slow_ms
+
+    @property
+    def outgoing_http_rate_limit(self) -> float | None:
+        """Max sampled outgoing HTTP requests logged per second, per host."""
+        return self.snapshot.outgoing_http_rate_limit
+
+    @property
+    def outgoing_http_rate_limit_burst(self) -> float:
+        """Burst size of the per-host outgoing HTTP log rate limit."""
+        return self.snapshot.outgoing_http_rate_limit_burst
+
+    @property
+    def outgoing_http_log_start(self) -> bool:
+        """Whether to log ``outgoing_http_request.start`` events."""
+        return self.snapshot.outgoing_http_log_start
+
+    @property
+    def outgoing_http_log_body(self) -> bool:
+        """Whether to log ``outgoing_http_request.body`` events."""
+        return self.snapshot.outgoing_http_log_body
+
+    @property
+    def outgoing_http_metrics(self) -> bool:
+        """Whether to record outgoing HTTP request counts and latencies."""
+        return self.snapshot.outgoing_http_metrics
+
+    @property
+    def outgoing_http_metrics_hosts(self) -> frozenset[str] | None:
+        """Hosts which get their own outgoing HTTP metrics, if restricted."""
+        return self.snapshot.outgoing_http_metrics_hosts
+
+    @property
+    def outgoing_http_metrics_max_hosts(self) -> int:
+        """Max hosts with their own outgoing HTTP metrics, without an allow-list."""
+        return self.snapshot.outgoing_http_metrics_max_hosts
+
+    @property
+    def structlog_request_headers(self) -> Mapping[str, str]:
         """Header name -> structlog context var name mapping."""
-        return self.config.get(
-            "STRUCTLOG_REQUEST_HEADERS",
-            {
-                "x-amz-cf-id": "cf_id",
-                "x-amzn-trace-id": "x_amzn_trace_id",
-            },
-        )
+        return self.snapshot.structlog_request_headers
+
+
+@receiver(setting_changed)
+def _invalidate_snapshots(setting: str, **kwargs: Any) -> None:
+    global _generation
+    if setting == "THELAB_INSTRUMENTATION":
+        _generation += 1
 
 
 # Global configuration instance
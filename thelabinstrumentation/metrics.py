@@ -0,0 +1,396 @@
+"""In-process metrics registry.
+
+Application code records metrics through pre-bound :class:`Counter`,
+:class:`Gauge` and :class:`Timer` objects, which only update in-memory state.
+A background thread periodically flushes the accumulated values to the
+configured metrics backend, so recording a metric never waits on a backend
+call::
+
+    from thelabinstrumentation import metrics
+
+    orders = metrics.counter("orders.placed", {"Channel": "web"})
+    orders.inc()
+
+    with metrics.timer("orders.checkout").time():
+        ...
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, TypeVar
+import atexit
+import logging
+import os
+import threading
+import time
+
+import sentry_sdk
+
+from .backends import (
+    Histogram,
+    HistogramData,
+    MetricData,
+    MetricsBackend,
+    get_backend,
+)
+from .conf import config
+from .scheduling import IntervalScheduler
+
+if TYPE_CHECKING:
+    from mypy_boto3_cloudwatch.literals import StandardUnitType
+
+logger = logging.getLogger(__name__)
+
+_RegistryKey = tuple[str, str, tuple[tuple[str, str], ...]]
+_MetricT = TypeVar("_MetricT", "Counter", "Gauge", "Timer")
+
+
+class _Metric:
+    """Common name/unit/dimension binding for registry metrics."""
+
+    def __init__(
+        self,
+        name: str,
+        dimensions: dict[str, str] | None = None,
+        unit: StandardUnitType = "None",
+    ) -> None:
+        self.name = name
+        self.dimensions = dict(dimensions or {})
+        self.unit: StandardUnitType = unit
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {self.name} {self.dimensions}>"
+
+    def _after_fork(self) -> None:
+        """Reset locks and drop values the parent process will still publish."""
+
+
+class Counter(_Metric):
+    """Monotonic counter, published as the increase since the last flush.
+
+    Every thread increments its own cell, so :meth:`inc` is a plain integer
+    add with no lock. The flusher sums the cells and reports the difference
+    from the previous total.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        dimensions: dict[str, str] | None = None,
+        unit: StandardUnitType = "Count",
+    ) -> None:
+        super().__init__(name, dimensions, unit)
+        self._local = threading.local()
+        self._cells: list[list[float]] = []
+        self._cells_lock = threading.Lock()
+        self._reported = 0.0
+
+    def inc(self, amount: float = 1) -> None:
+        """Add ``amount`` to the counter."""
+        try:
+            self._local.cell[0] += amount
+        except AttributeError:
+            self._new_cell()[0] += amount
+
+    def _new_cell(self) -> list[float]:
+        cell = [0.0]
+        with self._cells_lock:
+            self._cells.append(cell)
+        self._local.cell = cell
+        return cell
+
+    @property
+    def value(self) -> float:
+        """Total of all increments so far."""
+        with self._cells_lock:
+            cells = list(self._cells)
+        return sum(cell[0] for cell in cells)
+
+    def collect(self) -> float:
+        """Return the increase since the previous call."""
+        total = self.value
+        delta = total - self._reported
+        self._reported = total
+        return delta
+
+    def _after_fork(self) -> None:
+        self._cells_lock = threading.Lock()
+        self._reported = self.value
+
+
+class Gauge(_Metric):
+    """Point-in-time value; the most recently set value is published."""
+
+    def __init__(
+        self,
+        name: str,
+        dimensions: dict[str, str] | None = None,
+        unit: StandardUnitType = "None",
+    ) -> None:
+        super().__init__(name, dimensions, unit)
+        self.value: float | None = None
+
+    def set(self, value: float) -> None:
+        """Set the gauge's current value."""
+        self.value = value
+
+
+class Timer(_Metric):
+    """Distribution of durations, in milliseconds, published as a histogram."""
+
+    def __init__(
+        self,
+        name: str,
+        dimensions: dict[str, str] | None = None,
+        unit: StandardUnitType = "Milliseconds",
+    ) -> None:
+        super().__init__(name, dimensions, unit)
+        self._histogram = Histogram()
+        self._lock = threading.Lock()
+
+    def record(self, duration_ms: float) -> None:
+        """Record a single duration, in milliseconds."""
+        with self._lock:
+            self._histogram.record(duration_ms)
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Record how long the wrapped block takes to run."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record((time.perf_counter() - start) * 1000)
+
+    def collect(self) -> Histogram:
+        """Return the durations recorded since the previous call."""
+        with self._lock:
+            histogram, self._histogram = self._histogram, Histogram()
+        return histogram
+
+    def _after_fork(self) -> None:
+        self._lock = threading.Lock()
+        self._histogram = Histogram()
+
+
+class MetricsRegistry:
+    """Collection of metrics, keyed by type, name and dimensions."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[_RegistryKey, Counter | Gauge | Timer] = {}
+        self._lock = threading.Lock()
+
+    def counter(
+        self,
+        name: str,
+        dimensions: dict[str, str] | None = None,
+        unit: StandardUnitType = "Count",
+    ) -> Counter:
+        """Get or create the counter with the given name and dimensions."""
+        return self._get_or_create(Counter, name, dimensions, unit)
+
+    def gauge(
+        self,
+        name: str,
+        dimensions: dict[str, str] | None = None,
+        unit: StandardUnitType = "None",
+    ) -> Gauge:
+        """Get or create the gauge with the given name and dimensions."""
+        return self._get_or_create(Gauge, name, dimensions, unit)
+
+    def timer(
+        self,
+        name: str,
+        dimensions: dict[str, str] | None = None,
+    ) -> Timer:
+        """Get or create the timer with the given name and dimensions."""
+        return self._get_or_create(Timer, name, dimensions, "Milliseconds")
+
+    def _get_or_create(
+        self,
+        metric_class: type[_MetricT],
+        name: str,
+        dimensions: dict[str, str] | None,
+        unit: StandardUnitType,
+    ) -> _MetricT:
+        key = (
+            metric_class.__name__,
+            name,
+            tuple(sorted((dimensions or {}).items())),
+        )
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(key)
+                if metric is None:
+                    metric = metric_class(name, dimensions, unit)
+                    self._metrics[key] = metric
+        assert isinstance(metric, metric_class)
+        return metric
+
+    def collect(self) -> tuple[list[MetricData], list[HistogramData]]:
+        """Drain every metric into backend-ready datapoints.
+
+        Counters without increments and unset gauges are skipped, as are timers
+        which recorded nothing since the previous collection.
+        """
+        with self._lock:
+            registered = list(self._metrics.values())
+        metrics: list[MetricData] = []
+        histograms: list[HistogramData] = []
+        for metric in registered:
+            if isinstance(metric, Timer):
+                histogram = metric.collect()
+                if histogram.count:
+                    histograms.append(
+                        {
+                            "name": metric.name,
+                            "histogram": histogram,
+                            "unit": metric.unit,
+                            "dimensions": metric.dimensions,
+                        }
+                    )
+                continue
+            if isinstance(metric, Counter):
+                value: float | None = metric.collect() or None
+            else:
+                value = metric.value
+            if value is None:
+                continue
+            metrics.append(
+                {
+                    "name": metric.name,
+                    "value": value,
+                    "unit": metric.unit,
+                    "dimensions": metric.dimensions,
+                }
+            )
+        return metrics, histograms
+
+    def flush(self, backend: MetricsBackend | None = None) -> None:
+        """Collect every metric and send it to ``backend``."""
+        metrics, histograms = self.collect()
+        if not metrics and not histograms:
+            return
+        if backend is None:
+            backend = get_backend()
+        if metrics:
+            backend.send_metrics(metrics)
+        if histograms:
+            backend.send_histograms(histograms)
+
+    def _after_fork(self) -> None:
+        self._lock = threading.Lock()
+        for metric in self._metrics.values():
+            metric._after_fork()
+
+
+class RegistryFlushThread(threading.Thread):
+    """Daemon thread which flushes a registry every ``UPDATE_INTERVAL`` seconds."""
+
+    def __init__(self, registry: MetricsRegistry) -> None:
+        super().__init__(name="thelabinstrumentation-metrics-flush", daemon=True)
+        self.registry = registry
+        self.scheduler = IntervalScheduler(
+            config.update_interval, jitter=config.update_jitter
+        )
+
+    def run(self) -> None:
+        # The backend is only looked up once there's something to flush, so a
+        # short-lived process never builds one.
+        while self.scheduler.wait():
+            try:
+                self.registry.flush()
+            except Exception:
+                logger.exception("Error flushing metrics registry")
+                sentry_sdk.capture_exception()
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Stop flushing and wait for the thread to exit."""
+        self.scheduler.stop()
+        if self.is_alive():
+            self.join(timeout)
+
+
+# Default registry, flushed by a single process-wide background thread.
+registry = MetricsRegistry()
+
+_flush_thread: RegistryFlushThread | None = None
+_flush_thread_lock = threading.Lock()
+
+# Whether the current fork is RQ spawning a work horse, set just before forking
+# by ``rq.daemon``. A work horse only lives for one job and exits through
+# ``os._exit``, so it never runs a flusher: ``rq.daemon`` flushes the registry
+# when the job ends instead.
+_forking_work_horse = False
+_work_horse = False
+
+
+def flush() -> None:
+    """Publish everything recorded in the default registry now."""
+    try:
+        registry.flush()
+    except Exception:
+        logger.exception("Error flushing metrics registry")
+
+
+def ensure_flush_thread_running() -> RegistryFlushThread | None:
+    global _flush_thread
+    if _work_horse:
+        return None
+    thread = _flush_thread
+    if thread is not None and thread.is_alive():
+        return thread
+    with _flush_thread_lock:
+        if _flush_thread is None:
+            atexit.register(flush)
+        if _flush_thread is None or not _flush_thread.is_alive():
+            _flush_thread = RegistryFlushThread(registry)
+            _flush_thread.start()
+        return _flush_thread
+
+
+def _restart_after_fork() -> None:
+    # Threads don't survive a fork, so a child of a process which was flushing
+    # (e.g. a preforked web worker) starts its own flusher, unless it's an RQ
+    # work horse.
+    global _flush_thread, _flush_thread_lock, _work_horse
+    _flush_thread_lock = threading.Lock()
+    registry._after_fork()
+    _work_horse = _forking_work_horse
+    if _work_horse:
+        _flush_thread = None
+    elif _flush_thread is not None:
+        ensure_flush_thread_running()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_after_fork)
+
+
+def counter(
+    name: str,
+    dimensions: dict[str, str] | None = None,
+    unit: StandardUnitType = "Count",
+) -> Counter:
+    """Get or create a counter in the default registry."""
+    ensure_flush_thread_running()
+    return registry.counter(name, dimensions, unit)
+
+
+def gauge(
+    name: str,
+    dimensions: dict[str, str] | None = None,
+    unit: StandardUnitType = "None",
+) -> Gauge:
+    """Get or create a gauge in the default registry."""
+    ensure_flush_thread_running()
+    return registry.gauge(name, dimensions, unit)
+
+
+def timer(name: str, dimensions: dict[str, str] | None = None) -> Timer:
+    """Get or create a timer in the default registry."""
+    ensure_flush_thread_running()
+    return registry.timer(name, dimensions)
@@ -7,6 +7,9 @@ class ThelabInstrumentationRqConfig(AppConfig):
 
     def ready(self) -> None:
         """Initialize RQ monitoring when Django starts."""
+        from ..conf import config
         from .daemon import ensure_bg_sender_thread_running
 
-        ensure_bg_sender_thread_running()
+        # Disabled when metrics are published by the rq_metrics_exporter command.
+        if config.rq_in_process_sender:
+            ensure_bg_sender_thread_running()
@@ -1,31 +1,189 @@
-from threading import local
+from collections.abc import Sequence
+from itertools import islice
+from types import FrameType
+from typing import Any
+import atexit
 import logging
+import os
+import sys
 import threading
-import time
 
+from redis import Redis
 from redis.exceptions import ConnectionError as RedisConnectionError
-from rq import Worker
+from rq import Queue
+from rq.job import Job
+from rq.utils import as_text, str_to_date
+from rq.utils import now as rq_now
+from rq.worker import BaseWorker, WorkerStatus
+from rq.worker_registration import WORKERS_BY_QUEUE_KEY
 import django_rq
 import sentry_sdk
 
+from .. import metrics
 from ..backends import MetricData, MetricsBackend, get_backend
+from ..backends.factory import reset_backends
 from ..conf import config
+from ..scheduling import IntervalScheduler
+from .leader import RedisLease
 
 logger = logging.getLogger(__name__)
 
-_threadlocals = local()
-
 # Max backoff multiplier when Redis is unavailable (caps at ~5 minutes with default 60s interval)
 _MAX_BACKOFF_MULTIPLIER = 5
 
+# Redis key holding the lease of the process which publishes RQ metrics.
+LEADER_LEASE_KEY = "thelabinstrumentation:rq-metrics:leader"
+
+
+# Job registries whose sizes are published, by metric name.
+_REGISTRIES = ("finished", "started", "failed", "deferred", "scheduled")
+
+
+def _registry_keys(queue: Queue) -> list[str]:
+    return [
+        queue.finished_job_registry.key,
+        queue.started_job_registry.key,
+        queue.failed_job_registry.key,
+        queue.deferred_job_registry.key,
+        queue.scheduled_job_registry.key,
+    ]
+
+
+class _QueueStats:
+    """Raw readings for one queue, collected from Redis."""
+
+    def __init__(
+        self,
+        queue: Queue,
+        queued_jobs: int,
+        worker_keys: list[str],
+        registry_sizes: dict[str, int],
+        oldest_job_id: str | None,
+    ) -> None:
+        self.queue = queue
+        self.queued_jobs = queued_jobs
+        self.worker_keys = worker_keys
+        self.num_workers = len(worker_keys)
+        self.registry_sizes = registry_sizes
+        self.oldest_job_id = oldest_job_id
+        self.oldest_job_age = 0.0
+        self.throughput: int | None = None
+        self.busy_workers = 0
+        self.in_flight_job_age = 0.0
+
+    def to_metrics(self) -> list[MetricData]:
+        dimensions = {
+            "QueueName": self.queue.name,
+        }
+        queued_per_worker = (
+            float(self.queued_jobs) / float(self.num_workers)
+            if self.num_workers > 0
+            else 0
+        )
+        batch: list[MetricData] = [
+            {
+                "name": "rq.queued-jobs",
+                "value": self.queued_jobs,
+                "unit": "Count",
+                "dimensions": dimensions,
+            },
+        ]
+        for registry, size in self.registry_sizes.items():
+            batch.append(
+                {
+                    "name": f"rq.{registry}-jobs",
+                    "value": size,
+                    "unit": "Count",
+                    "dimensions": dimensions,
+                }
+            )
+        batch.append(
+            {
+                "name": "rq.workers",
+                "value": self.num_workers,
+                "unit": "Count",
+                "dimensions": dimensions,
+            }
+        )
+        batch.append(
+            {
+                "name": "rq.queued-jobs-per-worker",
+                "value": queued_per_worker,
+                "unit": "Count",
+                "dimensions": dimensions,
+            }
+        )
+        batch.append(
+            {
+                "name": "rq.busy-workers",
+                "value": self.busy_workers,
+                "unit": "Count",
+                "dimensions": dimensions,
+            }
+        )
+        batch.append(
+            {
+                "name": "rq.worker-utilization",
+                "value": (
+                    100.0 * self.busy_workers / self.num_workers
+                    if self.num_workers > 0
+                    else 0
+                ),
+                "unit": "Percent",
+                "dimensions": dimensions,
+            }
+        )
+        batch.append(
+            {
+                "name": "rq.in-flight-job-age",
+                "value": self.in_flight_job_age,
+                "unit": "Seconds",
+                "dimensions": dimensions,
+            }
+        )
+        batch.append(
+            {
+                "name": "rq.oldest-job-age",
+                "value": self.oldest_job_age,
+                "unit": "Seconds",
+                "dimensions": dimensions,
+            }
+        )
+        if self.throughput is not None:
+            batch.append(
+                {
+                    "name": "rq.throughput",
+                    "value": self.throughput,
+                    "unit": "Count",
+                    "dimensions": dimensions,
+                }
+            )
+        return batch
+
 
 class BackgroundMetricsSenderThread(threading.Thread):
+    def __init__(self, *args: Any, wait_first: bool = False, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        # Wait for the first interval boundary before publishing, e.g. in a
+        # forked child whose parent has only just published.
+        self.wait_first = wait_first
+        self.collector = RQMetricsCollector()
+        self.scheduler = IntervalScheduler(
+            config.update_interval, jitter=config.update_jitter
+        )
+
     def run(self) -> None:
+        # The backend and lease are only created once the first wait is over,
+        # so a short-lived child never connects to anything.
+        if self.wait_first and not self.scheduler.wait():
+            return
         backend = get_backend()
+        lease = self.get_lease()
         consecutive_conn_failures = 0
-        while True:
+        while not self.scheduler.stopped:
             try:
-                self.send_metrics(backend)
+                if lease is None or lease.refresh():
+                    self.send_metrics(backend)
                 consecutive_conn_failures = 0
             except (RedisConnectionError, ConnectionError):
                 consecutive_conn_failures += 1
@@ -41,63 +199,286 @@ class BackgroundMetricsSenderThread(threading.Thread):
                 logger.exception("Error sending RQ metrics")
                 sentry_sdk.capture_exception()
             backoff = min(consecutive_conn_failures, _MAX_BACKOFF_MULTIPLIER)
-            time.sleep(config.update_interval * max(1, backoff))
+            if not self.scheduler.wait(max(1, backoff)):
+                break
+        if lease is not None:
+            lease.release()
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Stop publishing, hand over the lease and wait for the thread to exit."""
+        self.scheduler.stop()
+        if self.is_alive():
+            self.join(timeout)
+
+    def get_lease(self) -> RedisLease | None:
+        """Lease which elects the single process publishing RQ metrics.
+
+        Returns ``None`` when leader election is disabled, in which case every
+        process publishes.
+        """
+        return get_leader_lease()
 
     def send_metrics(self, backend: MetricsBackend) -> None:
-        queues = django_rq.queues.get_queues()  # type:ignore[no-untyped-call]
+        backend.send_metrics(self.collector.collect())
+
+
+class RQMetricsCollector:
+    """Reads RQ queue, registry and worker statistics from Redis.
+
+    ``queue_names`` limits collection to those queues; by default the queues
+    returned by ``django_rq.queues.get_queues()`` are read. The collector keeps
+    the state needed between collections (the workers' job counts, for
+    throughput), so reuse one instance for every collection.
+    """
+
+    def __init__(self, queue_names: Sequence[str] | None = None) -> None:
+        self.queue_names = list(queue_names) if queue_names is not None else None
+        # Jobs each worker had completed at the previous collection, or None
+        # before the first. Throughput is the growth of these counters, which
+        # costs the same whatever the size of the finished registries.
+        self._job_counts: dict[str, int] | None = None
+
+    def get_queues(self) -> list[Queue]:
+        if self.queue_names is None:
+            return django_rq.queues.get_queues()  # type:ignore[no-any-return,no-untyped-call]
+        return [django_rq.get_queue(name) for name in self.queue_names]
+
+    def collect(self) -> list[MetricData]:
+        """Read the metrics of every queue, one connection at a time."""
         batch: list[MetricData] = []
+        for connection, connection_queues in _group_by_connection(self.get_queues()):
+            batch += self.collect_metrics(connection, connection_queues)
+        return batch
+
+    def collect_metrics(
+        self, connection: Redis, queues: list[Queue]
+    ) -> list[MetricData]:
+        """Read the metrics of queues sharing a connection in three round trips.
+
+        The first pipeline reads every queue's length, worker keys, registry
+        sizes and oldest job ID. The second reads when those oldest jobs were
+        enqueued, and the state, current job and job counts of every worker.
+        The third reads when the workers' current jobs started.
+        """
+        pipeline = connection.pipeline(transaction=False)
         for queue in queues:
-            dimensions = {
-                "QueueName": queue.name,
-            }
-            queued_jobs = queue.count
-            num_workers = Worker.count(queue=queue)
-            finished_jobs = queue.finished_job_registry.get_job_count(
-                cleanup=False,
-            )
-            queued_per_worker = (
-                float(queued_jobs) / float(num_workers) if num_workers > 0 else 0
-            )
-            batch.append(
-                {
-                    "name": "rq.queued-jobs",
-                    "value": queued_jobs,
-                    "unit": "Count",
-                    "dimensions": dimensions,
-                }
-            )
-            batch.append(
-                {
-                    "name": "rq.finished-jobs",
-                    "value": finished_jobs,
-                    "unit": "Count",
-                    "dimensions": dimensions,
-                }
-            )
-            batch.append(
-                {
-                    "name": "rq.workers",
-                    "value": num_workers,
-                    "unit": "Count",
-                    "dimensions": dimensions,
-                }
+            pipeline.llen(queue.key)
+            pipeline.smembers(WORKERS_BY_QUEUE_KEY % queue.name)
+            for registry_key in _registry_keys(queue):
+                pipeline.zcard(registry_key)
+            pipeline.lindex(queue.key, 0)
+        results = iter(pipeline.execute())
+        stats: list[_QueueStats] = []
+        for queue in queues:
+            queued_jobs, worker_keys = next(results), next(results)
+            registry_sizes = list(islice(results, len(_REGISTRIES)))
+            oldest_job_id = next(results)
+            stats.append(
+                _QueueStats(
+                    queue=queue,
+                    queued_jobs=queued_jobs,
+                    worker_keys=sorted(as_text(key) for key in worker_keys),
+                    registry_sizes=dict(zip(_REGISTRIES, registry_sizes)),
+                    oldest_job_id=as_text(oldest_job_id) if oldest_job_id else None,
+                )
             )
-            batch.append(
-                {
-                    "name": "rq.queued-jobs-per-worker",
-                    "value": queued_per_worker,
-                    "unit": "Count",
-                    "dimensions": dimensions,
-                }
+        if not stats:
+            return []
+        job_class = queues[0].job_class
+
+        # Workers often listen on several queues, so each is only read once.
+        worker_keys = sorted({key for s in stats for key in s.worker_keys})
+        now = rq_now()
+        oldest = [
+            (queue_stats, queue_stats.oldest_job_id)
+            for queue_stats in stats
+            if queue_stats.oldest_job_id is not None
+        ]
+        current_jobs: dict[str, str] = {}
+        job_counts: dict[str, int] = {}
+        if oldest or worker_keys:
+            pipeline = connection.pipeline(transaction=False)
+            for _, job_id in oldest:
+                pipeline.hget(job_class.key_for(job_id), "enqueued_at")
+            for worker_key in worker_keys:
+                pipeline.hmget(
+                    worker_key,
+                    [
+                        "state",
+                        "current_job",
+                        "successful_job_count",
+                        "failed_job_count",
+                    ],
+                )
+            results = iter(pipeline.execute())
+            for (queue_stats, _), enqueued_at in zip(oldest, results):
+                if enqueued_at:
+                    age = (now - str_to_date(enqueued_at)).total_seconds()
+                    queue_stats.oldest_job_age = max(0.0, age)
+            for worker_key, (state, current_job, successful, failed) in zip(
+                worker_keys, results
+            ):
+                if state and as_text(state) == WorkerStatus.BUSY and current_job:
+                    current_jobs[worker_key] = as_text(current_job)
+                job_counts[worker_key] = int(successful or 0) + int(failed or 0)
+        self._set_throughput(stats, job_counts)
+
+        job_ages: dict[str, float] = {}
+        if current_jobs:
+            pipeline = connection.pipeline(transaction=False)
+            for job_id in current_jobs.values():
+                pipeline.hget(job_class.key_for(job_id), "started_at")
+            for worker_key, started_at in zip(current_jobs, pipeline.execute()):
+                job_ages[worker_key] = (
+                    max(0.0, (now - str_to_date(started_at)).total_seconds())
+                    if started_at
+                    else 0.0
+                )
+        for queue_stats in stats:
+            ages = [job_ages[key] for key in queue_stats.worker_keys if key in job_ages]
+            queue_stats.busy_workers = len(ages)
+            queue_stats.in_flight_job_age = max(ages, default=0.0)
+
+        batch: list[MetricData] = []
+        for queue_stats in stats:
+            batch += queue_stats.to_metrics()
+        return batch
+
+    def _set_throughput(
+        self, stats: list[_QueueStats], job_counts: dict[str, int]
+    ) -> None:
+        """Count the jobs each queue's workers completed since the last collection.
+
+        Workers only count jobs in total, so a worker listening on several
+        queues counts towards each of them. Workers which started since the
+        previous collection count every job they completed, and those which
+        stopped since lose the jobs they completed after it.
+        """
+        previous, self._job_counts = self._job_counts, job_counts
+        if previous is None:
+            return
+        completed = {
+            # A lower count means a restarted worker reused the name.
+            key: count - previous.get(key, 0)
+            if count >= previous.get(key, 0)
+            else count
+            for key, count in job_counts.items()
+        }
+        for queue_stats in stats:
+            queue_stats.throughput = sum(
+                completed[key] for key in queue_stats.worker_keys if key in completed
             )
-        backend.send_metrics(batch)
+
+
+def get_leader_lease() -> RedisLease | None:
+    """Lease electing the single process which publishes RQ metrics.
+
+    Returns ``None`` when ``RQ_LEADER_ELECTION`` is disabled.
+    """
+    if not config.rq_leader_election:
+        return None
+    connection = django_rq.get_connection()
+    lease = RedisLease(connection, LEADER_LEASE_KEY, config.rq_leader_lease_ttl)
+    # Hand over leadership immediately on a clean shutdown.
+    atexit.register(lease.release)
+    return lease
+
+
+def _group_by_connection(queues: list[Queue]) -> list[tuple[Redis, list[Queue]]]:
+    """Group queues by the Redis server and database they live in.
+
+    django-rq gives every queue its own client, so queues are grouped by the
+    connection parameters rather than by client identity.
+    """
+    groups: dict[tuple[object, ...], tuple[Redis, list[Queue]]] = {}
+    for queue in queues:
+        connection = queue.connection
+        pool = connection.connection_pool
+        kwargs = pool.connection_kwargs
+        key = (
+            pool.connection_class,
+            kwargs.get("host"),
+            kwargs.get("port"),
+            kwargs.get("path"),
+            kwargs.get("db"),
+            kwargs.get("username"),
+        )
+        groups.setdefault(key, (connection, []))[1].append(queue)
+    return list(groups.values())
+
+
+# The process-wide sender thread. Like backend instances, it belongs to a
+# single process: a forked child may start its own (see ``_restart_after_fork``).
+_bg_thread: BackgroundMetricsSenderThread | None = None
+_bg_thread_lock = threading.Lock()
+
+# The worker spawning a work horse when the current fork is one, set just
+# before forking.
+_forking_work_horse: BaseWorker | None = None
 
 
 def ensure_bg_sender_thread_running() -> BackgroundMetricsSenderThread:
-    if (
-        not hasattr(_threadlocals, "bg_thread")
-        or not _threadlocals.bg_thread.is_alive()
-    ):
-        _threadlocals.bg_thread = BackgroundMetricsSenderThread(daemon=True)
-        _threadlocals.bg_thread.start()
-    return _threadlocals.bg_thread  # type:ignore[no-any-return]
+    global _bg_thread
+    thread = _bg_thread
+    if thread is not None and thread.is_alive():
+        return thread
+    with _bg_thread_lock:
+        if _bg_thread is None or not _bg_thread.is_alive():
+            _bg_thread = BackgroundMetricsSenderThread(daemon=True)
+            _bg_thread.start()
+        return _bg_thread
+
+
+def _work_horse_worker() -> BaseWorker | None:
+    """The worker whose ``fork_work_horse`` the calling thread is inside, if any."""
+    frame: FrameType | None = sys._getframe(1)
+    while frame is not None:
+        worker = frame.f_locals.get("self")
+        if frame.f_code.co_name == "fork_work_horse" and isinstance(worker, BaseWorker):
+            return worker
+        frame = frame.f_back
+    return None
+
+
+def _before_fork() -> None:
+    global _forking_work_horse
+    _forking_work_horse = _work_horse_worker()
+    metrics._forking_work_horse = _forking_work_horse is not None
+
+
+def _flush_metrics_after_job(worker: BaseWorker) -> None:
+    """Publish the metrics a work horse recorded once its job ends.
+
+    Work horses exit through ``os._exit``, which skips ``atexit`` hooks, so the
+    registry is flushed and the backends closed (flushing any buffers) as soon
+    as ``perform_job`` returns.
+    """
+    perform_job = worker.perform_job
+
+    def perform_job_and_flush(job: Job, queue: Queue) -> bool:
+        try:
+            return perform_job(job, queue)
+        finally:
+            metrics.flush()
+            reset_backends()
+
+    worker.perform_job = perform_job_and_flush  # type: ignore[method-assign]
+
+
+def _restart_after_fork() -> None:
+    # Threads don't survive a fork. When the sender was started before forking
+    # (e.g. from ``AppConfig.ready`` in a preloading gunicorn master), the
+    # child only starts its own if RQ_RESTART_SENDER_AFTER_FORK opts in, and
+    # never in an RQ work horse, which only lives for the length of one job.
+    global _bg_thread, _bg_thread_lock
+    _bg_thread_lock = threading.Lock()
+    parent_thread, _bg_thread = _bg_thread, None
+    if _forking_work_horse is not None:
+        _flush_metrics_after_job(_forking_work_horse)
+    elif parent_thread is not None and config.rq_restart_sender_after_fork:
+        _bg_thread = BackgroundMetricsSenderThread(daemon=True, wait_first=True)
+        _bg_thread.start()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(before=_before_fork, after_in_child=_restart_after_fork)
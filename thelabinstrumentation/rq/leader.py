@@ -0,0 +1,92 @@
+"""Redis lease used to elect a single RQ metrics publisher per cluster."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+import logging
+import os
+import socket
+import uuid
+
+from redis import Redis
+from redis.client import Pipeline
+from redis.exceptions import RedisError, WatchError
+
+logger = logging.getLogger(__name__)
+
+
+class RedisLease:
+    """Exclusive, expiring lease on a Redis key.
+
+    The lease is taken with ``SET NX PX``, so at most one holder exists at a
+    time, and it expires on its own if the holder dies without releasing it.
+    Renewing and releasing are compare-and-set operations (``WATCH``/``MULTI``)
+    which only touch the key while it still holds this lease's token.
+    """
+
+    def __init__(self, connection: Redis, key: str, ttl: float) -> None:
+        self.connection = connection
+        self.key = key
+        self.ttl = ttl
+        self.held = False
+        self.reset()
+
+    def __repr__(self) -> str:
+        return f"<RedisLease {self.key} token={self.token} held={self.held}>"
+
+    @property
+    def _ttl_ms(self) -> int:
+        return max(1, int(self.ttl * 1000))
+
+    def reset(self) -> None:
+        """Forget the lease and pick a new token, e.g. in a forked child."""
+        self.held = False
+        self._pid = os.getpid()
+        self.token = f"{socket.gethostname()}:{self._pid}:{uuid.uuid4().hex}"
+
+    def refresh(self) -> bool:
+        """Renew the lease if it's held, otherwise try to acquire it.
+
+        Returns whether this process holds the lease.
+        """
+        if self._pid != os.getpid():
+            self.reset()
+        if self.held:
+            self.held = self._renew()
+            if not self.held:
+                logger.info("Lost lease %s", self.key)
+        if not self.held:
+            self.held = bool(
+                self.connection.set(self.key, self.token, nx=True, px=self._ttl_ms)
+            )
+            if self.held:
+                logger.info("Acquired lease %s", self.key)
+        return self.held
+
+    def release(self) -> None:
+        """Give up the lease, so another process can take over immediately."""
+        if self.held and self._pid == os.getpid():
+            try:
+                self._compare_and_set(lambda pipeline: pipeline.delete(self.key))
+            except RedisError:
+                logger.debug("Couldn't release lease %s", self.key, exc_info=True)
+        self.held = False
+
+    def _renew(self) -> bool:
+        return self._compare_and_set(
+            lambda pipeline: pipeline.pexpire(self.key, self._ttl_ms)
+        )
+
+    def _compare_and_set(self, command: Callable[[Pipeline], object]) -> bool:
+        with self.connection.pipeline() as pipeline:
+            try:
+                pipeline.watch(self.key)  # type:ignore[no-untyped-call]
+                value = pipeline.get(self.key)
+                if value not in (self.token, self.token.encode()):
+                    return False
+                pipeline.multi()
+                command(pipeline)
+                pipeline.execute()
+            except WatchError:
+                return False
+        return True
@@ -0,0 +1,138 @@
+from typing import Any
+import asyncio
+import contextlib
+import logging
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from redis.exceptions import ConnectionError as RedisConnectionError
+import sentry_sdk
+
+from ....backends import MetricsBackend, get_backend
+from ....conf import config
+from ....scheduling import IntervalScheduler
+from ...daemon import (
+    _MAX_BACKOFF_MULTIPLIER,
+    LEADER_LEASE_KEY,
+    RQMetricsCollector,
+    get_leader_lease,
+)
+from ...leader import RedisLease
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Publish RQ queue metrics from a dedicated process. Set "
+        "RQ_IN_PROCESS_SENDER to False so that web and worker processes don't "
+        "also poll Redis."
+    )
+
+    stop_event: asyncio.Event
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--interval",
+            type=float,
+            help="Seconds between collections (default: UPDATE_INTERVAL).",
+        )
+        parser.add_argument(
+            "--queue",
+            action="append",
+            dest="queues",
+            metavar="NAME",
+            help="Only publish this queue; repeat for several (default: every "
+            "queue in RQ_QUEUES).",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Publish once and exit, e.g. from cron or a Kubernetes Job. "
+            "Fails if another process holds the leader lease.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        interval: float = options["interval"] or config.update_interval
+        if interval <= 0:
+            raise CommandError("--interval must be positive")
+        queue_names: list[str] = options["queues"] or list(settings.RQ_QUEUES)
+        unknown = sorted(set(queue_names) - set(settings.RQ_QUEUES))
+        if unknown:
+            raise CommandError(f"Unknown RQ queues: {', '.join(unknown)}")
+        collector = RQMetricsCollector(queue_names)
+        asyncio.run(self.export(collector, interval, once=options["once"]))
+
+    async def export(
+        self, collector: RQMetricsCollector, interval: float, once: bool = False
+    ) -> None:
+        """Publish metrics every ``interval`` seconds until stopped.
+
+        Redis is read, and metrics are sent with the configured ``BACKEND``,
+        from worker threads, so the event loop stays free to handle
+        ``SIGTERM``. With ``once``, a lease held by another process is an
+        error, so a scheduled run which publishes nothing doesn't pass as a
+        success.
+        """
+        self.stop_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        signals = (signal.SIGINT, signal.SIGTERM)
+        for signum in signals:
+            # Not available on Windows, or outside the main thread.
+            with contextlib.suppress(NotImplementedError, RuntimeError, ValueError):
+                loop.add_signal_handler(signum, self.stop_event.set)
+        backend = get_backend()
+        lease = await asyncio.to_thread(get_leader_lease)
+        scheduler = IntervalScheduler(interval, jitter=config.update_jitter)
+        consecutive_conn_failures = 0
+        try:
+            while not self.stop_event.is_set():
+                try:
+                    published = await self.publish(collector, backend, lease)
+                    consecutive_conn_failures = 0
+                    if once and not published:
+                        raise CommandError(
+                            f"Another process holds {LEADER_LEASE_KEY}, so no RQ "
+                            "metrics were published. Disable RQ_IN_PROCESS_SENDER "
+                            "or RQ_LEADER_ELECTION."
+                        )
+                except (RedisConnectionError, ConnectionError):
+                    if once:
+                        raise
+                    consecutive_conn_failures += 1
+                    logger.warning("Redis unavailable, skipping RQ metrics")
+                except Exception:
+                    if once:
+                        raise
+                    consecutive_conn_failures = 0
+                    logger.exception("Error sending RQ metrics")
+                    sentry_sdk.capture_exception()
+                if once:
+                    break
+                backoff = min(consecutive_conn_failures, _MAX_BACKOFF_MULTIPLIER)
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(
+                        self.stop_event.wait(), scheduler.next_delay(max(1, backoff))
+                    )
+        finally:
+            for signum in signals:
+                with contextlib.suppress(NotImplementedError, RuntimeError):
+                    loop.remove_signal_handler(signum)
+            if lease is not None:
+                await asyncio.to_thread(lease.release)
+
+    async def publish(
+        self,
+        collector: RQMetricsCollector,
+        backend: MetricsBackend,
+        lease: RedisLease | None,
+    ) -> bool:
+        """Collect and send one batch, if this process holds the lease."""
+        if lease is not None and not await asyncio.to_thread(lease.refresh):
+            logger.debug("Another process holds %s, skipping RQ metrics", lease.key)
+            return False
+        metrics = await asyncio.to_thread(collector.collect)
+        await asyncio.to_thread(backend.send_metrics, metrics)
+        logger.debug("Published %d RQ metrics", len(metrics))
+        return True
@@ -0,0 +1,78 @@
+"""Drift-free interval scheduling for background metric loops."""
+
+import logging
+import math
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class IntervalScheduler:
+    """Wake a loop on wall-clock interval boundaries.
+
+    Each :meth:`wait` sleeps until the next multiple of ``interval`` seconds
+    since the epoch (plus a fixed per-scheduler offset of up to ``jitter``
+    seconds, so that many processes don't all wake at once). Because the
+    deadline is derived from the clock rather than from when the work
+    finished, the time spent collecting and publishing doesn't accumulate as
+    drift. When the work overruns one or more boundaries, those ticks are
+    skipped rather than run back-to-back.
+
+    The sleep itself waits on an event, so :meth:`stop` wakes the loop
+    immediately.
+    """
+
+    def __init__(self, interval: float, jitter: float = 0.0) -> None:
+        if interval <= 0:
+            raise ValueError(f"interval must be positive, not {interval!r}")
+        self.interval = interval
+        self.offset = random.uniform(0, min(jitter, interval)) if jitter else 0.0
+        self.skipped = 0
+        self._stop_event = threading.Event()
+        self._last_tick: int | None = None
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop_event.is_set()
+
+    def stop(self) -> None:
+        """Wake any pending :meth:`wait` and make every later call return False."""
+        self._stop_event.set()
+
+    def _tick(self, now: float) -> int:
+        return math.floor((now - self.offset) / self.interval)
+
+    def next_delay(self, periods: int = 1) -> float:
+        """Seconds until the ``periods``-th next interval boundary.
+
+        Call this once per wakeup, e.g. to sleep with ``asyncio.sleep``.
+        """
+        now = time.time()
+        tick = self._tick(now)
+        if self._last_tick is not None:
+            if tick > self._last_tick:
+                # The work since the previous wakeup ran past one or more
+                # boundaries.
+                overrun = tick - self._last_tick
+                self.skipped += overrun
+                logger.debug(
+                    "Overran %d interval boundaries of %ss, skipping ahead",
+                    overrun,
+                    self.interval,
+                )
+            # Never schedule the same boundary twice, even if the sleep
+            # ended a little early.
+            tick = max(tick, self._last_tick)
+        self._last_tick = tick + max(1, periods)
+        return max(0.0, (self._last_tick * self.interval) + self.offset - now)
+
+    def wait(self, periods: int = 1) -> bool:
+        """Sleep until the ``periods``-th next interval boundary.
+
+        Returns False if the scheduler was stopped, and True otherwise.
+        """
+        # Event.wait times out on the monotonic clock, so wall-clock jumps
+        # during the sleep don't stretch or shorten it.
+        return not self._stop_event.wait(self.next_delay(periods))
@@ -13,11 +13,10 @@ class HeaderBindingMiddleware:
         self.get_response = get_response
 
     def __call__(self, request: HttpRequest) -> HttpResponse:
-        headers = config.structlog_request_headers
+        meta = request.META
         bindings: dict[str, str] = {}
-        for header_name, context_key in headers.items():
-            meta_key = "HTTP_" + header_name.upper().replace("-", "_")
-            value = request.META.get(meta_key)
+        for meta_key, context_key in config.snapshot.structlog_request_meta_keys:
+            value = meta.get(meta_key)
             if value is not None:
                 bindings[context_key] = value
         if bindings:
@@ -15,26 +15,74 @@ because each patch wraps whatever function is already installed via a closure.
 Query parameter values are redacted from logged URLs to prevent leaking API
 keys, tokens, or PII into log aggregation systems.
 
+High-volume callers can be sampled: each request is kept with the configured
+probability (per host or method, ``OUTGOING_HTTP_SAMPLE_RATES``) and within a
+per-host rate limit (``OUTGOING_HTTP_RATE_LIMIT``). Failed requests, and those
+slower than ``OUTGOING_HTTP_SLOW_MS``, are always logged. Unsampled requests
+skip URL reconstruction and redaction entirely.
+
+Connection setup and transfer are timed by phase: TCP connect, TLS handshake,
+time to first byte and body transfer, plus the bytes received. urllib3 is
+hooked at connection creation and response reading, and httpx through its
+``trace`` request extension. With ``OUTGOING_HTTP_LOG_BODY``, bodies read after
+``urlopen``/``send`` returns (``preload_content=False``, httpx streaming) are
+reported in a separate ``outgoing_http_request.body`` event once fully read or
+closed.
+
+With ``OUTGOING_HTTP_METRICS`` enabled, every request (sampled or not) is also
+counted and timed in the :mod:`~thelabinstrumentation.metrics` registry, by
+host, method and status class, and published with the other registry metrics.
+Body transfer time and size are recorded there too, however late the body is
+read, so they're measured even when the ``.body`` event is off.
+
 Call :func:`install` once at app startup (e.g. in ``AppConfig.ready``).
 """
 
 from __future__ import annotations
 
+from collections.abc import Callable, Generator
+from contextvars import ContextVar
 from typing import Any
+import functools
+import itertools
+import os
+import random
+import re
+import socket
 import threading
 import time
 import urllib.parse
-import uuid
 
 import structlog
 
+from .. import metrics
+from ..conf import ConfigSnapshot
 from ..conf import config as instrumentation_config
 
 logger = structlog.get_logger(__name__)
 
-_new_uuid = uuid.uuid7 if hasattr(uuid, "uuid7") else uuid.uuid4
+# Request IDs are a random per-process prefix plus a counter: unique across
+# processes (the prefix is regenerated in forked children) and threads
+# (``next`` on a ``count`` is atomic), without a UUID per request.
+_request_id_prefix = os.urandom(6).hex()
+_request_ids = itertools.count(1)
+
+
+def _new_request_id() -> str:
+    return f"{_request_id_prefix}-{next(_request_ids)}"
+
+
+def _reset_request_ids_after_fork() -> None:
+    global _request_id_prefix, _request_ids
+    _request_id_prefix = os.urandom(6).hex()
+    _request_ids = itertools.count(1)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_request_ids_after_fork)
 
 _installed_urllib3 = False
+_installed_urllib3_phase_hooks = False
 _installed_httpx = False
 
 _DEFAULT_PORTS: dict[str, int] = {
@@ -42,6 +90,22 @@ _DEFAULT_PORTS: dict[str, int] = {
     "https": 443,
 }
 
+# URLs which urlsplit/urlunsplit round-trip unchanged: lowercase http(s) with
+# a host, or a path which isn't protocol-relative.
+_PLAIN_URL = re.compile(r"https?://[^/?#]|/(?!/)")
+
+# Attribute linking a urllib3 response to the request which received it.
+_REQUEST_ATTR = "_thelab_outgoing_request"
+
+# Upper bound on the number of hosts with a rate limiter.
+_MAX_RATE_LIMITERS = 1024
+
+# Upper bound on the number of cached (host, method, status class) metrics.
+_MAX_CALL_METRICS = 4096
+
+# Host dimension of the metrics of hosts which don't get their own.
+_OTHER_HOST = "other"
+
 
 def _build_url(scheme: str, host: str, port: int | None, path: str) -> str:
     """Reconstruct the full URL from pool attributes and the request path.
@@ -57,8 +121,21 @@ def _build_url(scheme: str, host: str, port: int | None, path: str) -> str:
     return f"{scheme}://{host}:{port}{path}"
 
 
-def _redact_url(url: str) -> str:
-    """Replace query parameter values with [REDACTED]."""
+@functools.lru_cache(maxsize=1024)
+def _redact_key(key: str) -> str:
+    """Normalize a raw query key as ``parse_qsl`` and ``urlencode`` would."""
+    return urllib.parse.quote_plus(urllib.parse.unquote_plus(key))
+
+
+def _redact_query(query: str) -> str:
+    return "&".join(
+        f"{_redact_key(part.partition('=')[0])}=REDACTED"
+        for part in query.split("&")
+        if part
+    )
+
+
+def _redact_url_slow(url: str) -> str:
     parsed = urllib.parse.urlsplit(url)
     if not parsed.query:
         return url
@@ -67,14 +144,60 @@ def _redact_url(url: str) -> str:
     return urllib.parse.urlunsplit(parsed._replace(query=redacted))
 
 
+def _redact_url(url: str) -> str:
+    """Replace query parameter values with [REDACTED].
+
+    Splits the URL in one pass when it's a plain absolute or path-relative
+    URL, which ``urlsplit``/``urlunsplit`` would round-trip unchanged; other
+    URLs take the ``urllib.parse`` path, so the output is the same either way.
+    """
+    query_start = url.find("?")
+    if query_start < 0:
+        return url
+    if not _PLAIN_URL.match(url) or not url.isprintable():
+        return _redact_url_slow(url)
+    fragment_start = url.find("#")
+    if fragment_start < 0:
+        query, fragment = url[query_start + 1 :], ""
+    elif fragment_start < query_start:
+        return url
+    else:
+        query = url[query_start + 1 : fragment_start]
+        fragment = url[fragment_start + 1 :]
+    if not query:
+        return url
+    redacted = _redact_query(query)
+    parts = [url[:query_start]]
+    if redacted:
+        parts += ("?", redacted)
+    if fragment:
+        parts += ("#", fragment)
+    return "".join(parts)
+
+
+@functools.lru_cache(maxsize=1024)
+def _pool_base_url(scheme: str, host: str, port: int | None, path: str) -> str:
+    """URL of a urllib3 request without its query, cached per endpoint."""
+    return _build_url(scheme, host, port, path)
+
+
+def _redacted_pool_url(scheme: str, host: str, port: int | None, path: str) -> str:
+    """Redacted URL of a urllib3 request.
+
+    The cache is keyed on the path without its query, so signed or
+    per-request query strings don't churn it.
+    """
+    path, separator, query = path.partition("?")
+    return _redact_url(_pool_base_url(scheme, host, port, path) + separator + query)
+
+
 def _ns_to_ms(ns: int) -> float:
     return round(ns / 1_000_000.0, 2)
 
 
 def _is_excluded(host: str) -> bool:
     """Check if the host is in the configured exclude list."""
-    exclude_hosts = instrumentation_config.outgoing_http_exclude_hosts
-    return host in exclude_hosts
+    return host in instrumentation_config.snapshot.outgoing_http_exclude_hosts
 
 
 def _make_common(
@@ -98,6 +221,375 @@ def _make_common(
     return common
 
 
+class _TokenBucket:
+    """Allows ``rate`` events per second, in bursts of up to ``burst``."""
+
+    __slots__ = ("burst", "last", "lock", "rate", "tokens")
+
+    def __init__(self, rate: float, burst: float) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self) -> bool:
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+_rate_limiters: dict[str, _TokenBucket] = {}
+_rate_limiters_snapshot: ConfigSnapshot | None = None
+_rate_limiters_lock = threading.Lock()
+
+
+def _within_rate_limit(host: str, snapshot: ConfigSnapshot) -> bool:
+    """Take a token from the host's bucket, if rate limiting is enabled."""
+    global _rate_limiters, _rate_limiters_snapshot
+    rate = snapshot.outgoing_http_rate_limit
+    if rate is None:
+        return True
+    limiter = _rate_limiters.get(host)
+    if limiter is None or _rate_limiters_snapshot is not snapshot:
+        with _rate_limiters_lock:
+            # Settings changed: start over with the new limits.
+            if _rate_limiters_snapshot is not snapshot:
+                _rate_limiters, _rate_limiters_snapshot = {}, snapshot
+            limiter = _rate_limiters.get(host)
+            if limiter is None:
+                if len(_rate_limiters) >= _MAX_RATE_LIMITERS:
+                    _rate_limiters.clear()
+                limiter = _rate_limiters[host] = _TokenBucket(
+                    rate, snapshot.outgoing_http_rate_limit_burst
+                )
+    return limiter.take()
+
+
+_CallMetrics = tuple[
+    metrics.Counter, metrics.Counter, metrics.Timer, metrics.Timer, metrics.Counter
+]
+_call_metrics: dict[tuple[str, str, str], _CallMetrics] = {}
+
+# Hosts which got their own metrics, under OUTGOING_HTTP_METRICS_MAX_HOSTS.
+_metric_hosts: set[str] = set()
+_metric_hosts_snapshot: ConfigSnapshot | None = None
+_metric_hosts_lock = threading.Lock()
+
+
+def _metric_host(host: str, snapshot: ConfigSnapshot) -> str:
+    """The Host dimension of a request's metrics.
+
+    Registry metrics are kept for the life of the process, so only allowed
+    hosts, or the first ``OUTGOING_HTTP_METRICS_MAX_HOSTS`` seen, get their
+    own; every other host shares the ``"other"`` dimension.
+    """
+    global _metric_hosts, _metric_hosts_snapshot
+    allowed = snapshot.outgoing_http_metrics_hosts
+    if allowed is not None:
+        return host if host in allowed else _OTHER_HOST
+    if host in _metric_hosts and _metric_hosts_snapshot is snapshot:
+        return host
+    with _metric_hosts_lock:
+        if _metric_hosts_snapshot is not snapshot:
+            _metric_hosts, _metric_hosts_snapshot = set(), snapshot
+        if host not in _metric_hosts:
+            if len(_metric_hosts) >= snapshot.outgoing_http_metrics_max_hosts:
+                return _OTHER_HOST
+            _metric_hosts.add(host)
+    return host
+
+
+def _status_class(status: int | None) -> str:
+    return "none" if status is None else f"{status // 100}xx"
+
+
+def _record_metrics(
+    host: str, method: str, status: int | None, duration_ms: float, success: bool
+) -> _CallMetrics:
+    """Count and time a request in the metrics registry.
+
+    Returns the request's metrics, so that its body can be recorded when it's
+    read later.
+    """
+    host = _metric_host(host, instrumentation_config.snapshot)
+    key = (host, method, _status_class(status))
+    bound = _call_metrics.get(key)
+    if bound is None:
+        dimensions = {"Host": host, "Method": method, "StatusClass": key[2]}
+        bound = (
+            metrics.counter("outgoing-http.requests", dimensions),
+            metrics.counter("outgoing-http.errors", dimensions),
+            metrics.timer("outgoing-http.duration", dimensions),
+            metrics.timer("outgoing-http.body-duration", dimensions),
+            metrics.counter("outgoing-http.response-bytes", dimensions, "Bytes"),
+        )
+        if len(_call_metrics) >= _MAX_CALL_METRICS:
+            _call_metrics.clear()
+        _call_metrics[key] = bound
+    requests, errors, duration, _, _ = bound
+    requests.inc()
+    if not success:
+        errors.inc()
+    duration.record(duration_ms)
+    return bound
+
+
+class _OutgoingRequest:
+    """Sampling decision, timing and log context of one outgoing request.
+
+    The sampling decision is made up front, so unsampled requests never log
+    ``.start``; their ``.done`` event is only logged if they fail or are slow.
+    Phase timings are accumulated by the connection and response hooks while
+    the request is the current one in its context.
+    """
+
+    __slots__ = (
+        "_bound_metrics",
+        "_bytes_read",
+        "_common",
+        "_phase_start_ns",
+        "_token",
+        "_url",
+        "body_end_ns",
+        "connect_ns",
+        "headers_ns",
+        "host",
+        "log_body",
+        "logged",
+        "method",
+        "metrics",
+        "proxy",
+        "response_bytes",
+        "sample_rate",
+        "sampled",
+        "slow_ms",
+        "start_ns",
+        "tls_ns",
+    )
+
+    def __init__(
+        self,
+        *,
+        method: str,
+        host: str,
+        url: Callable[[], str],
+        proxy: bool | None = None,
+    ) -> None:
+        snapshot = instrumentation_config.snapshot
+        self.method = method
+        self.host = host
+        self.proxy = proxy
+        self._url = url
+        self._common: dict[str, object] | None = None
+        rates = snapshot.outgoing_http_sample_rates
+        self.sample_rate = rates.get(
+            host, rates.get(method, snapshot.outgoing_http_sample_rate)
+        )
+        self.sampled = (
+            self.sample_rate >= 1 or random.random() < self.sample_rate
+        ) and _within_rate_limit(host, snapshot)
+        self.slow_ms = snapshot.outgoing_http_slow_ms
+        self.metrics = snapshot.outgoing_http_metrics
+        self.log_body = snapshot.outgoing_http_log_body
+        self.logged = False
+        self.connect_ns = 0
+        self.tls_ns = 0
+        self.headers_ns = 0
+        self.body_end_ns = 0
+        self.response_bytes: int | None = None
+        self._bytes_read: Callable[[], int] | None = None
+        self._bound_metrics: _CallMetrics | None = None
+        self._phase_start_ns = 0
+        if self.sampled and snapshot.outgoing_http_log_start:
+            logger.info("outgoing_http_request.start", **self.common)
+        self._token = _current_request.set(self)
+        self.start_ns = time.perf_counter_ns()
+
+    @property
+    def common(self) -> dict[str, object]:
+        if self._common is None:
+            self._common = _make_common(
+                method=self.method,
+                url=self._url(),
+                host=self.host,
+                proxy=self.proxy,
+                request_id=_new_request_id(),
+            )
+            if self.sample_rate < 1:
+                self._common["outgoing_http_sample_rate"] = self.sample_rate
+            if not self.sampled:
+                self._common["outgoing_http_sampled"] = False
+        return self._common
+
+    def _end(self) -> float:
+        _current_request.reset(self._token)
+        return _ns_to_ms(time.perf_counter_ns() - self.start_ns)
+
+    def timings(self) -> dict[str, object]:
+        """Durations of the phases seen so far, in milliseconds."""
+        timings: dict[str, object] = {}
+        if self.connect_ns:
+            timings["connect_ms"] = _ns_to_ms(self.connect_ns)
+        if self.tls_ns:
+            timings["tls_ms"] = _ns_to_ms(self.tls_ns)
+        if self.headers_ns:
+            # Sending the request and waiting for the response, excluding
+            # connection setup.
+            timings["ttfb_ms"] = _ns_to_ms(
+                self.headers_ns - self.start_ns - self.connect_ns - self.tls_ns
+            )
+            if self.body_end_ns:
+                timings["body_ms"] = _ns_to_ms(self.body_end_ns - self.headers_ns)
+                response_bytes = self._response_bytes()
+                if response_bytes is not None:
+                    timings["response_bytes"] = response_bytes
+        return timings
+
+    def _response_bytes(self) -> int | None:
+        if self.response_bytes is None and self._bytes_read is not None:
+            self.response_bytes = self._bytes_read()
+        return self.response_bytes
+
+    def _record_body_metrics(self) -> None:
+        assert self._bound_metrics is not None
+        _, _, _, body_duration, response_bytes = self._bound_metrics
+        body_duration.record(_ns_to_ms(self.body_end_ns - self.headers_ns))
+        received = self._response_bytes()
+        if received:
+            response_bytes.inc(received)
+
+    def failed(self, exc: Exception) -> None:
+        """Log a request which raised; these are always logged."""
+        duration_ms = self._end()
+        if self.metrics:
+            _record_metrics(self.host, self.method, None, duration_ms, False)
+        self.logged = True
+        logger.warning(
+            "outgoing_http_request.done",
+            **self.common,
+            **self.timings(),
+            outgoing_http_status=None,
+            duration_ms=duration_ms,
+            success=False,
+            error=type(exc).__name__,
+        )
+
+    def finished(
+        self, status: int, bytes_read: Callable[[], int] | None = None
+    ) -> None:
+        """Log a request's response, if it was sampled, failed, or was slow.
+
+        ``bytes_read`` returns the number of body bytes received, for bodies
+        which are read later.
+        """
+        duration_ms = self._end()
+        self._bytes_read = bytes_read
+        success = 200 <= status < 400
+        if self.metrics:
+            self._bound_metrics = _record_metrics(
+                self.host, self.method, status, duration_ms, success
+            )
+            if self.body_end_ns:
+                self._record_body_metrics()
+        if (
+            success
+            and not self.sampled
+            and (self.slow_ms is None or duration_ms < self.slow_ms)
+        ):
+            return
+        self.logged = True
+        log = logger.info if success else logger.warning
+        log(
+            "outgoing_http_request.done",
+            **self.common,
+            **self.timings(),
+            outgoing_http_status=status,
+            duration_ms=duration_ms,
+            success=success,
+        )
+
+    def body_finished(self, response_bytes: int | None = None) -> None:
+        """Record the end of the response body (read to the end, or closed).
+
+        With ``OUTGOING_HTTP_METRICS``, bodies read after the response was
+        recorded are recorded now. If the ``.done`` event was already logged
+        without the body, and ``OUTGOING_HTTP_LOG_BODY`` is set, the body's
+        timing is logged in a separate ``.body`` event.
+        """
+        if self.body_end_ns or not self.headers_ns:
+            return
+        self.body_end_ns = time.perf_counter_ns()
+        if response_bytes is not None:
+            self.response_bytes = response_bytes
+        if self._bound_metrics is not None:
+            self._record_body_metrics()
+        if self.logged and self.log_body:
+            logger.info(
+                "outgoing_http_request.body",
+                **self.common,
+                **self.timings(),
+                duration_ms=_ns_to_ms(self.body_end_ns - self.start_ns),
+            )
+
+    def trace(self, name: str) -> None:
+        """Record an httpx/httpcore trace event."""
+        event, _, stage = name.rpartition(".")
+        phase = event.rpartition(".")[2]
+        now = time.perf_counter_ns()
+        if stage == "started":
+            self._phase_start_ns = now
+        elif stage == "complete":
+            if phase.startswith("connect_"):
+                self.connect_ns += now - self._phase_start_ns
+            elif phase == "start_tls":
+                self.tls_ns += now - self._phase_start_ns
+            elif phase == "receive_response_headers":
+                self.headers_ns = now
+            elif phase == "receive_response_body":
+                self.body_finished()
+
+
+_current_request: ContextVar[_OutgoingRequest | None] = ContextVar(
+    "thelab_outgoing_request", default=None
+)
+
+
+class _HttpxTrace:
+    """httpx ``trace`` extension feeding a request's phase timings.
+
+    Chains to the trace callback the caller set, if any.
+    """
+
+    __slots__ = ("call", "previous")
+
+    def __init__(self, call: _OutgoingRequest, previous: Any) -> None:
+        self.call = call
+        # Don't chain to the trace of a previous send of the same request.
+        self.previous = getattr(previous, "previous", previous)
+
+    def __call__(self, name: str, info: dict[str, Any]) -> None:
+        self.call.trace(name)
+        if self.previous is not None:
+            self.previous(name, info)
+
+
+class _AsyncHttpxTrace(_HttpxTrace):
+    """Async variant of :class:`_HttpxTrace`, for ``httpx.AsyncClient``."""
+
+    __slots__ = ()
+
+    async def __call__(self, name: str, info: dict[str, Any]) -> None:  # type: ignore[override]
+        self.call.trace(name)
+        if self.previous is not None:
+            await self.previous(name, info)
+
+
 # ---------------------------------------------------------------------------
 # urllib3
 # ---------------------------------------------------------------------------
@@ -126,50 +618,128 @@ def _install_urllib3() -> None:
         if _is_excluded(self.host):
             return _original_urlopen(self, method, url, *args, **kwargs)
 
-        full_url = _redact_url(_build_url(self.scheme, self.host, self.port, url))
-        request_id = str(_new_uuid())
-        uses_proxy = getattr(self, "proxy", None) is not None
-
-        common = _make_common(
+        call = _OutgoingRequest(
             method=method,
-            url=full_url,
             host=self.host,
-            proxy=uses_proxy,
-            request_id=request_id,
+            url=lambda: _redacted_pool_url(self.scheme, self.host, self.port, url),
+            proxy=getattr(self, "proxy", None) is not None,
         )
-        logger.info("outgoing_http_request.start", **common)
-
-        start_ns = time.perf_counter_ns()
         try:
             response = _original_urlopen(self, method, url, *args, **kwargs)
         except Exception as exc:
-            duration_ms = _ns_to_ms(time.perf_counter_ns() - start_ns)
-            logger.warning(
-                "outgoing_http_request.done",
-                **common,
-                outgoing_http_status=None,
-                duration_ms=duration_ms,
-                success=False,
-                error=type(exc).__name__,
-            )
+            call.failed(exc)
             raise
-
-        duration_ms = _ns_to_ms(time.perf_counter_ns() - start_ns)
-        success = 200 <= response.status < 400
-        log = logger.info if success else logger.warning
-        log(
-            "outgoing_http_request.done",
-            **common,
-            outgoing_http_status=response.status,
-            duration_ms=duration_ms,
-            success=success,
-        )
+        call.finished(response.status, getattr(response, "tell", None))
         return response
 
     urllib3.connectionpool.HTTPConnectionPool.urlopen = _instrumented_urlopen  # type: ignore[method-assign]
+    _install_urllib3_phase_hooks()
     _installed_urllib3 = True
 
 
+def _install_urllib3_phase_hooks() -> None:
+    """Time connection setup and response reading for the current request."""
+    global _installed_urllib3_phase_hooks
+    if _installed_urllib3_phase_hooks:
+        return
+
+    import urllib3.connection
+    import urllib3.response
+
+    _original_new_conn = urllib3.connection.HTTPConnection._new_conn
+    _original_https_connect = urllib3.connection.HTTPSConnection.connect
+    _original_response_init = urllib3.response.HTTPResponse.__init__
+    _original_read = urllib3.response.HTTPResponse.read
+    _original_read1 = urllib3.response.HTTPResponse.read1
+    _original_read_chunked = urllib3.response.HTTPResponse.read_chunked
+    _original_close = urllib3.response.HTTPResponse.close
+
+    def _instrumented_new_conn(
+        self: urllib3.connection.HTTPConnection,
+    ) -> socket.socket:
+        call = _current_request.get()
+        if call is None:
+            return _original_new_conn(self)
+        start_ns = time.perf_counter_ns()
+        try:
+            return _original_new_conn(self)
+        finally:
+            call.connect_ns += time.perf_counter_ns() - start_ns
+
+    def _instrumented_https_connect(
+        self: urllib3.connection.HTTPSConnection,
+    ) -> None:
+        call = _current_request.get()
+        if call is None:
+            return _original_https_connect(self)
+        start_ns = time.perf_counter_ns()
+        connect_ns = call.connect_ns
+        try:
+            return _original_https_connect(self)
+        finally:
+            # Everything but the TCP connect: the TLS handshake, and the
+            # CONNECT request when tunnelling through a proxy.
+            elapsed_ns = time.perf_counter_ns() - start_ns
+            call.tls_ns += elapsed_ns - (call.connect_ns - connect_ns)
+
+    def _instrumented_response_init(
+        self: urllib3.response.HTTPResponse, *args: Any, **kwargs: Any
+    ) -> None:
+        # Responses are built once their headers are received, and read their
+        # body right away unless preload_content is False.
+        call = _current_request.get()
+        if call is not None:
+            call.headers_ns = time.perf_counter_ns()
+            setattr(self, _REQUEST_ATTR, call)
+        _original_response_init(self, *args, **kwargs)
+
+    def _body_read(
+        response: urllib3.response.HTTPResponse, read_bytes: int = 0
+    ) -> None:
+        call: _OutgoingRequest | None = getattr(response, _REQUEST_ATTR, None)
+        if call is not None and response.isclosed():
+            # Chunked reads don't count the bytes they pull in.
+            call.body_finished(max(response.tell(), read_bytes))
+
+    def _instrumented_read(
+        self: urllib3.response.HTTPResponse, *args: Any, **kwargs: Any
+    ) -> bytes:
+        data = _original_read(self, *args, **kwargs)
+        _body_read(self)
+        return data
+
+    def _instrumented_read1(
+        self: urllib3.response.HTTPResponse, *args: Any, **kwargs: Any
+    ) -> bytes:
+        data = _original_read1(self, *args, **kwargs)
+        _body_read(self)
+        return data
+
+    def _instrumented_read_chunked(
+        self: urllib3.response.HTTPResponse, *args: Any, **kwargs: Any
+    ) -> Generator[bytes]:
+        read_bytes = 0
+        for chunk in _original_read_chunked(self, *args, **kwargs):
+            read_bytes += len(chunk)
+            yield chunk
+        _body_read(self, read_bytes)
+
+    def _instrumented_close(self: urllib3.response.HTTPResponse) -> None:
+        call: _OutgoingRequest | None = getattr(self, _REQUEST_ATTR, None)
+        if call is not None:
+            call.body_finished(self.tell())
+        _original_close(self)
+
+    urllib3.connection.HTTPConnection._new_conn = _instrumented_new_conn  # type: ignore[method-assign]
+    urllib3.connection.HTTPSConnection.connect = _instrumented_https_connect  # type: ignore[method-assign]
+    urllib3.response.HTTPResponse.__init__ = _instrumented_response_init  # type: ignore[method-assign]
+    urllib3.response.HTTPResponse.read = _instrumented_read  # type: ignore[method-assign]
+    urllib3.response.HTTPResponse.read1 = _instrumented_read1  # type: ignore[method-assign]
+    urllib3.response.HTTPResponse.read_chunked = _instrumented_read_chunked  # type: ignore[method-assign]
+    urllib3.response.HTTPResponse.close = _instrumented_close  # type: ignore[method-assign]
+    _installed_urllib3_phase_hooks = True
+
+
 # ---------------------------------------------------------------------------
 # httpx
 # ---------------------------------------------------------------------------
@@ -197,42 +767,18 @@ def _install_httpx() -> None:
         if _is_excluded(host):
             return _original_send(self, request, **kwargs)
 
-        url = _redact_url(str(request.url))
-        request_id = str(_new_uuid())
-
-        common = _make_common(
+        call = _OutgoingRequest(
             method=request.method,
-            url=url,
             host=host,
-            request_id=request_id,
+            url=lambda: _redact_url(str(request.url)),
         )
-        logger.info("outgoing_http_request.start", **common)
-
-        start_ns = time.perf_counter_ns()
+        request.extensions["trace"] = _HttpxTrace(call, request.extensions.get("trace"))
         try:
             response = _original_send(self, request, **kwargs)
         except Exception as exc:
-            duration_ms = _ns_to_ms(time.perf_counter_ns() - start_ns)
-            logger.warning(
-                "outgoing_http_request.done",
-                **common,
-                outgoing_http_status=None,
-                duration_ms=duration_ms,
-                success=False,
-                error=type(exc).__name__,
-            )
+            call.failed(exc)
             raise
-
-        duration_ms = _ns_to_ms(time.perf_counter_ns() - start_ns)
-        success = 200 <= response.status_code < 400
-        log = logger.info if success else logger.warning
-        log(
-            "outgoing_http_request.done",
-            **common,
-            outgoing_http_status=response.status_code,
-            duration_ms=duration_ms,
-            success=success,
-        )
+        call.finished(response.status_code, lambda: response.num_bytes_downloaded)
         return response
 
     async def _instrumented_async_send(
@@ -244,42 +790,20 @@ def _install_httpx() -> None:
         if _is_excluded(host):
             return await _original_async_send(self, request, **kwargs)
 
-        url = _redact_url(str(request.url))
-        request_id = str(_new_uuid())
-
-        common = _make_common(
+        call = _OutgoingRequest(
             method=request.method,
-            url=url,
             host=host,
-            request_id=request_id,
+            url=lambda: _redact_url(str(request.url)),
+        )
+        request.extensions["trace"] = _AsyncHttpxTrace(
+            call, request.extensions.get("trace")
         )
-        logger.info("outgoing_http_request.start", **common)
-
-        start_ns = time.perf_counter_ns()
         try:
             response = await _original_async_send(self, request, **kwargs)
         except Exception as exc:
-            duration_ms = _ns_to_ms(time.perf_counter_ns() - start_ns)
-            logger.warning(
-                "outgoing_http_request.done",
-                **common,
-                outgoing_http_status=None,
-                duration_ms=duration_ms,
-                success=False,
-                error=type(exc).__name__,
-            )
+            call.failed(exc)
             raise
-
-        duration_ms = _ns_to_ms(time.perf_counter_ns() - start_ns)
-        success = 200 <= response.status_code < 400
-        log = logger.info if success else logger.warning
-        log(
-            "outgoing_http_request.done",
-            **common,
-            outgoing_http_status=response.status_code,
-            duration_ms=duration_ms,
-            success=success,
-        )
+        call.finished(response.status_code, lambda: response.num_bytes_downloaded)
         return response
 
     httpx.Client.send = _instrumented_send  # type: ignore[method-assign]
@@ -1,10 +1,17 @@
 from __future__ import annotations
 
 from unittest import TestCase
+import asyncio
 
 from django.test import override_settings
 
-from ...backends.base import MetricData, MetricsBackend
+from ...backends.base import (
+    AsyncMetricsBackend,
+    MetricData,
+    MetricsBackend,
+    summarize_histogram,
+)
+from ...backends.histogram import Histogram
 
 
 class ConcreteBackend(MetricsBackend):
@@ -73,3 +80,98 @@ class BaseBackendTestCase(TestCase):
         # Test that original dimensions are not overridden
         all_dims = backend._get_all_dimensions({"env": "prod"})
         self.assertEqual(all_dims, {"env": "prod", "service": "backend"})
+
+
+class ConcreteAsyncBackend(AsyncMetricsBackend):
+    """Concrete implementation of AsyncMetricsBackend for testing."""
+
+    def __init__(self) -> None:
+        self.metrics: list[MetricData] = []
+
+    async def send_metrics(self, metrics: list[MetricData]) -> None:
+        """Record the metrics for testing."""
+        self.metrics += metrics
+
+
+class AsyncBaseBackendTestCase(TestCase):
+    """Test cases for the async base metrics backend."""
+
+    def test_cannot_instantiate_abstract_class(self) -> None:
+        """Test that AsyncMetricsBackend cannot be instantiated directly."""
+        with self.assertRaises(TypeError):
+            AsyncMetricsBackend()  # type: ignore
+
+    def test_send_metric_delegates_to_send_metrics(self) -> None:
+        """Test that send_metric awaits send_metrics with a single metric."""
+        backend = ConcreteAsyncBackend()
+        asyncio.run(backend.send_metric({"name": "test_metric", "value": 42.0}))
+        self.assertEqual(backend.metrics, [{"name": "test_metric", "value": 42.0}])
+
+    @override_settings(THELAB_INSTRUMENTATION={"DIMENSIONS": {"env": "test"}})
+    def test_get_all_dimensions(self) -> None:
+        """Test that async backends merge global dimensions too."""
+        backend = ConcreteAsyncBackend()
+        self.assertEqual(
+            backend._get_all_dimensions({"instance": "worker-1"}),
+            {"env": "test", "instance": "worker-1"},
+        )
+
+
+class HistogramSummaryTestCase(TestCase):
+    """Test cases for publishing histograms through scalar-only backends."""
+
+    def _histogram(self) -> Histogram:
+        histogram = Histogram()
+        for value in range(1, 101):
+            histogram.record(float(value))
+        return histogram
+
+    def test_summarize_histogram(self) -> None:
+        """Test that a histogram is flattened into count, range and percentiles."""
+        metrics = summarize_histogram(
+            {
+                "name": "latency",
+                "histogram": self._histogram(),
+                "unit": "Milliseconds",
+                "dimensions": {"host": "api"},
+            }
+        )
+        by_name = {m["name"]: m for m in metrics}
+        self.assertEqual(
+            set(by_name),
+            {
+                "latency.count",
+                "latency.min",
+                "latency.max",
+                "latency.p50",
+                "latency.p90",
+                "latency.p99",
+            },
+        )
+        self.assertEqual(by_name["latency.count"]["value"], 100)
+        self.assertEqual(by_name["latency.count"]["unit"], "Count")
+        self.assertEqual(by_name["latency.max"]["value"], 100)
+        self.assertEqual(by_name["latency.p50"]["unit"], "Milliseconds")
+        self.assertEqual(by_name["latency.p50"]["dimensions"], {"host": "api"})
+
+    def test_summarize_empty_histogram(self) -> None:
+        """Test that an empty histogram produces no metrics."""
+        self.assertEqual(
+            summarize_histogram({"name": "x", "histogram": Histogram()}), []
+        )
+
+    def test_default_send_histograms(self) -> None:
+        """Test that backends publish histogram summaries by default."""
+        backend = ConcreteBackend()
+        backend.send_histograms([{"name": "latency", "histogram": self._histogram()}])
+        self.assertEqual(len(backend.metrics), 6)
+
+    def test_default_async_send_histograms(self) -> None:
+        """Test that async backends publish histogram summaries by default."""
+        backend = ConcreteAsyncBackend()
+        asyncio.run(
+            backend.send_histograms(
+                [{"name": "latency", "histogram": self._histogram()}]
+            )
+        )
+        self.assertEqual(len(backend.metrics), 6)
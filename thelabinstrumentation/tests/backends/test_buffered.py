@@ -0,0 +1,190 @@
+from unittest import TestCase, skipUnless
+from unittest.mock import patch
+import os
+
+from django.test import override_settings
+
+from ...backends.base import MetricData
+from ...backends.buffered import BufferedBackend, OverflowPolicy
+from ...backends.factory import get_backend
+from ...backends.histogram import Histogram
+from ...backends.logging import LoggingBackend
+from ..utils import RecordingBackend
+
+
+def _metrics(*values: float) -> list[MetricData]:
+    return [{"name": "test_metric", "value": value} for value in values]
+
+
+class BufferedBackendTestCase(TestCase):
+    """Test cases for the buffered metrics backend."""
+
+    def setUp(self) -> None:
+        self.inner = RecordingBackend()
+
+    def _make_backend(
+        self,
+        max_size: int = 10_000,
+        flush_interval: float = 10.0,
+        flush_size: int = 1_000,
+        overflow: OverflowPolicy = "drop-oldest",
+    ) -> BufferedBackend:
+        backend = BufferedBackend(
+            self.inner,
+            max_size=max_size,
+            flush_size=flush_size,
+            flush_interval=flush_interval,
+            overflow=overflow,
+        )
+        self.addCleanup(backend.close, timeout=5)
+        return backend
+
+    def test_send_metrics_does_not_block_on_inner_backend(self) -> None:
+        """Test that sending only enqueues until a flush happens."""
+        backend = self._make_backend(flush_interval=60)
+        backend.send_metrics(_metrics(1, 2))
+        self.assertEqual(self.inner.batches, [])
+        backend.flush()
+        self.assertEqual(self.inner.values, [1, 2])
+
+    def test_flushes_when_flush_size_reached(self) -> None:
+        """Test that the flusher thread drains the buffer once it is full enough."""
+        backend = self._make_backend(flush_size=3, flush_interval=60)
+        backend.send_metrics(_metrics(1, 2))
+        self.assertFalse(self.inner.received.wait(0.1))
+        backend.send_metrics(_metrics(3))
+        self.assertTrue(self.inner.received.wait(5))
+        self.assertEqual(self.inner.values, [1, 2, 3])
+
+    def test_flushes_when_flush_interval_elapses(self) -> None:
+        """Test that datapoints are not held longer than the flush interval."""
+        backend = self._make_backend(flush_interval=0.05)
+        backend.send_metric({"name": "test_metric", "value": 1})
+        self.assertTrue(self.inner.received.wait(5))
+        self.assertEqual(self.inner.values, [1])
+
+    def test_overflow_drop_oldest(self) -> None:
+        """Test that the oldest datapoints are discarded when the buffer is full."""
+        backend = self._make_backend(max_size=3, flush_interval=60)
+        backend.send_metrics(_metrics(1, 2, 3, 4, 5))
+        backend.close(timeout=5)
+        self.assertEqual(self.inner.values, [3, 4, 5])
+        self.assertEqual(backend.dropped, 2)
+
+    def test_overflow_drop_newest(self) -> None:
+        """Test that new datapoints are discarded when the buffer is full."""
+        backend = self._make_backend(
+            max_size=3, flush_interval=60, overflow="drop-newest"
+        )
+        backend.send_metrics(_metrics(1, 2, 3, 4, 5))
+        backend.close(timeout=5)
+        self.assertEqual(self.inner.values, [1, 2, 3])
+        self.assertEqual(backend.dropped, 2)
+
+    def test_overflow_block(self) -> None:
+        """Test that callers wait for the flusher instead of losing data."""
+        backend = self._make_backend(max_size=2, flush_interval=60, overflow="block")
+        backend.send_metrics(_metrics(1, 2, 3, 4, 5))
+        backend.close(timeout=5)
+        self.assertEqual(self.inner.values, [1, 2, 3, 4, 5])
+        self.assertEqual(backend.dropped, 0)
+
+    def test_buffers_histograms(self) -> None:
+        """Test that histograms are buffered and forwarded natively."""
+        backend = self._make_backend(flush_interval=60)
+        histogram = Histogram()
+        histogram.record(1.0)
+        backend.send_histograms([{"name": "latency", "histogram": histogram}])
+        backend.send_metrics(_metrics(1))
+        self.assertEqual(self.inner.histograms, [])
+        backend.flush()
+        self.assertEqual(self.inner.values, [1])
+        self.assertEqual([h["name"] for h in self.inner.histograms], ["latency"])
+
+    def test_invalid_overflow_policy(self) -> None:
+        """Test that an unknown overflow policy is rejected."""
+        with self.assertRaises(ValueError):
+            BufferedBackend(self.inner, overflow="explode")  # type: ignore[arg-type]
+
+    def test_flush_survives_inner_backend_errors(self) -> None:
+        """Test that an error in the wrapped backend doesn't kill the flusher."""
+        backend = self._make_backend(flush_interval=60)
+        original = self.inner.send_metrics
+        calls = 0
+
+        def flaky_send_metrics(metrics: list[MetricData]) -> None:
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                raise RuntimeError("boom")
+            original(metrics)
+
+        self.inner.send_metrics = flaky_send_metrics  # type: ignore[method-assign]
+        backend.send_metrics(_metrics(1))
+        with self.assertLogs("thelabinstrumentation.backends.buffered", "ERROR"):
+            backend.flush()
+        backend.send_metrics(_metrics(2))
+        backend.flush()
+        self.assertEqual(self.inner.values, [2])
+
+    def test_close_stops_flusher_thread(self) -> None:
+        """Test that close() joins the flusher thread and flushes the buffer."""
+        backend = self._make_backend(flush_interval=60)
+        backend.send_metrics(_metrics(1))
+        thread = backend._thread
+        assert thread is not None
+        backend.close(timeout=5)
+        self.assertFalse(thread.is_alive())
+        self.assertIsNone(backend._thread)
+        self.assertEqual(self.inner.values, [1])
+
+    def test_close_closes_owned_backend(self) -> None:
+        """Test that close() closes wrapped backends built from a class path."""
+        backend = BufferedBackend(
+            "thelabinstrumentation.backends.logging.LoggingBackend"
+        )
+        with patch.object(backend.backend, "close") as mock_close:
+            backend.close()
+        mock_close.assert_called_once_with()
+        with patch.object(self.inner, "close") as mock_close:
+            self._make_backend().close()
+        mock_close.assert_not_called()
+
+    @skipUnless(hasattr(os, "fork"), "requires os.fork")
+    def test_forked_child_starts_with_empty_buffer(self) -> None:
+        """Test that a child doesn't resend its parent's buffer and can flush."""
+        backend = self._make_backend(flush_interval=60)
+        backend.send_metrics(_metrics(1))
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover
+            try:
+                backend.send_metrics(_metrics(2))
+                backend.flush()
+                alive = backend._thread is not None and backend._thread.is_alive()
+                os.write(write_fd, f"{self.inner.values} {alive}".encode())
+            finally:
+                os._exit(0)
+        os.close(write_fd)
+        with os.fdopen(read_fd) as pipe:
+            result = pipe.read()
+        os.waitpid(pid, 0)
+        self.assertEqual(result, "[2] True")
+        backend.flush()
+        self.assertEqual(self.inner.values, [1])
+
+    @override_settings(
+        THELAB_INSTRUMENTATION={
+            "BACKEND": "thelabinstrumentation.backends.buffered.BufferedBackend",
+            "OPTIONS": {
+                "backend": "thelabinstrumentation.backends.logging.LoggingBackend",
+                "max_size": 100,
+            },
+        }
+    )
+    def test_selectable_through_settings(self) -> None:
+        """Test that the buffered backend can be configured as the BACKEND."""
+        backend = get_backend()
+        assert isinstance(backend, BufferedBackend)
+        self.assertIsInstance(backend.backend, LoggingBackend)
+        self.assertEqual(backend.max_size, 100)
@@ -1,13 +1,29 @@
-from datetime import datetime
-from typing import Any
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING, Any
 from unittest import TestCase
 from unittest.mock import Mock, patch
+import asyncio
+import json
+import threading
 
 from botocore.exceptions import BotoCoreError, ClientError
 from moto import mock_aws
 import boto3
 
-from ...backends.cloudwatch import CloudWatchBackend
+from ...backends.base import MetricData
+from ...backends.cloudwatch import (
+    _MAX_DATUMS_PER_REQUEST,
+    _MAX_REQUEST_BYTES,
+    AsyncCloudWatchBackend,
+    CloudWatchBackend,
+    _chunk_metric_data,
+)
+from ...backends.histogram import Histogram
+
+if TYPE_CHECKING:
+    from mypy_boto3_cloudwatch.type_defs import MetricDatumTypeDef
 
 
 @mock_aws
@@ -235,3 +251,270 @@ class CloudWatchBackendTestCase(TestCase):
 
             # Verify we got a valid response structure
             self.assertIn("Datapoints", response)
+
+    def test_send_metrics_chunks_by_datum_count(self) -> None:
+        """Test that large batches are split along the datum count limit."""
+        metrics: list[MetricData] = [
+            {"name": f"metric_{i}", "value": float(i)} for i in range(2500)
+        ]
+        with patch.object(self.backend, "_send_batch") as mock_send_batch:
+            self.backend.send_metrics(metrics)
+        sizes = sorted(len(call[0][0]) for call in mock_send_batch.call_args_list)
+        self.assertEqual(sizes, [500, 1000, 1000])
+        sent_names = {
+            datum["MetricName"]
+            for call in mock_send_batch.call_args_list
+            for datum in call[0][0]
+        }
+        self.assertEqual(len(sent_names), 2500)
+
+    def test_chunk_metric_data_respects_payload_size(self) -> None:
+        """Test that chunks stay under the request payload size limit."""
+        big_value = "x" * 250
+        datum: MetricDatumTypeDef = {
+            "MetricName": "big_metric",
+            "Value": 1.0,
+            "Dimensions": [{"Name": f"dim{i}", "Value": big_value} for i in range(30)],
+        }
+        chunks = list(_chunk_metric_data([datum] * 500))
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(sum(len(chunk) for chunk in chunks), 500)
+        for chunk in chunks:
+            self.assertLessEqual(len(chunk), _MAX_DATUMS_PER_REQUEST)
+            self.assertLess(len(json.dumps(chunk)), _MAX_REQUEST_BYTES)
+
+    def test_send_metrics_single_chunk_skips_thread_pool(self) -> None:
+        """Test that a batch which fits in one request is sent inline."""
+        with patch.object(self.backend, "_send_batch") as mock_send_batch:
+            self.backend.send_metrics([{"name": "test_metric", "value": 1.0}])
+        mock_send_batch.assert_called_once()
+        self.assertIsNone(self.backend._executor)
+
+    def test_send_metrics_chunks_in_parallel(self) -> None:
+        """Test that chunks are published concurrently on the shared pool."""
+        barrier = threading.Barrier(2, timeout=5)
+        thread_names: set[str] = set()
+
+        def fake_send_batch(metric_data: list[MetricDatumTypeDef]) -> None:
+            thread_names.add(threading.current_thread().name)
+            # Both chunks must be in flight at once to pass the barrier.
+            barrier.wait()
+
+        metrics: list[MetricData] = [
+            {"name": f"test_metric_{i}", "value": float(i)} for i in range(1500)
+        ]
+        with patch.object(self.backend, "_send_batch", side_effect=fake_send_batch):
+            self.backend.send_metrics(metrics)
+        self.assertEqual(len(thread_names), 2)
+        executor = self.backend._executor
+        assert executor is not None
+        self.assertEqual(executor._max_workers, self.backend.max_workers)
+        self.backend.close()
+        self.assertIsNone(self.backend._executor)
+        with self.assertRaises(RuntimeError):
+            executor.submit(print)
+
+    def test_send_metrics_large_batch_with_moto(self) -> None:
+        """End-to-end test that oversized batches publish without errors."""
+        metrics: list[MetricData] = [
+            {"name": f"test_large_batch_{i}", "value": float(i), "unit": "Count"}
+            for i in range(2100)
+        ]
+        with patch("thelabinstrumentation.backends.cloudwatch.logger") as mock_logger:
+            self.backend.send_metrics(metrics)
+        mock_logger.error.assert_not_called()
+        self.assertEqual(mock_logger.debug.call_count, 3)
+
+    def test_send_metrics_aggregates_into_values_and_counts(self) -> None:
+        """Test that repeated datapoints are folded into Values/Counts."""
+        timestamp = datetime(2023, 1, 1, 12, 0, 10, tzinfo=UTC)
+        metrics: list[MetricData] = [
+            {
+                "name": "latency",
+                "value": value,
+                "unit": "Milliseconds",
+                "dimensions": {"service": "api"},
+                "timestamp": timestamp + timedelta(seconds=offset),
+            }
+            for offset, value in enumerate([5.0, 7.0, 5.0, 5.0])
+        ]
+        with (
+            patch.object(self.backend, "_send_batch") as mock_send_batch,
+            patch.object(
+                self.backend, "_get_all_dimensions", side_effect=lambda d: d or {}
+            ),
+        ):
+            self.backend.send_metrics(metrics)
+        mock_send_batch.assert_called_once()
+        (datum,) = mock_send_batch.call_args[0][0]
+        self.assertEqual(datum["MetricName"], "latency")
+        self.assertEqual(datum["Unit"], "Milliseconds")
+        self.assertEqual(datum["Values"], [5.0, 7.0])
+        self.assertEqual(datum["Counts"], [3.0, 1.0])
+        self.assertNotIn("Value", datum)
+        self.assertEqual(datum["Timestamp"], datetime(2023, 1, 1, 12, 0, tzinfo=UTC))
+        self.assertEqual(datum["Dimensions"], [{"Name": "service", "Value": "api"}])
+
+    def test_send_metrics_aggregates_into_statistic_values(self) -> None:
+        """Test that high-cardinality groups are folded into a statistic set."""
+        metrics: list[MetricData] = [
+            {"name": "latency", "value": float(i)} for i in range(1, 501)
+        ]
+        with (
+            patch.object(self.backend, "_send_batch") as mock_send_batch,
+            patch.object(self.backend, "_get_all_dimensions", return_value={}),
+        ):
+            self.backend.send_metrics(metrics)
+        (datum,) = mock_send_batch.call_args[0][0]
+        self.assertEqual(
+            datum["StatisticValues"],
+            {"SampleCount": 500.0, "Sum": 125250.0, "Minimum": 1.0, "Maximum": 500.0},
+        )
+        self.assertNotIn("Values", datum)
+        self.assertNotIn("Timestamp", datum)
+
+    def test_send_metrics_keeps_distinct_series_apart(self) -> None:
+        """Test that differing dimensions, units or periods are not folded."""
+        timestamp = datetime(2023, 1, 1, 12, 0, 0, tzinfo=UTC)
+        metrics: list[MetricData] = [
+            {"name": "m", "value": 1.0, "dimensions": {"q": "a"}},
+            {"name": "m", "value": 1.0, "dimensions": {"q": "b"}},
+            {"name": "m", "value": 1.0, "unit": "Count"},
+            {"name": "m", "value": 1.0, "timestamp": timestamp},
+            {"name": "m", "value": 1.0, "timestamp": timestamp + timedelta(minutes=1)},
+        ]
+        with patch.object(self.backend, "_send_batch") as mock_send_batch:
+            self.backend.send_metrics(metrics)
+        datums = mock_send_batch.call_args[0][0]
+        self.assertEqual(len(datums), 5)
+        self.assertTrue(all("Value" in datum for datum in datums))
+
+    def test_send_metrics_without_aggregation(self) -> None:
+        """Test that aggregation can be turned off."""
+        backend = CloudWatchBackend(
+            namespace=self.namespace, region_name="us-east-1", aggregate=False
+        )
+        metrics: list[MetricData] = [{"name": "m", "value": 1.0}] * 3
+        with patch.object(backend, "_send_batch") as mock_send_batch:
+            backend.send_metrics(metrics)
+        self.assertEqual(len(mock_send_batch.call_args[0][0]), 3)
+
+    def test_aggregated_datums_accepted_by_moto(self) -> None:
+        """End-to-end test that aggregated datums are valid PutMetricData input."""
+        metrics: list[MetricData] = [
+            {"name": "test_aggregated", "value": float(i % 3), "unit": "Count"}
+            for i in range(300)
+        ]
+        metrics += [{"name": "test_stats", "value": float(i)} for i in range(300)]
+        with patch("thelabinstrumentation.backends.cloudwatch.logger") as mock_logger:
+            self.backend.send_metrics(metrics)
+        mock_logger.error.assert_not_called()
+        self.assertIn("Successfully sent 2 metrics", mock_logger.debug.call_args[0][0])
+
+    def test_send_histograms_as_values_and_counts(self) -> None:
+        """Test that histograms are published natively as Values/Counts."""
+        histogram = Histogram()
+        for value in (1.0, 1.0, 1.0, 50.0):
+            histogram.record(value)
+        with (
+            patch.object(self.backend, "_send_batch") as mock_send_batch,
+            patch.object(
+                self.backend, "_get_all_dimensions", return_value={"host": "api"}
+            ),
+        ):
+            self.backend.send_histograms(
+                [{"name": "latency", "histogram": histogram, "unit": "Milliseconds"}]
+            )
+        (datum,) = mock_send_batch.call_args[0][0]
+        self.assertEqual(datum["MetricName"], "latency")
+        self.assertEqual(datum["Unit"], "Milliseconds")
+        self.assertEqual(datum["Values"], [1.0, 50.0])
+        self.assertEqual(datum["Counts"], [3.0, 1.0])
+        self.assertEqual(datum["Dimensions"], [{"Name": "host", "Value": "api"}])
+
+    def test_send_histograms_splits_wide_histograms(self) -> None:
+        """Test that histograms with many buckets span several datums."""
+        histogram = Histogram(max_buckets=400)
+        for value in range(1, 10_001):
+            histogram.record(float(value))
+        with patch.object(self.backend, "_send_batch") as mock_send_batch:
+            self.backend.send_histograms([{"name": "latency", "histogram": histogram}])
+        datums = mock_send_batch.call_args[0][0]
+        self.assertGreater(len(datums), 1)
+        self.assertTrue(all(len(datum["Values"]) <= 150 for datum in datums))
+        self.assertEqual(sum(sum(datum["Counts"]) for datum in datums), 10_000)
+
+    def test_send_histograms_with_moto(self) -> None:
+        """End-to-end test that histogram datums are valid PutMetricData input."""
+        histogram = Histogram()
+        for value in range(1, 1001):
+            histogram.record(float(value))
+        with patch("thelabinstrumentation.backends.cloudwatch.logger") as mock_logger:
+            self.backend.send_histograms(
+                [{"name": "test_histogram", "histogram": histogram}]
+            )
+        mock_logger.error.assert_not_called()
+        mock_logger.debug.assert_called_once()
+
+
+@mock_aws
+class AsyncCloudWatchBackendTestCase(TestCase):
+    """Test cases for the asyncio CloudWatch metrics backend."""
+
+    def setUp(self) -> None:
+        self.backend = AsyncCloudWatchBackend(
+            namespace="TestNamespace", region_name="us-east-1"
+        )
+
+    def test_send_metrics_runs_on_backend_pool(self) -> None:
+        """Test that requests run on the shared pool, not the event loop thread."""
+        loop_threads: set[str] = set()
+        send_threads: set[str] = set()
+
+        def fake_send_batch(metric_data: list[MetricDatumTypeDef]) -> None:
+            send_threads.add(threading.current_thread().name)
+
+        async def _run() -> None:
+            loop_threads.add(threading.current_thread().name)
+            metrics: list[MetricData] = [
+                {"name": f"metric_{i}", "value": float(i)} for i in range(1500)
+            ]
+            await self.backend.send_metrics(metrics)
+
+        with patch.object(
+            self.backend.backend, "_send_batch", side_effect=fake_send_batch
+        ) as mock_send_batch:
+            asyncio.run(_run())
+        self.assertEqual(mock_send_batch.call_count, 2)
+        self.assertTrue(send_threads)
+        self.assertTrue(send_threads.isdisjoint(loop_threads))
+
+    def test_send_metric_with_moto(self) -> None:
+        """End-to-end test publishing from a coroutine using moto."""
+        with patch("thelabinstrumentation.backends.cloudwatch.logger") as mock_logger:
+            asyncio.run(
+                self.backend.send_metric(
+                    {"name": "async_metric", "value": 1.0, "unit": "Count"}
+                )
+            )
+        mock_logger.error.assert_not_called()
+        self.assertIn("Successfully sent 1 metrics", mock_logger.debug.call_args[0][0])
+
+    def test_send_empty_batch(self) -> None:
+        """Test that an empty batch makes no requests."""
+        with patch.object(self.backend.backend, "_send_batch") as mock_send_batch:
+            asyncio.run(self.backend.send_metrics([]))
+        mock_send_batch.assert_not_called()
+
+    def test_send_histograms(self) -> None:
+        """Test that histograms are published from a coroutine."""
+        histogram = Histogram()
+        histogram.record(5.0)
+        with patch.object(self.backend.backend, "_send_batch") as mock_send_batch:
+            asyncio.run(
+                self.backend.send_histograms(
+                    [{"name": "latency", "histogram": histogram}]
+                )
+            )
+        (datum,) = mock_send_batch.call_args[0][0]
+        self.assertEqual(datum["Values"], [5.0])
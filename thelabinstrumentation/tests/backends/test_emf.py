@@ -0,0 +1,117 @@
+from datetime import UTC, datetime
+from typing import Any
+from unittest.mock import patch
+import io
+import json
+import os
+import tempfile
+
+from django.test import SimpleTestCase, override_settings
+
+from ...backends.base import MetricData
+from ...backends.emf import EMFBackend
+
+
+@override_settings(THELAB_INSTRUMENTATION={"DIMENSIONS": {"Environment": "test"}})
+class EMFBackendTestCase(SimpleTestCase):
+    """Test cases for the Embedded Metric Format backend."""
+
+    def setUp(self) -> None:
+        self.backend = EMFBackend(namespace="TestNamespace")
+
+    def _send(self, metrics: list[MetricData]) -> list[dict[str, Any]]:
+        """Send metrics and return the parsed EMF documents written to stdout."""
+        with patch("sys.stdout", new_callable=io.StringIO) as stdout:
+            self.backend.send_metrics(metrics)
+        return [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+    def test_send_metric_basic(self) -> None:
+        """Test that a single metric is written as one EMF document."""
+        timestamp = datetime(2023, 1, 1, 12, 0, 0, tzinfo=UTC)
+        (doc,) = self._send(
+            [
+                {
+                    "name": "rq.queued-jobs",
+                    "value": 10,
+                    "unit": "Count",
+                    "dimensions": {"QueueName": "default"},
+                    "timestamp": timestamp,
+                }
+            ]
+        )
+        self.assertEqual(
+            doc,
+            {
+                "_aws": {
+                    "Timestamp": 1672574400000,
+                    "CloudWatchMetrics": [
+                        {
+                            "Namespace": "TestNamespace",
+                            "Dimensions": [["Environment", "QueueName"]],
+                            "Metrics": [{"Name": "rq.queued-jobs", "Unit": "Count"}],
+                        }
+                    ],
+                },
+                "Environment": "test",
+                "QueueName": "default",
+                "rq.queued-jobs": 10,
+            },
+        )
+
+    def test_groups_documents_by_dimension_set(self) -> None:
+        """Test that metrics sharing dimensions share a document."""
+        docs = self._send(
+            [
+                {"name": "a", "value": 1, "dimensions": {"QueueName": "default"}},
+                {"name": "b", "value": 2, "dimensions": {"QueueName": "default"}},
+                {"name": "a", "value": 3, "dimensions": {"QueueName": "high"}},
+            ]
+        )
+        self.assertEqual(len(docs), 2)
+        by_queue = {doc["QueueName"]: doc for doc in docs}
+        self.assertEqual(by_queue["default"]["a"], 1)
+        self.assertEqual(by_queue["default"]["b"], 2)
+        self.assertEqual(by_queue["high"]["a"], 3)
+        self.assertNotIn("b", by_queue["high"])
+        metrics = by_queue["default"]["_aws"]["CloudWatchMetrics"][0]["Metrics"]
+        self.assertEqual(
+            metrics, [{"Name": "a", "Unit": "None"}, {"Name": "b", "Unit": "None"}]
+        )
+
+    def test_repeated_metric_becomes_value_array(self) -> None:
+        """Test that repeated datapoints for a metric are written as an array."""
+        (doc,) = self._send([{"name": "latency", "value": float(i)} for i in range(3)])
+        self.assertEqual(doc["latency"], [0.0, 1.0, 2.0])
+
+    def test_splits_documents_at_metric_limit(self) -> None:
+        """Test that no document holds more than 100 metrics."""
+        docs = self._send([{"name": f"metric_{i}", "value": i} for i in range(250)])
+        self.assertEqual(len(docs), 3)
+        sizes = [len(doc["_aws"]["CloudWatchMetrics"][0]["Metrics"]) for doc in docs]
+        self.assertEqual(sizes, [100, 100, 50])
+
+    def test_splits_documents_at_value_limit(self) -> None:
+        """Test that no metric holds more than 100 values in one document."""
+        docs = self._send([{"name": "latency", "value": i} for i in range(150)])
+        self.assertEqual([len(doc["latency"]) for doc in docs], [100, 50])
+
+    def test_write_to_file(self) -> None:
+        """Test that documents are appended to a file when a path is given."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "metrics.log")
+            backend = EMFBackend(namespace="TestNamespace", path=path)
+            backend.send_metric({"name": "a", "value": 1})
+            backend.send_metric({"name": "b", "value": 2})
+            backend.close()
+            with open(path, encoding="utf-8") as f:
+                docs = [json.loads(line) for line in f]
+        self.assertEqual([doc.get("a", doc.get("b")) for doc in docs], [1, 2])
+
+    def test_invalid_stream(self) -> None:
+        """Test that an unknown stream name is rejected."""
+        with self.assertRaises(ValueError):
+            EMFBackend(namespace="TestNamespace", stream="stdin")
+
+    def test_empty_batch_writes_nothing(self) -> None:
+        """Test that sending no metrics writes no output."""
+        self.assertEqual(self._send([]), [])
@@ -1,11 +1,17 @@
 from typing import Any
 from unittest import TestCase
 from unittest.mock import Mock, patch
+import asyncio
+import threading
 
+from django.core.exceptions import ImproperlyConfigured
 from django.test import override_settings
 
-from ...backends.factory import get_backend
-from ...backends.logging import LoggingBackend
+from ...backends import factory
+from ...backends.factory import get_async_backend, get_backend, reset_backends
+from ...backends.logging import AsyncLoggingBackend, LoggingBackend
+from ...backends.structlog import AsyncStructlogBackend, StructlogBackend
+from ...backends.threaded import ThreadedAsyncBackend
 
 
 class FactoryTestCase(TestCase):
@@ -65,3 +71,176 @@ class FactoryTestCase(TestCase):
             # Attempt to get the backend - should raise AssertionError
             with self.assertRaises(AssertionError):
                 get_backend()
+
+
+class BackendCacheTestCase(TestCase):
+    """Test cases for the shared backend instances."""
+
+    def setUp(self) -> None:
+        reset_backends()
+        self.addCleanup(reset_backends)
+
+    def test_get_backend_is_cached(self) -> None:
+        """Test that the backend is only constructed once."""
+        with patch(
+            "thelabinstrumentation.backends.factory.build_backend",
+            side_effect=lambda path, options: LoggingBackend(),
+        ) as mock_build_backend:
+            backend = get_backend()
+            self.assertIs(get_backend(), backend)
+        mock_build_backend.assert_called_once()
+
+    def test_get_backend_is_built_once_across_threads(self) -> None:
+        """Test that concurrent first calls share a single instance."""
+        backends: list[object] = []
+        barrier = threading.Barrier(8)
+
+        def work() -> None:
+            barrier.wait()
+            backends.append(get_backend())
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len({id(backend) for backend in backends}), 1)
+
+    def test_setting_changed_resets_cache(self) -> None:
+        """Test that changing THELAB_INSTRUMENTATION rebuilds the backend."""
+        backend = get_backend()
+        self.assertIsInstance(backend, LoggingBackend)
+        with override_settings(
+            THELAB_INSTRUMENTATION={
+                "BACKEND": "thelabinstrumentation.backends.structlog.StructlogBackend",
+            }
+        ):
+            self.assertIsInstance(get_backend(), StructlogBackend)
+        self.assertIsNot(get_backend(), backend)
+        self.assertIsInstance(get_backend(), LoggingBackend)
+
+    def test_cache_is_discarded_after_fork(self) -> None:
+        """Test that a forked child builds its own backend instances."""
+        backend = get_backend()
+        async_backend = get_async_backend()
+        with (
+            patch("thelabinstrumentation.backends.factory.os.getpid", return_value=-1),
+            patch.object(backend, "close") as mock_close,
+        ):
+            self.assertIsNot(get_backend(), backend)
+            self.assertIsNot(get_async_backend(), async_backend)
+        self.assertEqual(factory._cache_pid, -1)
+        mock_close.assert_not_called()
+
+    @override_settings(
+        THELAB_INSTRUMENTATION={
+            "BACKEND": "thelabinstrumentation.backends.logging.LoggingBackend",
+            "BACKENDS": {
+                "audit": {
+                    "BACKEND": "thelabinstrumentation.backends.structlog.StructlogBackend",
+                },
+            },
+        }
+    )
+    def test_named_backends(self) -> None:
+        """Test that named backends are configured and cached independently."""
+        self.assertIsInstance(get_backend(), LoggingBackend)
+        audit = get_backend("audit")
+        self.assertIsInstance(audit, StructlogBackend)
+        self.assertIs(get_backend("audit"), audit)
+        with self.assertRaises(ImproperlyConfigured):
+            get_backend("missing")
+
+    def test_get_async_backend_is_cached(self) -> None:
+        """Test that the async backend is only constructed once."""
+        self.assertIs(get_async_backend(), get_async_backend())
+
+    def test_reset_closes_dropped_backends(self) -> None:
+        """Test that discarded backends release their resources."""
+        backend = get_backend()
+        async_backend = get_async_backend()
+        with (
+            patch.object(backend, "close") as mock_close,
+            patch.object(async_backend, "close") as mock_async_close,
+        ):
+            reset_backends()
+        mock_close.assert_called_once_with()
+        mock_async_close.assert_called_once_with()
+        self.assertIsNot(get_backend(), backend)
+        self.assertIsNot(get_async_backend(), async_backend)
+
+
+class AsyncFactoryTestCase(TestCase):
+    """Test cases for the async backend factory."""
+
+    @override_settings(THELAB_INSTRUMENTATION={})
+    def test_get_async_backend_default(self) -> None:
+        """Test that the async logging backend is used by default."""
+        self.assertIsInstance(get_async_backend(), AsyncLoggingBackend)
+
+    @override_settings(
+        THELAB_INSTRUMENTATION={
+            "BACKEND": "thelabinstrumentation.backends.cloudwatch.CloudWatchBackend",
+            "OPTIONS": {"namespace": "Shop", "region_name": "us-east-1"},
+        }
+    )
+    def test_get_async_backend_follows_backend(self) -> None:
+        """Test that built-in backends default to their async counterpart."""
+        from ...backends.cloudwatch import AsyncCloudWatchBackend
+
+        backend = get_async_backend()
+        assert isinstance(backend, AsyncCloudWatchBackend)
+        self.assertEqual(backend.namespace, "Shop")
+
+    @override_settings(
+        THELAB_INSTRUMENTATION={
+            "BACKEND": "thelabinstrumentation.backends.emf.EMFBackend",
+            "OPTIONS": {"namespace": "Shop"},
+        }
+    )
+    def test_get_async_backend_wraps_backend(self) -> None:
+        """Test that other backends are run in a worker thread by default."""
+        from ...backends.emf import EMFBackend
+
+        backend = get_async_backend()
+        assert isinstance(backend, ThreadedAsyncBackend)
+        assert isinstance(backend.backend, EMFBackend)
+        with patch.object(backend.backend, "send_metrics") as mock_send_metrics:
+            asyncio.run(backend.send_metric({"name": "orders", "value": 1}))
+        mock_send_metrics.assert_called_once_with([{"name": "orders", "value": 1}])
+        with patch.object(backend.backend, "close") as mock_close:
+            reset_backends()
+        mock_close.assert_called_once_with()
+
+    @override_settings(
+        THELAB_INSTRUMENTATION={
+            "ASYNC_BACKEND": "thelabinstrumentation.backends.structlog.AsyncStructlogBackend",
+        }
+    )
+    def test_get_async_backend_configured(self) -> None:
+        """Test getting a configured async backend."""
+        self.assertIsInstance(get_async_backend(), AsyncStructlogBackend)
+
+    @override_settings(
+        THELAB_INSTRUMENTATION={
+            "ASYNC_BACKEND": "thelabinstrumentation.backends.cloudwatch.AsyncCloudWatchBackend",
+            "OPTIONS": {"namespace": "Shared", "region_name": "us-east-1"},
+        }
+    )
+    def test_get_async_backend_falls_back_to_options(self) -> None:
+        """Test that the async backend shares OPTIONS unless ASYNC_OPTIONS is set."""
+        from ...backends.cloudwatch import AsyncCloudWatchBackend
+
+        backend = get_async_backend()
+        assert isinstance(backend, AsyncCloudWatchBackend)
+        self.assertEqual(backend.namespace, "Shared")
+
+    @override_settings(
+        THELAB_INSTRUMENTATION={
+            "ASYNC_BACKEND": "thelabinstrumentation.backends.logging.LoggingBackend",
+        }
+    )
+    def test_get_async_backend_rejects_sync_backend(self) -> None:
+        """Test that a synchronous backend can't be used as the async backend."""
+        with self.assertRaises(AssertionError):
+            get_async_backend()
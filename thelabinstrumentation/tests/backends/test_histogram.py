@@ -0,0 +1,117 @@
+from unittest import TestCase
+import random
+
+from ...backends.histogram import Histogram
+
+
+class HistogramTestCase(TestCase):
+    """Test cases for the exponential histogram sketch."""
+
+    def test_empty_histogram(self) -> None:
+        """Test the statistics of a histogram with no observations."""
+        histogram = Histogram()
+        self.assertEqual(histogram.count, 0)
+        self.assertEqual(histogram.mean, 0.0)
+        self.assertEqual(histogram.quantile(0.5), 0.0)
+        self.assertEqual(list(histogram.buckets()), [])
+
+    def test_basic_statistics(self) -> None:
+        """Test that count, sum, min, max and mean are exact."""
+        histogram = Histogram()
+        for value in (1.0, 2.0, 3.0, 10.0):
+            histogram.record(value)
+        histogram.record(4.0, count=2)
+        self.assertEqual(histogram.count, 6)
+        self.assertEqual(histogram.sum, 24.0)
+        self.assertEqual(histogram.min, 1.0)
+        self.assertEqual(histogram.max, 10.0)
+        self.assertEqual(histogram.mean, 4.0)
+
+    def test_quantiles_within_relative_error(self) -> None:
+        """Test that quantile estimates stay close to the exact values."""
+        rng = random.Random(42)
+        values = sorted(rng.lognormvariate(3, 1) for _ in range(20_000))
+        histogram = Histogram()
+        for value in values:
+            histogram.record(value)
+        for q in (0.5, 0.9, 0.99):
+            exact = values[int(q * (len(values) - 1))]
+            self.assertAlmostEqual(histogram.quantile(q), exact, delta=exact * 0.05)
+        self.assertEqual(histogram.quantile(0), values[0])
+        self.assertEqual(histogram.quantile(1), values[-1])
+
+    def test_memory_is_bounded(self) -> None:
+        """Test that a huge value range is folded into at most max_buckets."""
+        histogram = Histogram(max_buckets=20)
+        for exponent in range(-20, 20):
+            histogram.record(10.0**exponent)
+        self.assertLessEqual(len(list(histogram.buckets())), 20)
+        self.assertLess(histogram.scale, 8)
+        self.assertEqual(histogram.count, 40)
+
+    def test_zero_and_negative_values(self) -> None:
+        """Test that zero and negative values are bucketed in order."""
+        histogram = Histogram()
+        for value in (-5.0, -1.0, 0.0, 0.0, 2.0):
+            histogram.record(value)
+        buckets = list(histogram.buckets())
+        self.assertEqual([count for _, count in buckets], [1, 1, 2, 1])
+        values = [value for value, _ in buckets]
+        self.assertEqual(values, sorted(values))
+        self.assertEqual(histogram.quantile(0.5), 0.0)
+
+    def test_non_finite_values_ignored(self) -> None:
+        """Test that NaN and infinite values are not recorded."""
+        histogram = Histogram()
+        histogram.record(float("nan"))
+        histogram.record(float("inf"))
+        self.assertEqual(histogram.count, 0)
+
+    def test_merge(self) -> None:
+        """Test that merging is equivalent to recording into one sketch."""
+        rng = random.Random(7)
+        values = [rng.uniform(0.1, 1000) for _ in range(5000)]
+        combined = Histogram(max_buckets=40)
+        left = Histogram()
+        right = Histogram(max_buckets=40)
+        for i, value in enumerate(values):
+            combined.record(value)
+            (left if i % 2 else right).record(value)
+        left.merge(right)
+        self.assertEqual(left.count, combined.count)
+        self.assertAlmostEqual(left.sum, combined.sum)
+        self.assertEqual(left.min, combined.min)
+        self.assertEqual(left.max, combined.max)
+        # The merged sketch takes the coarser of the two resolutions, at which
+        # point its buckets match those of a single sketch exactly.
+        self.assertEqual(left.scale, right.scale)
+        self.assertEqual(left.scale, combined.scale)
+        self.assertEqual(list(left.buckets()), list(combined.buckets()))
+
+    def test_copy_is_independent(self) -> None:
+        """Test that a copy doesn't share state with the original."""
+        histogram = Histogram()
+        histogram.record(1.0)
+        clone = histogram.copy()
+        clone.record(2.0)
+        self.assertEqual(histogram.count, 1)
+        self.assertEqual(clone.count, 2)
+
+    def test_percentiles(self) -> None:
+        """Test that percentiles are keyed by their formatted percentile."""
+        histogram = Histogram()
+        for value in range(1, 101):
+            histogram.record(float(value))
+        percentiles = histogram.percentiles((50.0, 99.9))
+        self.assertEqual(set(percentiles), {"p50", "p99.9"})
+        self.assertAlmostEqual(percentiles["p50"], 50.0, delta=1.0)
+
+    def test_dense_buckets(self) -> None:
+        """Test that buckets are exported contiguously from their lowest index."""
+        histogram = Histogram(max_scale=0)
+        for value in (1.5, 3, 3.5, 12, -3):
+            histogram.record(value)
+        # At scale 0, bucket i holds values in (2**i, 2**(i + 1)].
+        self.assertEqual(histogram.dense_buckets(), (0, [1, 2, 0, 1]))
+        self.assertEqual(histogram.dense_buckets(negative=True), (1, [1]))
+        self.assertEqual(Histogram().dense_buckets(), (0, []))
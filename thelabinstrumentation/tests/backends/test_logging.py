@@ -1,10 +1,12 @@
 from datetime import datetime
 from unittest import TestCase
 from unittest.mock import Mock, patch
+import asyncio
 import json
 import logging
 
-from ...backends.logging import LoggingBackend
+from ...backends.histogram import Histogram
+from ...backends.logging import AsyncLoggingBackend, LoggingBackend
 
 
 class LoggingBackendTestCase(TestCase):
@@ -176,3 +178,63 @@ class LoggingBackendTestCase(TestCase):
             self.assertEqual(data["timestamp"], current_time.isoformat())
             self.assertEqual(data["dimensions"], {})
             self.assertTrue("unit" not in data or data["unit"] is None)
+
+
+class AsyncLoggingBackendTestCase(TestCase):
+    """Test cases for the async Logging metrics backend."""
+
+    def test_send_metrics(self) -> None:
+        """Test that metrics are logged from a coroutine."""
+        backend = AsyncLoggingBackend(namespace="ignored")
+        timestamp = datetime(2023, 1, 1, 12, 0, 0)
+        with (
+            self.assertLogs(
+                "thelabinstrumentation.backends.logging", level="INFO"
+            ) as logs,
+            patch.object(backend, "_get_all_dimensions", return_value={"env": "test"}),
+        ):
+            asyncio.run(
+                backend.send_metric(
+                    {"name": "async_metric", "value": 1.5, "timestamp": timestamp}
+                )
+            )
+        self.assertEqual(len(logs.records), 1)
+        data = json.loads(logs.records[0].getMessage().replace("SENDMETRIC: ", ""))
+        self.assertEqual(data["name"], "async_metric")
+        self.assertEqual(data["value"], 1.5)
+        self.assertEqual(data["dimensions"], {"env": "test"})
+        self.assertEqual(data["timestamp"], timestamp.isoformat())
+
+
+class LoggingBackendHistogramTestCase(TestCase):
+    """Test cases for logging histograms."""
+
+    def test_send_histograms_logs_percentiles(self) -> None:
+        """Test that each histogram is logged once with its percentiles."""
+        backend = LoggingBackend()
+        histogram = Histogram()
+        for value in range(1, 101):
+            histogram.record(float(value))
+        with (
+            self.assertLogs(
+                "thelabinstrumentation.backends.logging", level="INFO"
+            ) as logs,
+            patch.object(backend, "_get_all_dimensions", return_value={}),
+        ):
+            backend.send_histograms(
+                [
+                    {"name": "latency", "histogram": histogram, "unit": "Milliseconds"},
+                    {"name": "empty", "histogram": Histogram()},
+                ]
+            )
+        self.assertEqual(len(logs.records), 1)
+        message = logs.records[0].getMessage()
+        self.assertTrue(message.startswith("SENDHISTOGRAM: "))
+        data = json.loads(message.replace("SENDHISTOGRAM: ", ""))
+        self.assertEqual(data["name"], "latency")
+        self.assertEqual(data["unit"], "Milliseconds")
+        self.assertEqual(data["count"], 100)
+        self.assertEqual(data["min"], 1.0)
+        self.assertEqual(data["max"], 100.0)
+        self.assertAlmostEqual(data["p50"], 50.0, delta=3.0)
+        self.assertIn("p99", data)
@@ -0,0 +1,143 @@
+from unittest import TestCase
+from unittest.mock import patch
+import threading
+import time
+
+from django.test import override_settings
+
+from ...backends.base import MetricData, MetricsBackend
+from ...backends.factory import get_backend
+from ...backends.histogram import Histogram
+from ...backends.logging import LoggingBackend
+from ...backends.multi import MultiBackend, SinkConfigData
+from ...backends.structlog import StructlogBackend
+from ..utils import RecordingBackend
+
+
+class FailingBackend(MetricsBackend):
+    """Backend which always raises."""
+
+    def send_metrics(self, metrics: list[MetricData]) -> None:
+        raise RuntimeError("boom")
+
+
+class SlowBackend(RecordingBackend):
+    """Backend which blocks until released."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.release = threading.Event()
+
+    def send_metrics(self, metrics: list[MetricData]) -> None:
+        self.release.wait(5)
+        super().send_metrics(metrics)
+
+
+class MultiBackendTestCase(TestCase):
+    """Test cases for the fan-out metrics backend."""
+
+    def _make_backend(
+        self,
+        backends: list[str | SinkConfigData | MetricsBackend],
+        timeout: float = 5.0,
+        max_pending: int = 10,
+    ) -> MultiBackend:
+        backend = MultiBackend(backends, timeout=timeout, max_pending=max_pending)
+        self.addCleanup(backend.close)
+        return backend
+
+    def test_sends_to_every_backend(self) -> None:
+        """Test that every sink receives every metric and histogram."""
+        a, b = RecordingBackend(), RecordingBackend()
+        backend = self._make_backend([a, b])
+        histogram = Histogram()
+        histogram.record(1.0)
+        backend.send_metric({"name": "test_metric", "value": 1})
+        backend.send_histograms([{"name": "latency", "histogram": histogram}])
+        for sink in (a, b):
+            self.assertEqual(sink.metrics, [{"name": "test_metric", "value": 1}])
+            self.assertEqual([h["name"] for h in sink.histograms], ["latency"])
+
+    def test_failing_backend_is_isolated(self) -> None:
+        """Test that one sink raising doesn't affect the others."""
+        healthy = RecordingBackend()
+        backend = self._make_backend([FailingBackend(), healthy])
+        with self.assertLogs("thelabinstrumentation.backends.multi", "ERROR"):
+            backend.send_metric({"name": "test_metric", "value": 1})
+            backend.send_metric({"name": "test_metric", "value": 2})
+        self.assertEqual([m["value"] for m in healthy.metrics], [1, 2])
+        self.assertEqual(backend.sinks[0].errors, 2)
+        self.assertEqual(backend.sinks[1].errors, 0)
+
+    def test_slow_backend_times_out(self) -> None:
+        """Test that a slow sink only delays the caller by its own timeout."""
+        slow, fast = SlowBackend(), RecordingBackend()
+        self.addCleanup(slow.release.set)
+        backend = self._make_backend([slow, fast], timeout=0.05)
+        start = time.monotonic()
+        with self.assertLogs("thelabinstrumentation.backends.multi", "WARNING"):
+            backend.send_metric({"name": "test_metric", "value": 1})
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(fast.metrics, [{"name": "test_metric", "value": 1}])
+        self.assertEqual(backend.sinks[0].timeouts, 1)
+        self.assertEqual(backend.sinks[1].timeouts, 0)
+        # The slow sink finishes sending in the background.
+        slow.release.set()
+        backend.close()
+        self.assertEqual(slow.metrics, [{"name": "test_metric", "value": 1}])
+
+    def test_busy_backend_drops_batches(self) -> None:
+        """Test that a stuck sink queues at most max_pending batches."""
+        slow, fast = SlowBackend(), RecordingBackend()
+        self.addCleanup(slow.release.set)
+        backend = self._make_backend([slow, fast], timeout=0.05, max_pending=2)
+        with self.assertLogs("thelabinstrumentation.backends.multi", "WARNING") as cm:
+            for value in range(4):
+                backend.send_metric({"name": "test_metric", "value": value})
+        self.assertEqual(len(fast.metrics), 4)
+        self.assertEqual(backend.sinks[0].dropped, 2)
+        self.assertEqual(backend.sinks[1].dropped, 0)
+        self.assertTrue(any("Dropped metrics" in line for line in cm.output))
+        slow.release.set()
+        backend.close()
+        self.assertEqual([m["value"] for m in slow.metrics], [0, 1])
+        # Once the sink catches up, batches are queued again.
+        self.assertEqual(backend.sinks[0]._pending, 0)
+
+    def test_close_closes_owned_backends(self) -> None:
+        """Test that backends built from class paths are closed with the sinks."""
+        shared = RecordingBackend()
+        backend = MultiBackend(
+            [shared, "thelabinstrumentation.backends.logging.LoggingBackend"]
+        )
+        with (
+            patch.object(shared, "close") as mock_shared_close,
+            patch.object(backend.backends[1], "close") as mock_owned_close,
+        ):
+            backend.close()
+        mock_shared_close.assert_not_called()
+        mock_owned_close.assert_called_once_with()
+
+    @override_settings(
+        THELAB_INSTRUMENTATION={
+            "BACKEND": "thelabinstrumentation.backends.multi.MultiBackend",
+            "OPTIONS": {
+                "backends": [
+                    "thelabinstrumentation.backends.logging.LoggingBackend",
+                    {
+                        "BACKEND": "thelabinstrumentation.backends.structlog.StructlogBackend",
+                        "TIMEOUT": 1,
+                    },
+                ],
+                "timeout": 2,
+            },
+        }
+    )
+    def test_selectable_through_settings(self) -> None:
+        """Test that sinks are built from class paths and dict specs."""
+        backend = get_backend()
+        assert isinstance(backend, MultiBackend)
+        self.assertIsInstance(backend.backends[0], LoggingBackend)
+        self.assertIsInstance(backend.backends[1], StructlogBackend)
+        self.assertEqual([sink.timeout for sink in backend.sinks], [2, 1])
+        self.assertEqual([sink.max_pending for sink in backend.sinks], [10, 10])
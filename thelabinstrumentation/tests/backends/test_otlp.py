@@ -0,0 +1,270 @@
+from datetime import UTC, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.error import HTTPError
+import gzip
+import struct
+import threading
+
+from django.test import SimpleTestCase, override_settings
+
+from ...backends.histogram import Histogram
+from ...backends.otlp import OTLPBackend, OTLPExporter
+
+_Message = dict[int, list[Any]]
+
+
+def _read_varint(data: bytes, pos: int) -> tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return value, pos
+
+
+def decode(data: bytes) -> _Message:
+    """Decode one protobuf message into ``{field: [raw values]}``."""
+    fields: _Message = {}
+    pos = 0
+    while pos < len(data):
+        key, pos = _read_varint(data, pos)
+        field, wire_type = key >> 3, key & 7
+        value: Any
+        if wire_type == 0:
+            value, pos = _read_varint(data, pos)
+        elif wire_type == 1:
+            value, pos = data[pos : pos + 8], pos + 8
+        elif wire_type == 2:
+            length, pos = _read_varint(data, pos)
+            value, pos = data[pos : pos + length], pos + length
+        else:
+            raise ValueError(f"Unexpected wire type {wire_type}")
+        fields.setdefault(field, []).append(value)
+    return fields
+
+
+def _double(raw: bytes) -> float:
+    return float(struct.unpack("<d", raw)[0])
+
+
+def _fixed64(raw: bytes) -> int:
+    return int(struct.unpack("<Q", raw)[0])
+
+
+def _sint(value: int) -> int:
+    return (value >> 1) ^ -(value & 1)
+
+
+def _attributes(raw: list[bytes]) -> dict[str, str]:
+    attributes = {}
+    for item in raw:
+        key_value = decode(item)
+        value = decode(key_value[2][0])
+        attributes[key_value[1][0].decode()] = value[1][0].decode()
+    return attributes
+
+
+def _metrics(body: bytes) -> tuple[dict[str, str], dict[str, _Message]]:
+    """Resource attributes and metrics (by name) of an export request."""
+    resource_metrics = decode(decode(body)[1][0])
+    resource = _attributes(decode(resource_metrics[1][0]).get(1, []))
+    scope_metrics = decode(resource_metrics[2][0])
+    assert decode(scope_metrics[1][0])[1] == [b"thelabinstrumentation"]
+    metrics = {}
+    for raw in scope_metrics[2]:
+        metric = decode(raw)
+        metrics[metric[1][0].decode()] = metric
+    return resource, metrics
+
+
+class _Collector(ThreadingHTTPServer):
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _CollectorHandler)
+        self.requests: list[tuple[str, dict[str, str], bytes]] = []
+        # Statuses to answer with before accepting requests.
+        self.failures: list[tuple[int, dict[str, str]]] = []
+
+    @property
+    def endpoint(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1/metrics"
+
+
+class _CollectorHandler(BaseHTTPRequestHandler):
+    server: _Collector
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if self.server.failures:
+            status, headers = self.server.failures.pop(0)
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if self.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        self.server.requests.append((self.path, dict(self.headers), body))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-protobuf")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+@override_settings(THELAB_INSTRUMENTATION={"DIMENSIONS": {"Environment": "test"}})
+class OTLPExporterTestCase(SimpleTestCase):
+    """Test cases for the OTLP exporter, against a stand-in collector."""
+
+    def setUp(self) -> None:
+        self.collector = _Collector()
+        thread = threading.Thread(target=self.collector.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.collector.server_close)
+        self.addCleanup(self.collector.shutdown)
+
+    def _exporter(self, **kwargs: Any) -> OTLPExporter:
+        kwargs.setdefault("retry_backoff", 0.01)
+        return OTLPExporter(endpoint=self.collector.endpoint, **kwargs)
+
+    def _exported(self) -> list[tuple[dict[str, str], dict[str, _Message]]]:
+        return [_metrics(body) for _, _, body in self.collector.requests]
+
+    def test_gauges(self) -> None:
+        """Test that metrics are exported as gzipped gauges."""
+        exporter = self._exporter(
+            headers={"Authorization": "Bearer token"},
+            resource_attributes={"service.name": "shop"},
+        )
+        timestamp = datetime(2026, 1, 1, tzinfo=UTC)
+        exporter.send_metrics(
+            [
+                {
+                    "name": "rq.queued-jobs",
+                    "value": 3,
+                    "unit": "Count",
+                    "dimensions": {"Queue": "default"},
+                    "timestamp": timestamp,
+                },
+                {"name": "rq.queued-jobs", "value": 1.5, "unit": "Count"},
+            ]
+        )
+        self.assertEqual(len(self.collector.requests), 1)
+        path, headers, _ = self.collector.requests[0]
+        self.assertEqual(path, "/v1/metrics")
+        self.assertEqual(headers["Content-Type"], "application/x-protobuf")
+        self.assertEqual(headers["Content-Encoding"], "gzip")
+        self.assertEqual(headers["Authorization"], "Bearer token")
+        resource, metrics = self._exported()[0]
+        self.assertEqual(resource, {"Environment": "test", "service.name": "shop"})
+        metric = metrics["rq.queued-jobs"]
+        self.assertEqual(metric[3], [b"1"])
+        points = [decode(raw) for raw in decode(metric[5][0])[1]]
+        self.assertEqual(len(points), 2)
+        self.assertEqual(_attributes(points[0][7]), {"Queue": "default"})
+        self.assertEqual(_fixed64(points[0][3][0]), 1_767_225_600_000_000_000)
+        self.assertEqual(_double(points[0][4][0]), 3.0)
+        self.assertNotIn(7, points[1])
+        self.assertEqual(_double(points[1][4][0]), 1.5)
+
+    def test_delta_sums(self) -> None:
+        """Test that counters are monotonic delta sums over consecutive windows."""
+        exporter = self._exporter(counters=["orders"], compression="none")
+        exporter.send_metrics([{"name": "orders", "value": 2}])
+        exporter.send_metrics([{"name": "orders", "value": 3}])
+        self.assertNotIn("Content-Encoding", self.collector.requests[0][1])
+        points = []
+        for _, metrics in self._exported():
+            sum_ = decode(metrics["orders"][7][0])
+            self.assertEqual(sum_[2], [1])
+            self.assertEqual(sum_[3], [1])
+            points.append(decode(sum_[1][0]))
+        self.assertEqual([_double(p[4][0]) for p in points], [2.0, 3.0])
+        # Each window starts where the previous one ended.
+        self.assertEqual(points[1][2], points[0][3])
+        self.assertLess(_fixed64(points[0][2][0]), _fixed64(points[0][3][0]))
+
+    def test_cumulative_sums(self) -> None:
+        """Test that cumulative sums add up increments from a fixed start."""
+        exporter = self._exporter(counters=["orders"], temporality="cumulative")
+        exporter.send_metrics([{"name": "orders", "value": 2}])
+        exporter.send_metrics([{"name": "orders", "value": 3}])
+        points = []
+        for _, metrics in self._exported():
+            sum_ = decode(metrics["orders"][7][0])
+            self.assertEqual(sum_[2], [2])
+            points.append(decode(sum_[1][0]))
+        self.assertEqual([_double(p[4][0]) for p in points], [2.0, 5.0])
+        self.assertEqual(points[1][2], points[0][2])
+
+    def test_exponential_histograms(self) -> None:
+        """Test that histograms are exported as exponential histograms."""
+        histogram = Histogram(max_scale=0)
+        for value in (0, 1.5, 3, 3.5, 12, -3):
+            histogram.record(value)
+        exporter = self._exporter()
+        exporter.send_histograms(
+            [
+                {"name": "latency", "histogram": histogram, "unit": "Milliseconds"},
+                {"name": "empty", "histogram": Histogram()},
+            ]
+        )
+        _, metrics = self._exported()[0]
+        self.assertEqual(list(metrics), ["latency"])
+        self.assertEqual(metrics["latency"][3], [b"ms"])
+        exponential = decode(metrics["latency"][10][0])
+        self.assertEqual(exponential[2], [1])
+        point = decode(exponential[1][0])
+        self.assertEqual(_fixed64(point[4][0]), 6)
+        self.assertEqual(_double(point[5][0]), 17.0)
+        self.assertEqual(_sint(point[6][0]), 0)
+        self.assertEqual(_fixed64(point[7][0]), 1)
+        positive = decode(point[8][0])
+        self.assertEqual(_sint(positive[1][0]), 0)
+        self.assertEqual(positive[2], [bytes([1, 2, 0, 1])])
+        negative = decode(point[9][0])
+        self.assertEqual(_sint(negative[1][0]), 1)
+        self.assertEqual(negative[2], [bytes([1])])
+        self.assertEqual(_double(point[12][0]), -3.0)
+        self.assertEqual(_double(point[13][0]), 12.0)
+
+    def test_retries_with_backoff(self) -> None:
+        """Test that retryable failures are retried, honouring Retry-After."""
+        self.collector.failures = [(503, {}), (429, {"Retry-After": "0"})]
+        exporter = self._exporter()
+        exporter.send_metrics([{"name": "gauge", "value": 1}])
+        self.assertEqual(len(self.collector.requests), 1)
+
+    def test_gives_up(self) -> None:
+        """Test that permanent failures and exhausted retries raise."""
+        self.collector.failures = [(400, {})]
+        with self.assertRaises(HTTPError):
+            self._exporter().send_metrics([{"name": "gauge", "value": 1}])
+        self.collector.failures = [(503, {})] * 3
+        with self.assertRaises(HTTPError):
+            self._exporter(max_retries=2).send_metrics([{"name": "gauge", "value": 1}])
+        self.assertEqual(self.collector.requests, [])
+
+    def test_invalid_temporality(self) -> None:
+        """Test that unknown temporalities are rejected."""
+        with self.assertRaises(ValueError):
+            OTLPExporter(temporality="sometimes")  # type: ignore[arg-type]
+
+    def test_buffered_backend(self) -> None:
+        """Test that the backend batches datapoints in the background."""
+        backend = OTLPBackend(
+            endpoint=self.collector.endpoint, flush_size=100, flush_interval=60
+        )
+        self.addCleanup(backend.close)
+        for value in range(5):
+            backend.send_metric({"name": "gauge", "value": value})
+        self.assertEqual(self.collector.requests, [])
+        backend.flush()
+        self.assertEqual(len(self.collector.requests), 1)
+        _, metrics = self._exported()[0]
+        self.assertEqual(len(decode(metrics["gauge"][5][0])[1]), 5)
@@ -0,0 +1,164 @@
+from wsgiref.util import setup_testing_defaults
+import asyncio
+import threading
+
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from ...backends.histogram import Histogram
+from ...backends.prometheus import (
+    AsyncPrometheusBackend,
+    PrometheusBackend,
+    PrometheusStore,
+    default_store,
+    make_wsgi_app,
+    metrics_view,
+)
+
+
+@override_settings(THELAB_INSTRUMENTATION={"DIMENSIONS": {"Environment": "test"}})
+class PrometheusBackendTestCase(SimpleTestCase):
+    """Test cases for the Prometheus exposition backend."""
+
+    def setUp(self) -> None:
+        self.store = PrometheusStore(buckets=(10, 100))
+        self.backend = PrometheusBackend(store=self.store, counters=["orders"])
+
+    def _lines(self) -> list[str]:
+        return self.store.render().decode().splitlines()
+
+    def test_gauges_keep_latest_value(self) -> None:
+        """Test that metrics are gauges labelled with their dimensions."""
+        self.backend.send_metrics(
+            [
+                {"name": "rq.queued-jobs", "value": 3, "dimensions": {"Q": "a"}},
+                {"name": "rq.queued-jobs", "value": 1.5, "dimensions": {"Q": "b"}},
+            ]
+        )
+        self.backend.send_metric(
+            {"name": "rq.queued-jobs", "value": 7, "dimensions": {"Q": "a"}}
+        )
+        self.assertEqual(
+            self._lines(),
+            [
+                "# TYPE rq_queued_jobs gauge",
+                'rq_queued_jobs{Environment="test",Q="a"} 7',
+                'rq_queued_jobs{Environment="test",Q="b"} 1.5',
+            ],
+        )
+        self.assertEqual(len(self.store), 2)
+
+    def test_counters_accumulate(self) -> None:
+        """Test that metrics named as counters sum their increments."""
+        self.backend.send_metric({"name": "orders", "value": 2})
+        self.backend.send_metric({"name": "orders", "value": 3})
+        self.assertEqual(
+            self._lines(),
+            ["# TYPE orders_total counter", 'orders_total{Environment="test"} 5'],
+        )
+
+    def test_histograms_are_cumulative(self) -> None:
+        """Test that histograms are exposed with cumulative buckets."""
+        histogram = Histogram()
+        for value in (5, 50, 500):
+            histogram.record(value)
+        self.backend.send_histograms([{"name": "latency", "histogram": histogram}])
+        self.backend.send_histograms([{"name": "latency", "histogram": histogram}])
+        self.assertEqual(
+            self._lines(),
+            [
+                "# TYPE latency histogram",
+                'latency_bucket{Environment="test",le="10"} 2',
+                'latency_bucket{Environment="test",le="100"} 4',
+                'latency_bucket{Environment="test",le="+Inf"} 6',
+                'latency_sum{Environment="test"} 1110',
+                'latency_count{Environment="test"} 6',
+            ],
+        )
+
+    def test_names_and_labels_are_sanitized(self) -> None:
+        """Test that invalid characters are replaced and values escaped."""
+        backend = PrometheusBackend(store=self.store, namespace="app")
+        backend.send_metric(
+            {"name": "1.req-time", "value": 1, "dimensions": {"a-b": 'say "hi"\n'}}
+        )
+        self.assertIn(
+            'app_1_req_time{Environment="test",a_b="say \\"hi\\"\\n"} 1',
+            self._lines(),
+        )
+
+    def test_type_conflict(self) -> None:
+        """Test that a name can't be both a gauge and a histogram."""
+        self.backend.send_metric({"name": "latency", "value": 1})
+        histogram = Histogram()
+        histogram.record(1)
+        with self.assertRaises(ValueError):
+            self.backend.send_histograms([{"name": "latency", "histogram": histogram}])
+
+    def test_render_is_cached_until_updated(self) -> None:
+        """Test that unchanged stores reuse the previous rendering."""
+        self.backend.send_metric({"name": "gauge", "value": 1})
+        rendered = self.store.render()
+        self.assertIs(self.store.render(), rendered)
+        self.backend.send_metric({"name": "gauge", "value": 2})
+        self.assertIsNot(self.store.render(), rendered)
+        self.store.clear()
+        self.assertEqual(self.store.render(), b"")
+
+    def test_render_while_updating(self) -> None:
+        """Test that scrapes don't block on, or break during, concurrent updates."""
+        for name in range(50):
+            for label in range(200):
+                self.store.set(f"gauge_{name}", (("i", str(label)),), 0)
+        stop = threading.Event()
+
+        def update() -> None:
+            i = 0
+            while not stop.is_set():
+                self.store.set(f"gauge_{i % 50}", (("i", str(i % 199)),), i)
+                i += 1
+
+        writer = threading.Thread(target=update)
+        writer.start()
+        try:
+            for _ in range(50):
+                self.store.render()
+        finally:
+            stop.set()
+            writer.join()
+        self.assertEqual(len(self.store), 10_000)
+
+    def test_async_backend(self) -> None:
+        """Test that the async backend updates the same store."""
+        backend = AsyncPrometheusBackend(store=self.store)
+        asyncio.run(backend.send_metric({"name": "gauge", "value": 4}))
+        self.assertEqual(self._lines()[1], 'gauge{Environment="test"} 4')
+
+
+@override_settings(THELAB_INSTRUMENTATION={"DIMENSIONS": {}})
+class PrometheusViewsTestCase(SimpleTestCase):
+    """Test cases for serving the default store."""
+
+    def setUp(self) -> None:
+        default_store.clear()
+        self.addCleanup(default_store.clear)
+        PrometheusBackend().send_metric({"name": "up", "value": 1})
+
+    def test_django_view(self) -> None:
+        """Test that the Django view serves the default store."""
+        response = metrics_view(RequestFactory().get("/metrics"))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        self.assertEqual(response.content, b"# TYPE up gauge\nup 1\n")
+
+    def test_wsgi_app(self) -> None:
+        """Test that the WSGI app serves the given store."""
+        environ: dict[str, object] = {}
+        setup_testing_defaults(environ)
+        statuses: list[str] = []
+
+        def start_response(status: str, headers: list[tuple[str, str]]) -> None:
+            statuses.append(status)
+
+        body = make_wsgi_app()(environ, start_response)  # type: ignore[arg-type]
+        self.assertEqual(b"".join(body), b"# TYPE up gauge\nup 1\n")
+        self.assertEqual(statuses, ["200 OK"])
@@ -0,0 +1,132 @@
+from collections.abc import Iterable
+from tempfile import TemporaryDirectory
+import asyncio
+import os
+import socket
+
+from django.test import SimpleTestCase, override_settings
+
+from ...backends.histogram import Histogram
+from ...backends.statsd import AsyncStatsDBackend, StatsDBackend
+
+
+@override_settings(THELAB_INSTRUMENTATION={"DIMENSIONS": {"env": "test"}})
+class StatsDBackendTestCase(SimpleTestCase):
+    """Test cases for the StatsD backend, against a local UDP listener."""
+
+    def setUp(self) -> None:
+        self.listener = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.listener.bind(("127.0.0.1", 0))
+        self.listener.settimeout(5)
+        self.addCleanup(self.listener.close)
+        self.port = self.listener.getsockname()[1]
+
+    def _make_backend(
+        self,
+        prefix: str = "",
+        counters: Iterable[str] = (),
+        max_packet_size: int | None = None,
+    ) -> StatsDBackend:
+        backend = StatsDBackend(
+            host="127.0.0.1",
+            port=self.port,
+            prefix=prefix,
+            counters=counters,
+            max_packet_size=max_packet_size,
+        )
+        self.addCleanup(backend.close)
+        return backend
+
+    def _receive(self) -> list[str]:
+        return self.listener.recv(65535).decode().split("\n")
+
+    def test_gauges_and_counters(self) -> None:
+        """Test that metrics are formatted with their type and tags."""
+        backend = self._make_backend(prefix="app", counters=["orders"])
+        backend.send_metrics(
+            [
+                {
+                    "name": "rq.queued-jobs",
+                    "value": 3,
+                    "unit": "Count",
+                    "dimensions": {"QueueName": "default"},
+                },
+                {"name": "orders", "value": 2},
+                {"name": "load", "value": 0.5, "unit": "None"},
+            ]
+        )
+        self.assertEqual(
+            self._receive(),
+            [
+                "app.rq.queued-jobs:3|g|#QueueName:default,env:test,unit:Count",
+                "app.orders:2|c|#env:test",
+                "app.load:0.5|g|#env:test",
+            ],
+        )
+
+    def test_invalid_characters_are_replaced(self) -> None:
+        """Test that protocol delimiters in names and tags are replaced."""
+        backend = self._make_backend()
+        backend.send_metric(
+            {"name": "a:b|c", "value": 1, "dimensions": {"x y": "1,2|3"}}
+        )
+        self.assertEqual(self._receive(), ["a_b_c:1|g|#env:test,x_y:1_2_3"])
+
+    def test_coalesces_into_packets(self) -> None:
+        """Test that lines are packed into datagrams up to max_packet_size."""
+        backend = self._make_backend(max_packet_size=100)
+        backend.send_metrics([{"name": f"metric.{i}", "value": i} for i in range(20)])
+        lines: list[str] = []
+        while len(lines) < 20:
+            packet = self.listener.recv(65535)
+            self.assertLessEqual(len(packet), 100)
+            lines += packet.decode().split("\n")
+        self.assertEqual(lines, [f"metric.{i}:{i}|g|#env:test" for i in range(20)])
+
+    def test_histograms_are_distributions(self) -> None:
+        """Test that histogram buckets are sent as sampled distribution values."""
+        histogram = Histogram()
+        histogram.record(10, count=4)
+        histogram.record(100)
+        backend = self._make_backend()
+        backend.send_histograms(
+            [{"name": "latency", "histogram": histogram, "unit": "Milliseconds"}]
+        )
+        samples = [line.split("|") for line in self._receive()]
+        self.assertEqual(
+            [sample[1:] for sample in samples],
+            [
+                ["d", "@0.25", "#env:test,unit:Milliseconds"],
+                ["d", "#env:test,unit:Milliseconds"],
+            ],
+        )
+        values = [float(sample[0].removeprefix("latency:")) for sample in samples]
+        self.assertAlmostEqual(values[0], 10, delta=0.1)
+        self.assertAlmostEqual(values[1], 100, delta=0.5)
+
+    def test_unreachable_agent_is_ignored(self) -> None:
+        """Test that sends never raise, and drops are counted."""
+        backend = StatsDBackend(socket_path="/nonexistent/statsd.sock")
+        backend.send_metric({"name": "metric", "value": 1})
+        self.assertEqual(backend.dropped, 1)
+
+    def test_unix_datagram_socket(self) -> None:
+        """Test that metrics can be sent over a Unix datagram socket."""
+        with TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "statsd.sock")
+            listener = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            listener.bind(path)
+            listener.settimeout(5)
+            self.addCleanup(listener.close)
+            backend = StatsDBackend(socket_path=path)
+            self.addCleanup(backend.close)
+            self.assertEqual(backend.max_packet_size, 8192)
+            backend.send_metric({"name": "metric", "value": 1})
+            self.assertEqual(listener.recv(8192), b"metric:1|g|#env:test")
+
+    def test_async_backend(self) -> None:
+        """Test that the async backend sends the same lines."""
+        backend = AsyncStatsDBackend(host="127.0.0.1", port=self.port)
+        self.addCleanup(backend.close)
+        asyncio.run(backend.send_metric({"name": "metric", "value": 1}))
+        self.assertEqual(self._receive(), ["metric:1|g|#env:test"])
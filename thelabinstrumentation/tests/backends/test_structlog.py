@@ -1,10 +1,12 @@
 from datetime import datetime
 from unittest import TestCase
 from unittest.mock import Mock, patch
+import asyncio
 
 import structlog.testing
 
-from ...backends.structlog import StructlogBackend
+from ...backends.histogram import Histogram
+from ...backends.structlog import AsyncStructlogBackend, StructlogBackend
 
 
 class StructlogBackendTestCase(TestCase):
@@ -187,3 +189,56 @@ class StructlogBackendTestCase(TestCase):
         self.assertEqual(log_entry["unit"], "Count")
         self.assertEqual(log_entry["dimensions"], {})
         self.assertEqual(log_entry["timestamp"], current_time.isoformat())
+
+
+class AsyncStructlogBackendTestCase(TestCase):
+    """Test cases for the async structlog metrics backend."""
+
+    def test_send_metrics(self) -> None:
+        """Test that metrics are logged from a coroutine."""
+        backend = AsyncStructlogBackend()
+        current_time = datetime(2023, 1, 1, 12, 0, 0)
+        with (
+            structlog.testing.capture_logs() as captured,
+            patch.object(backend, "_get_all_dimensions", return_value={}),
+            patch("django.utils.timezone.now", return_value=current_time),
+        ):
+            asyncio.run(
+                backend.send_metrics(
+                    [
+                        {"name": "metric_1", "value": 1.0, "unit": "Count"},
+                        {"name": "metric_2", "value": 2.0},
+                    ]
+                )
+            )
+        self.assertEqual(
+            [entry["name"] for entry in captured], ["metric_1", "metric_2"]
+        )
+        self.assertEqual(captured[0]["unit"], "Count")
+        self.assertEqual(captured[1]["timestamp"], current_time.isoformat())
+
+
+class StructlogBackendHistogramTestCase(TestCase):
+    """Test cases for logging histograms with structlog."""
+
+    def test_send_histograms_logs_percentiles(self) -> None:
+        """Test that each histogram is logged as one event with percentiles."""
+        backend = StructlogBackend()
+        histogram = Histogram()
+        for value in range(1, 101):
+            histogram.record(float(value))
+        with (
+            structlog.testing.capture_logs() as captured,
+            patch.object(backend, "_get_all_dimensions", return_value={"env": "t"}),
+        ):
+            backend.send_histograms(
+                [{"name": "latency", "histogram": histogram, "unit": "Milliseconds"}]
+            )
+        self.assertEqual(len(captured), 1)
+        entry = captured[0]
+        self.assertEqual(entry["event"], "send_histogram")
+        self.assertEqual(entry["name"], "latency")
+        self.assertEqual(entry["unit"], "Milliseconds")
+        self.assertEqual(entry["dimensions"], {"env": "t"})
+        self.assertEqual(entry["count"], 100)
+        self.assertAlmostEqual(entry["p90"], 90.0, delta=3.0)
@@ -1,11 +1,24 @@
+from datetime import timedelta
 from unittest.mock import MagicMock, Mock, patch
-
-from django.test import SimpleTestCase
-
+import threading
+
+from django.test import SimpleTestCase, override_settings
+from redis import Redis
+from redis.client import Pipeline
+from rq import Queue
+from rq.utils import now as rq_now
+from rq.utils import utcformat
+from rq.worker import Worker
+import django_rq
+
+from ... import metrics
 from ...backends import MetricData, MetricsBackend
+from ...rq import daemon
 from ...rq.daemon import (
+    LEADER_LEASE_KEY,
     BackgroundMetricsSenderThread,
-    _threadlocals,
+    _group_by_connection,
+    _restart_after_fork,
     ensure_bg_sender_thread_running,
 )
 
@@ -28,28 +41,37 @@ class ConcreteMetricsBackend(MetricsBackend):
 class BackgroundMetricsSenderThreadTestCase(SimpleTestCase):
     """Test cases for the BackgroundMetricsSenderThread class."""
 
-    @patch("thelabinstrumentation.rq.daemon.Worker")
+    def setUp(self) -> None:
+        # Leader election is covered separately; every test thread publishes.
+        lease_patcher = patch.object(
+            BackgroundMetricsSenderThread, "get_lease", return_value=None
+        )
+        lease_patcher.start()
+        self.addCleanup(lease_patcher.stop)
+        self.queues = [django_rq.get_queue(name) for name in ("default", "high")]
+        self.connection = self.queues[0].connection
+        self.connection.flushdb()
+        self.addCleanup(self.connection.flushdb)
+
+    def _populate(self, queue: Queue, queued: int, workers: int, finished: int) -> None:
+        for i in range(queued):
+            self.connection.rpush(queue.key, f"{queue.name}-queued-{i}")
+        for i in range(workers):
+            self.connection.sadd(
+                f"rq:workers:{queue.name}", f"rq:worker:{queue.name}-{i}"
+            )
+        for i in range(finished):
+            self.connection.zadd(
+                queue.finished_job_registry.key, {f"{queue.name}-finished-{i}": i}
+            )
+
     @patch("thelabinstrumentation.rq.daemon.django_rq.queues.get_queues")
-    def test_send_metrics(self, mock_get_queues: Mock, mock_worker_class: Mock) -> None:
+    def test_send_metrics(self, mock_get_queues: Mock) -> None:
         """Test the send_metrics method."""
-        # Setup mock queues
-        mock_default_queue = Mock()
-        mock_default_queue.name = "default"
-        mock_default_queue.count = 10
-        mock_default_queue.finished_job_registry.get_job_count.return_value = 20
-
-        mock_high_queue = Mock()
-        mock_high_queue.name = "high"
-        mock_high_queue.count = 5
-        mock_high_queue.finished_job_registry.get_job_count.return_value = 15
-
-        mock_get_queues.return_value = [mock_default_queue, mock_high_queue]
-
-        # Worker.count returns different values per queue
-        def worker_count(queue: Mock) -> int:
-            return {"default": 1, "high": 2}[queue.name]
-
-        mock_worker_class.count.side_effect = worker_count
+        default, high = self.queues
+        self._populate(default, queued=10, workers=1, finished=20)
+        self._populate(high, queued=5, workers=2, finished=15)
+        mock_get_queues.return_value = self.queues
 
         # Create a concrete backend to test with
         backend = ConcreteMetricsBackend()
@@ -58,54 +80,200 @@ class BackgroundMetricsSenderThreadTestCase(SimpleTestCase):
         thread = BackgroundMetricsSenderThread()
         thread.send_metrics(backend)
 
-        # We should have 8 metrics: 4 for each of the 2 queues
-        self.assertEqual(len(backend.metrics), 8)
+        # We should have 24 metrics: 12 for each of the 2 queues
+        self.assertEqual(len(backend.metrics), 24)
+        values = {
+            (m["dimensions"]["QueueName"], m["name"]): m["value"]
+            for m in backend.metrics
+        }
+        self.assertEqual(
+            values,
+            {
+                ("default", "rq.queued-jobs"): 10,
+                ("default", "rq.finished-jobs"): 20,
+                ("default", "rq.started-jobs"): 0,
+                ("default", "rq.failed-jobs"): 0,
+                ("default", "rq.deferred-jobs"): 0,
+                ("default", "rq.scheduled-jobs"): 0,
+                ("default", "rq.workers"): 1,
+                ("default", "rq.queued-jobs-per-worker"): 10.0,
+                ("default", "rq.busy-workers"): 0,
+                ("default", "rq.worker-utilization"): 0,
+                ("default", "rq.in-flight-job-age"): 0.0,
+                ("default", "rq.oldest-job-age"): 0.0,
+                ("high", "rq.queued-jobs"): 5,
+                ("high", "rq.finished-jobs"): 15,
+                ("high", "rq.started-jobs"): 0,
+                ("high", "rq.failed-jobs"): 0,
+                ("high", "rq.deferred-jobs"): 0,
+                ("high", "rq.scheduled-jobs"): 0,
+                ("high", "rq.workers"): 2,
+                ("high", "rq.queued-jobs-per-worker"): 2.5,
+                ("high", "rq.busy-workers"): 0,
+                ("high", "rq.worker-utilization"): 0,
+                ("high", "rq.in-flight-job-age"): 0.0,
+                ("high", "rq.oldest-job-age"): 0.0,
+            },
+        )
 
-        # Check metrics for the default queue
-        default_metrics = [
-            m for m in backend.metrics if m["dimensions"]["QueueName"] == "default"
-        ]
-        self.assertEqual(len(default_metrics), 4)
+    @patch("thelabinstrumentation.rq.daemon.django_rq.queues.get_queues")
+    def test_send_metrics_registries(self, mock_get_queues: Mock) -> None:
+        """Test that the started, failed, deferred and scheduled registries are read."""
+        default, _ = self.queues
+        mock_get_queues.return_value = [default]
+        for registry, count in (
+            (default.started_job_registry, 1),
+            (default.failed_job_registry, 2),
+            (default.deferred_job_registry, 3),
+            (default.scheduled_job_registry, 4),
+        ):
+            self.connection.zadd(registry.key, {f"job-{i}": i for i in range(count)})
+        backend = ConcreteMetricsBackend()
+        BackgroundMetricsSenderThread().send_metrics(backend)
+        values = {m["name"]: m["value"] for m in backend.metrics}
+        self.assertEqual(values["rq.started-jobs"], 1)
+        self.assertEqual(values["rq.failed-jobs"], 2)
+        self.assertEqual(values["rq.deferred-jobs"], 3)
+        self.assertEqual(values["rq.scheduled-jobs"], 4)
 
-        # Verify each metric for default queue
-        self.assertEqual(
-            [m for m in default_metrics if m["name"] == "rq.queued-jobs"][0]["value"],
-            10,
+    @patch("thelabinstrumentation.rq.daemon.django_rq.queues.get_queues")
+    def test_send_metrics_oldest_job_age(self, mock_get_queues: Mock) -> None:
+        """Test that the age of the job at the head of each queue is reported."""
+        default, high = self.queues
+        mock_get_queues.return_value = self.queues
+        oldest = default.enqueue(print)
+        default.enqueue(print)
+        high.enqueue(print)
+        self.connection.hset(
+            oldest.key,
+            "enqueued_at",
+            utcformat(rq_now() - timedelta(seconds=90)),
         )
+        backend = ConcreteMetricsBackend()
+        with patch.object(
+            Pipeline, "execute", autospec=True, side_effect=Pipeline.execute
+        ) as mock_execute:
+            BackgroundMetricsSenderThread().send_metrics(backend)
+        # One pipeline for the queue readings, one for the oldest jobs.
+        self.assertEqual(mock_execute.call_count, 2)
+        ages = {
+            m["dimensions"]["QueueName"]: m["value"]
+            for m in backend.metrics
+            if m["name"] == "rq.oldest-job-age"
+        }
+        self.assertAlmostEqual(ages["default"], 90, delta=5)
+        self.assertLess(ages["high"], 5)
 
-        # Check metrics for the high queue
-        high_metrics = [
-            m for m in backend.metrics if m["dimensions"]["QueueName"] == "high"
-        ]
-        self.assertEqual(len(high_metrics), 4)
+    @patch("thelabinstrumentation.rq.daemon.django_rq.queues.get_queues")
+    def test_send_metrics_worker_utilization(self, mock_get_queues: Mock) -> None:
+        """Test that busy workers and their in-flight jobs are reported per queue."""
+        default, high = self.queues
+        mock_get_queues.return_value = self.queues
+        started_at = utcformat(rq_now() - timedelta(seconds=60))
+        self.connection.hset("rq:job:job-1", "started_at", started_at)
+        self.connection.hset(
+            "rq:worker:busy", mapping={"state": "busy", "current_job": "job-1"}
+        )
+        self.connection.hset("rq:worker:idle", "state", "idle")
+        self.connection.sadd("rq:workers:default", "rq:worker:busy", "rq:worker:idle")
+        self.connection.sadd("rq:workers:high", "rq:worker:busy")
+        backend = ConcreteMetricsBackend()
+        with patch.object(
+            Pipeline, "execute", autospec=True, side_effect=Pipeline.execute
+        ) as mock_execute:
+            BackgroundMetricsSenderThread().send_metrics(backend)
+        # Queue readings, worker states, then the in-flight jobs.
+        self.assertEqual(mock_execute.call_count, 3)
+        values = {
+            (m["dimensions"]["QueueName"], m["name"]): m["value"]
+            for m in backend.metrics
+        }
+        self.assertEqual(values[("default", "rq.workers")], 2)
+        self.assertEqual(values[("default", "rq.busy-workers")], 1)
+        self.assertEqual(values[("default", "rq.worker-utilization")], 50)
+        self.assertAlmostEqual(values[("default", "rq.in-flight-job-age")], 60, delta=5)
+        self.assertEqual(values[("high", "rq.workers")], 1)
+        self.assertEqual(values[("high", "rq.busy-workers")], 1)
+        self.assertEqual(values[("high", "rq.worker-utilization")], 100)
 
-        # Verify each metric for high queue
-        self.assertEqual(
-            [m for m in high_metrics if m["name"] == "rq.queued-jobs"][0]["value"],
-            5,
+    @patch("thelabinstrumentation.rq.daemon.django_rq.queues.get_queues")
+    def test_send_metrics_throughput(self, mock_get_queues: Mock) -> None:
+        """Test that jobs completed since the previous collection are counted."""
+        mock_get_queues.return_value = self.queues
+        self.connection.sadd("rq:workers:default", "rq:worker:a", "rq:worker:b")
+        self.connection.sadd("rq:workers:high", "rq:worker:b")
+        self.connection.hset("rq:worker:a", mapping={"successful_job_count": 10})
+        self.connection.hset(
+            "rq:worker:b",
+            mapping={"successful_job_count": 5, "failed_job_count": 1},
         )
+        thread = BackgroundMetricsSenderThread()
 
-        # Verify get_job_count was called with cleanup=False
-        mock_default_queue.finished_job_registry.get_job_count.assert_called_with(
-            cleanup=False,
+        def throughput() -> dict[str, float]:
+            backend = ConcreteMetricsBackend()
+            thread.send_metrics(backend)
+            return {
+                m["dimensions"]["QueueName"]: m["value"]
+                for m in backend.metrics
+                if m["name"] == "rq.throughput"
+            }
+
+        # Nothing to compare against on the first pass.
+        self.assertEqual(throughput(), {})
+        self.connection.hincrby("rq:worker:a", "successful_job_count", 3)
+        self.connection.hincrby("rq:worker:b", "failed_job_count", 2)
+        self.assertEqual(throughput(), {"default": 5, "high": 2})
+        self.assertEqual(throughput(), {"default": 0, "high": 0})
+        # New workers count every job they completed, and restarted ones
+        # don't make throughput negative.
+        self.connection.sadd("rq:workers:high", "rq:worker:c")
+        self.connection.hset("rq:worker:c", "successful_job_count", 4)
+        self.connection.hset("rq:worker:b", mapping={"successful_job_count": 1})
+        self.connection.hdel("rq:worker:b", "failed_job_count")
+        self.assertEqual(throughput(), {"default": 1, "high": 5})
+        # Throughput doesn't depend on the finished registries.
+        self.connection.zadd(
+            self.queues[0].finished_job_registry.key, {"job-1": float("inf")}
         )
-        mock_high_queue.finished_job_registry.get_job_count.assert_called_with(
-            cleanup=False,
+        self.assertEqual(throughput(), {"default": 0, "high": 0})
+
+    @patch("thelabinstrumentation.rq.daemon.django_rq.queues.get_queues")
+    def test_send_metrics_single_round_trip_per_connection(
+        self, mock_get_queues: Mock
+    ) -> None:
+        """Test that all queues on one Redis server are read in one pipeline."""
+        queues = [django_rq.get_queue(name) for name in ("default", "high", "low")]
+        mock_get_queues.return_value = queues
+        with patch.object(
+            Pipeline, "execute", autospec=True, side_effect=Pipeline.execute
+        ) as mock_execute:
+            BackgroundMetricsSenderThread().send_metrics(ConcreteMetricsBackend())
+        mock_execute.assert_called_once()
+
+    def test_group_by_connection(self) -> None:
+        """Test that queues are grouped by server, not by client instance."""
+        default, high = self.queues
+        other = Queue("other", connection=Redis(host="other.example.com"))
+        self.assertIsNot(default.connection, high.connection)
+        groups = _group_by_connection([default, other, high])
+        self.assertEqual(
+            [[queue.name for queue in group] for _, group in groups],
+            [["default", "high"], ["other"]],
         )
 
-    @patch("thelabinstrumentation.rq.daemon.time.sleep")
+    @patch("thelabinstrumentation.rq.daemon.IntervalScheduler.wait")
     @patch("thelabinstrumentation.rq.daemon.sentry_sdk")
     @patch("thelabinstrumentation.rq.daemon.get_backend")
     def test_run_method(
-        self, mock_get_backend: Mock, mock_sentry_sdk: Mock, mock_sleep: Mock
+        self, mock_get_backend: Mock, mock_sentry_sdk: Mock, mock_wait: Mock
     ) -> None:
         """Test the run method."""
         # Setup mocks
         mock_backend = Mock()
         mock_get_backend.return_value = mock_backend
 
-        # Make sleep raise exception after first call to break the infinite loop
-        mock_sleep.side_effect = [Exception("Stop loop")]
+        # Make wait raise exception after first call to break the infinite loop
+        mock_wait.side_effect = [Exception("Stop loop")]
 
         # Create thread and patch send_metrics to avoid actual sending
         thread = BackgroundMetricsSenderThread()
@@ -121,21 +289,16 @@ class BackgroundMetricsSenderThreadTestCase(SimpleTestCase):
         thread.send_metrics.assert_called_with(mock_backend)
         self.assertEqual(thread.send_metrics.call_count, 1)
 
-        # Verify sleep was called with the configured interval
-        # Note: We use assert_any_call instead of assert_called_once because
-        # fakeredis's TcpFakeServer may call time.sleep(0) internally, and since
-        # the patch is on the shared time module, those calls are also captured.
-        from ...conf import config
-
-        mock_sleep.assert_any_call(config.update_interval)
+        # Verify the thread waited for the next interval
+        mock_wait.assert_called_once_with(1)
 
         # Test exception handling
         thread.send_metrics.reset_mock()
-        mock_sleep.reset_mock()
+        mock_wait.reset_mock()
 
-        # Make send_metrics raise an exception, then sleep raise exception
+        # Make send_metrics raise an exception, then wait raise exception
         thread.send_metrics.side_effect = Exception("Metric error")
-        mock_sleep.side_effect = Exception("Stop loop")
+        mock_wait.side_effect = Exception("Stop loop")
 
         # Run again and it should handle the exception from send_metrics
         with self.assertRaises(Exception) as context:
@@ -146,14 +309,38 @@ class BackgroundMetricsSenderThreadTestCase(SimpleTestCase):
         # Verify the exception was captured by Sentry
         mock_sentry_sdk.capture_exception.assert_called_once()
 
-        # Verify sleep was called with the configured interval
-        mock_sleep.assert_any_call(config.update_interval)
+        # Verify the thread waited for the next interval
+        mock_wait.assert_called_once_with(1)
+
+    @patch("thelabinstrumentation.rq.daemon.IntervalScheduler.wait")
+    @patch("thelabinstrumentation.rq.daemon.get_backend")
+    def test_run_wait_first(self, mock_get_backend: Mock, mock_wait: Mock) -> None:
+        """Test that a thread started after a fork waits before publishing."""
+        mock_wait.side_effect = [True, False]
+        thread = BackgroundMetricsSenderThread(wait_first=True)
+        with patch.object(thread, "send_metrics") as mock_send_metrics:
+            thread.run()
+        mock_send_metrics.assert_called_once_with(mock_get_backend.return_value)
+        self.assertEqual(mock_wait.call_count, 2)
+
+    @patch("thelabinstrumentation.rq.daemon.IntervalScheduler.wait")
+    @patch("thelabinstrumentation.rq.daemon.get_backend")
+    def test_run_wait_first_stopped(
+        self, mock_get_backend: Mock, mock_wait: Mock
+    ) -> None:
+        """Test that no backend or lease is created before the first wait ends."""
+        mock_wait.return_value = False
+        thread = BackgroundMetricsSenderThread(wait_first=True)
+        with patch.object(thread, "get_lease") as mock_get_lease:
+            thread.run()
+        mock_get_backend.assert_not_called()
+        mock_get_lease.assert_not_called()
 
-    @patch("thelabinstrumentation.rq.daemon.time.sleep")
+    @patch("thelabinstrumentation.rq.daemon.IntervalScheduler.wait")
     @patch("thelabinstrumentation.rq.daemon.sentry_sdk")
     @patch("thelabinstrumentation.rq.daemon.get_backend")
     def test_run_redis_connection_error_no_sentry(
-        self, mock_get_backend: Mock, mock_sentry_sdk: Mock, mock_sleep: Mock
+        self, mock_get_backend: Mock, mock_sentry_sdk: Mock, mock_wait: Mock
     ) -> None:
         """Test that Redis connection errors are not reported to Sentry."""
         from redis.exceptions import ConnectionError as RedisConnectionError
@@ -168,7 +355,7 @@ class BackgroundMetricsSenderThreadTestCase(SimpleTestCase):
             side_effect=RedisConnectionError("Connection refused"),
         ):
             # Let it loop twice then break
-            mock_sleep.side_effect = [None, Exception("Stop loop")]
+            mock_wait.side_effect = [True, Exception("Stop loop")]
 
             with self.assertRaises(Exception) as context:
                 thread.run()
@@ -178,17 +365,15 @@ class BackgroundMetricsSenderThreadTestCase(SimpleTestCase):
             # Sentry should NOT have been called
             mock_sentry_sdk.capture_exception.assert_not_called()
 
-    @patch("thelabinstrumentation.rq.daemon.time.sleep")
+    @patch("thelabinstrumentation.rq.daemon.IntervalScheduler.wait")
     @patch("thelabinstrumentation.rq.daemon.sentry_sdk")
     @patch("thelabinstrumentation.rq.daemon.get_backend")
     def test_run_redis_connection_error_backoff(
-        self, mock_get_backend: Mock, mock_sentry_sdk: Mock, mock_sleep: Mock
+        self, mock_get_backend: Mock, mock_sentry_sdk: Mock, mock_wait: Mock
     ) -> None:
         """Test that consecutive Redis connection errors cause backoff."""
         from redis.exceptions import ConnectionError as RedisConnectionError
 
-        from ...conf import config
-
         mock_backend = Mock()
         mock_get_backend.return_value = mock_backend
 
@@ -198,33 +383,33 @@ class BackgroundMetricsSenderThreadTestCase(SimpleTestCase):
             "send_metrics",
             side_effect=RedisConnectionError("Connection refused"),
         ):
-            # Let it loop 3 times: sleep intervals should be 1x, 2x, 3x
-            sleep_calls: list[float] = []
+            # Let it loop 3 times: waits should be 1, 2 and 3 intervals
+            wait_calls: list[int] = []
 
-            def track_sleep(interval: float) -> None:
-                sleep_calls.append(interval)
-                if len(sleep_calls) >= 3:
+            def track_wait(periods: int = 1) -> bool:
+                wait_calls.append(periods)
+                if len(wait_calls) >= 3:
                     raise Exception("Stop loop")
+                return True
 
-            mock_sleep.side_effect = track_sleep
+            mock_wait.side_effect = track_wait
 
             with self.assertRaises(Exception):
                 thread.run()
 
-            self.assertEqual(sleep_calls[0], config.update_interval * 1)
-            self.assertEqual(sleep_calls[1], config.update_interval * 2)
-            self.assertEqual(sleep_calls[2], config.update_interval * 3)
+            self.assertEqual(wait_calls[0], 1)
+            self.assertEqual(wait_calls[1], 2)
+            self.assertEqual(wait_calls[2], 3)
 
-    @patch("thelabinstrumentation.rq.daemon.time.sleep")
+    @patch("thelabinstrumentation.rq.daemon.IntervalScheduler.wait")
     @patch("thelabinstrumentation.rq.daemon.sentry_sdk")
     @patch("thelabinstrumentation.rq.daemon.get_backend")
     def test_run_redis_connection_error_backoff_cap(
-        self, mock_get_backend: Mock, mock_sentry_sdk: Mock, mock_sleep: Mock
+        self, mock_get_backend: Mock, mock_sentry_sdk: Mock, mock_wait: Mock
     ) -> None:
         """Test that backoff is capped at _MAX_BACKOFF_MULTIPLIER."""
         from redis.exceptions import ConnectionError as RedisConnectionError
 
-        from ...conf import config
         from ...rq.daemon import _MAX_BACKOFF_MULTIPLIER
 
         mock_backend = Mock()
@@ -236,34 +421,32 @@ class BackgroundMetricsSenderThreadTestCase(SimpleTestCase):
             "send_metrics",
             side_effect=RedisConnectionError("Connection refused"),
         ):
-            sleep_calls: list[float] = []
+            wait_calls: list[int] = []
 
-            def track_sleep(interval: float) -> None:
-                sleep_calls.append(interval)
-                if len(sleep_calls) >= _MAX_BACKOFF_MULTIPLIER + 2:
+            def track_wait(periods: int = 1) -> bool:
+                wait_calls.append(periods)
+                if len(wait_calls) >= _MAX_BACKOFF_MULTIPLIER + 2:
                     raise Exception("Stop loop")
+                return True
 
-            mock_sleep.side_effect = track_sleep
+            mock_wait.side_effect = track_wait
 
             with self.assertRaises(Exception):
                 thread.run()
 
-            max_sleep = config.update_interval * _MAX_BACKOFF_MULTIPLIER
             # The last two calls should both be at the cap
-            self.assertEqual(sleep_calls[-1], max_sleep)
-            self.assertEqual(sleep_calls[-2], max_sleep)
+            self.assertEqual(wait_calls[-1], _MAX_BACKOFF_MULTIPLIER)
+            self.assertEqual(wait_calls[-2], _MAX_BACKOFF_MULTIPLIER)
 
-    @patch("thelabinstrumentation.rq.daemon.time.sleep")
+    @patch("thelabinstrumentation.rq.daemon.IntervalScheduler.wait")
     @patch("thelabinstrumentation.rq.daemon.sentry_sdk")
     @patch("thelabinstrumentation.rq.daemon.get_backend")
     def test_run_redis_recovery_resets_backoff(
-        self, mock_get_backend: Mock, mock_sentry_sdk: Mock, mock_sleep: Mock
+        self, mock_get_backend: Mock, mock_sentry_sdk: Mock, mock_wait: Mock
     ) -> None:
         """Test that backoff resets after a successful send."""
         from redis.exceptions import ConnectionError as RedisConnectionError
 
-        from ...conf import config
-
         mock_backend = Mock()
         mock_get_backend.return_value = mock_backend
 
@@ -281,25 +464,74 @@ class BackgroundMetricsSenderThreadTestCase(SimpleTestCase):
             raise RedisConnectionError("Connection refused again")
 
         with patch.object(thread, "send_metrics", side_effect=send_metrics_side_effect):
-            sleep_calls: list[float] = []
+            wait_calls: list[int] = []
 
-            def track_sleep(interval: float) -> None:
-                sleep_calls.append(interval)
-                if len(sleep_calls) >= 4:
+            def track_wait(periods: int = 1) -> bool:
+                wait_calls.append(periods)
+                if len(wait_calls) >= 4:
                     raise Exception("Stop loop")
+                return True
 
-            mock_sleep.side_effect = track_sleep
+            mock_wait.side_effect = track_wait
 
             with self.assertRaises(Exception):
                 thread.run()
 
             # Calls: fail(1x), fail(2x), success(1x), fail(1x) — backoff reset after success
-            self.assertEqual(sleep_calls[0], config.update_interval * 1)
-            self.assertEqual(sleep_calls[1], config.update_interval * 2)
-            self.assertEqual(sleep_calls[2], config.update_interval * 1)  # reset
-            self.assertEqual(
-                sleep_calls[3], config.update_interval * 1
-            )  # first failure again
+            self.assertEqual(wait_calls[0], 1)
+            self.assertEqual(wait_calls[1], 2)
+            self.assertEqual(wait_calls[2], 1)  # reset
+            self.assertEqual(wait_calls[3], 1)  # first failure again
+
+
+class LeaderElectionTestCase(SimpleTestCase):
+    """Test cases for publishing RQ metrics from a single elected process."""
+
+    @patch("thelabinstrumentation.rq.daemon.IntervalScheduler.wait")
+    @patch("thelabinstrumentation.rq.daemon.get_backend")
+    def test_only_leader_sends_metrics(
+        self, mock_get_backend: Mock, mock_wait: Mock
+    ) -> None:
+        """Test that metrics are only sent while the lease is held."""
+        lease = Mock()
+        lease.refresh.side_effect = [False, True, False]
+        mock_wait.side_effect = [True, True, Exception("Stop loop")]
+        thread = BackgroundMetricsSenderThread()
+        with (
+            patch.object(thread, "get_lease", return_value=lease),
+            patch.object(thread, "send_metrics") as mock_send_metrics,
+            self.assertRaises(Exception),
+        ):
+            thread.run()
+        mock_send_metrics.assert_called_once_with(mock_get_backend.return_value)
+
+    @patch("thelabinstrumentation.rq.daemon.get_backend")
+    def test_stop_releases_lease(self, mock_get_backend: Mock) -> None:
+        """Test that stopping the thread joins it and hands over the lease."""
+        lease = Mock()
+        lease.refresh.return_value = False
+        thread = BackgroundMetricsSenderThread(daemon=True)
+        with patch.object(thread, "get_lease", return_value=lease):
+            thread.start()
+            thread.stop(timeout=5)
+        self.assertFalse(thread.is_alive())
+        lease.release.assert_called_once_with()
+
+    def test_get_lease(self) -> None:
+        """Test that the lease is configured from settings."""
+        with override_settings(
+            THELAB_INSTRUMENTATION={"UPDATE_INTERVAL": 5, "RQ_LEADER_LEASE_TTL": 7}
+        ):
+            lease = BackgroundMetricsSenderThread().get_lease()
+        assert lease is not None
+        self.assertEqual(lease.key, LEADER_LEASE_KEY)
+        self.assertEqual(lease.ttl, 7)
+        with override_settings(THELAB_INSTRUMENTATION={"UPDATE_INTERVAL": 5}):
+            lease = BackgroundMetricsSenderThread().get_lease()
+        assert lease is not None
+        self.assertEqual(lease.ttl, 10)
+        with override_settings(THELAB_INSTRUMENTATION={"RQ_LEADER_ELECTION": False}):
+            self.assertIsNone(BackgroundMetricsSenderThread().get_lease())
 
 
 class EnsureBgSenderThreadRunningTestCase(SimpleTestCase):
@@ -307,9 +539,10 @@ class EnsureBgSenderThreadRunningTestCase(SimpleTestCase):
 
     def setUp(self) -> None:
         """Set up the test case."""
-        # Clear threadlocals before each test
-        if hasattr(_threadlocals, "bg_thread"):
-            delattr(_threadlocals, "bg_thread")
+        # Hide the process-wide thread started by the app before each test
+        patcher = patch("thelabinstrumentation.rq.daemon._bg_thread", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
 
     @patch("thelabinstrumentation.rq.daemon.BackgroundMetricsSenderThread")
     def test_creates_new_thread_if_none_exists(self, mock_thread_class: Mock) -> None:
@@ -327,8 +560,8 @@ class EnsureBgSenderThreadRunningTestCase(SimpleTestCase):
         self.assertTrue(mock_thread.start.called)
         self.assertEqual(result, mock_thread)
 
-        # The thread should be stored in threadlocals
-        self.assertEqual(_threadlocals.bg_thread, mock_thread)
+        # The thread should be stored for the process
+        self.assertEqual(daemon._bg_thread, mock_thread)
 
     @patch("thelabinstrumentation.rq.daemon.BackgroundMetricsSenderThread")
     def test_returns_existing_thread_if_alive(self, mock_thread_class: Mock) -> None:
@@ -336,7 +569,7 @@ class EnsureBgSenderThreadRunningTestCase(SimpleTestCase):
         # Setup existing thread
         mock_existing_thread = Mock()
         mock_existing_thread.is_alive.return_value = True
-        _threadlocals.bg_thread = mock_existing_thread
+        daemon._bg_thread = mock_existing_thread
 
         # Call the function
         result = ensure_bg_sender_thread_running()
@@ -353,7 +586,7 @@ class EnsureBgSenderThreadRunningTestCase(SimpleTestCase):
         # Setup dead existing thread
         mock_existing_thread = Mock()
         mock_existing_thread.is_alive.return_value = False
-        _threadlocals.bg_thread = mock_existing_thread
+        daemon._bg_thread = mock_existing_thread
 
         # Setup new thread
         mock_new_thread = Mock()
@@ -368,8 +601,89 @@ class EnsureBgSenderThreadRunningTestCase(SimpleTestCase):
         self.assertTrue(mock_new_thread.start.called)
         self.assertEqual(result, mock_new_thread)
 
-        # The new thread should be stored in threadlocals
-        self.assertEqual(_threadlocals.bg_thread, mock_new_thread)
+        # The new thread should be stored for the process
+        self.assertEqual(daemon._bg_thread, mock_new_thread)
+
+    @override_settings(THELAB_INSTRUMENTATION={"RQ_RESTART_SENDER_AFTER_FORK": True})
+    @patch("thelabinstrumentation.rq.daemon.BackgroundMetricsSenderThread")
+    def test_restarts_thread_after_fork(self, mock_thread_class: Mock) -> None:
+        """Test that a forked child starts its own sender if the parent had one."""
+        _restart_after_fork()
+        mock_thread_class.assert_not_called()
+
+        daemon._bg_thread = Mock()
+        _restart_after_fork()
+        mock_thread_class.assert_called_once_with(daemon=True, wait_first=True)
+        mock_thread_class.return_value.start.assert_called_once_with()
+        self.assertEqual(daemon._bg_thread, mock_thread_class.return_value)
+
+    @patch("thelabinstrumentation.rq.daemon.BackgroundMetricsSenderThread")
+    def test_no_restart_after_fork_by_default(self, mock_thread_class: Mock) -> None:
+        """Test that children only start a sender when the setting opts in."""
+        daemon._bg_thread = Mock()
+        _restart_after_fork()
+        mock_thread_class.assert_not_called()
+        self.assertIsNone(daemon._bg_thread)
+
+    @override_settings(THELAB_INSTRUMENTATION={"RQ_RESTART_SENDER_AFTER_FORK": True})
+    @patch("thelabinstrumentation.rq.daemon.BackgroundMetricsSenderThread")
+    def test_no_restart_in_work_horse(self, mock_thread_class: Mock) -> None:
+        """Test that RQ work horses never start a sender."""
+        daemon._bg_thread = Mock()
+
+        def fork_work_horse(self: Worker) -> None:
+            daemon._before_fork()
+
+        worker = Worker.__new__(Worker)
+        fork_work_horse(worker)
+        self.addCleanup(setattr, daemon, "_forking_work_horse", None)
+        self.addCleanup(setattr, metrics, "_forking_work_horse", False)
+        self.assertIs(daemon._forking_work_horse, worker)
+        self.assertTrue(metrics._forking_work_horse)
+        _restart_after_fork()
+        mock_thread_class.assert_not_called()
+        self.assertIsNone(daemon._bg_thread)
+
+        # Other forks, e.g. of a preloading web server, still restart it.
+        daemon._bg_thread = Mock()
+        daemon._before_fork()
+        self.assertIsNone(daemon._forking_work_horse)
+        self.assertFalse(metrics._forking_work_horse)
+        _restart_after_fork()
+        mock_thread_class.assert_called_once_with(daemon=True, wait_first=True)
+
+    @patch("thelabinstrumentation.rq.daemon.reset_backends")
+    @patch("thelabinstrumentation.metrics.flush")
+    def test_work_horse_flushes_metrics_after_job(
+        self, mock_flush: Mock, mock_reset_backends: Mock
+    ) -> None:
+        """Test that a work horse publishes its metrics as soon as its job ends."""
+        worker = Worker.__new__(Worker)
+        perform_job = Mock(side_effect=RuntimeError)
+        worker.perform_job = perform_job  # type: ignore[method-assign]
+        daemon._forking_work_horse = worker
+        self.addCleanup(setattr, daemon, "_forking_work_horse", None)
+        _restart_after_fork()
+        mock_flush.assert_not_called()
+        job, queue = Mock(), Mock()
+        with self.assertRaises(RuntimeError):
+            worker.perform_job(job, queue)
+        perform_job.assert_called_once_with(job, queue)
+        mock_flush.assert_called_once_with()
+        mock_reset_backends.assert_called_once_with()
+
+    def test_thread_is_shared_across_threads(self) -> None:
+        """Test that every thread in the process shares one sender."""
+        with patch.object(BackgroundMetricsSenderThread, "run"):
+            thread = ensure_bg_sender_thread_running()
+            results: list[BackgroundMetricsSenderThread] = []
+            with patch.object(thread, "is_alive", return_value=True):
+                other = threading.Thread(
+                    target=lambda: results.append(ensure_bg_sender_thread_running())
+                )
+                other.start()
+                other.join()
+        self.assertEqual(results, [thread])
 
 
 class AppConfigTestCase(SimpleTestCase):
@@ -391,3 +705,14 @@ class AppConfigTestCase(SimpleTestCase):
 
         # Verify ensure_bg_sender_thread_running was called
         mock_ensure.assert_called_once()
+
+    @override_settings(THELAB_INSTRUMENTATION={"RQ_IN_PROCESS_SENDER": False})
+    @patch("thelabinstrumentation.rq.daemon.ensure_bg_sender_thread_running")
+    def test_ready_skips_in_process_sender_when_disabled(
+        self, mock_ensure: Mock
+    ) -> None:
+        """Test that the sender isn't started when an exporter publishes metrics."""
+        from thelabinstrumentation.rq.apps import ThelabInstrumentationRqConfig
+
+        ThelabInstrumentationRqConfig.ready(Mock(spec=ThelabInstrumentationRqConfig))
+        mock_ensure.assert_not_called()
@@ -0,0 +1,141 @@
+from io import StringIO
+from unittest.mock import patch
+import asyncio
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, override_settings
+import django_rq
+
+from ...backends import MetricData, get_backend
+from ...rq.daemon import LEADER_LEASE_KEY, RQMetricsCollector
+from ...rq.management.commands.rq_metrics_exporter import Command
+from ..utils import RecordingBackend
+
+COMMAND_MODULE = "thelabinstrumentation.rq.management.commands.rq_metrics_exporter"
+
+
+class RQMetricsExporterTestCase(SimpleTestCase):
+    """Test cases for the rq_metrics_exporter management command."""
+
+    def setUp(self) -> None:
+        self.connection = django_rq.get_connection()
+        self.connection.flushdb()
+        self.addCleanup(self.connection.flushdb)
+        self.backend = RecordingBackend()
+        patcher = patch(f"{COMMAND_MODULE}.get_backend", return_value=self.backend)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _queue_names(self, batch: list[MetricData]) -> set[str]:
+        return {m["dimensions"]["QueueName"] for m in batch if "dimensions" in m}
+
+    @override_settings(THELAB_INSTRUMENTATION={"RQ_LEADER_ELECTION": False})
+    def test_once_publishes_every_queue(self) -> None:
+        """Test that --once publishes all configured queues and exits."""
+        self.connection.rpush(django_rq.get_queue("low").key, "job-1")
+        call_command("rq_metrics_exporter", "--once", stdout=StringIO())
+        self.assertEqual(len(self.backend.batches), 1)
+        batch = self.backend.batches[0]
+        self.assertEqual(self._queue_names(batch), {"default", "high", "low"})
+        queued = {
+            m["dimensions"]["QueueName"]: m["value"]
+            for m in batch
+            if m["name"] == "rq.queued-jobs" and "dimensions" in m
+        }
+        self.assertEqual(queued, {"default": 0, "high": 0, "low": 1})
+
+    @override_settings(THELAB_INSTRUMENTATION={"RQ_LEADER_ELECTION": False})
+    def test_queue_filter(self) -> None:
+        """Test that --queue limits which queues are published."""
+        call_command(
+            "rq_metrics_exporter", "--once", "--queue", "high", "--queue", "low"
+        )
+        self.assertEqual(self._queue_names(self.backend.batches[0]), {"high", "low"})
+
+    def test_unknown_queue(self) -> None:
+        """Test that an unknown queue name is rejected before connecting."""
+        with self.assertRaisesMessage(CommandError, "Unknown RQ queues: missing"):
+            call_command("rq_metrics_exporter", "--once", "--queue", "missing")
+
+    def test_invalid_interval(self) -> None:
+        """Test that a non-positive interval is rejected."""
+        with self.assertRaises(CommandError):
+            call_command("rq_metrics_exporter", "--interval", "-1")
+
+    def test_once_fails_when_another_process_leads(self) -> None:
+        """Test that only the leaseholder publishes, and the lease is released."""
+        self.connection.set(LEADER_LEASE_KEY, "someone-else")
+        with self.assertRaisesMessage(CommandError, "Another process holds"):
+            call_command("rq_metrics_exporter", "--once")
+        self.assertEqual(self.backend.batches, [])
+        self.assertEqual(self.connection.get(LEADER_LEASE_KEY), b"someone-else")
+        self.connection.delete(LEADER_LEASE_KEY)
+        call_command("rq_metrics_exporter", "--once")
+        self.assertEqual(len(self.backend.batches), 1)
+        self.assertIsNone(self.connection.get(LEADER_LEASE_KEY))
+
+    @override_settings(THELAB_INSTRUMENTATION={"RQ_LEADER_ELECTION": False})
+    def test_loop_until_stopped(self) -> None:
+        """Test that the loop publishes on every interval until stopped."""
+        command = Command()
+        send_metrics = self.backend.send_metrics
+
+        def send_and_stop(metrics: list[MetricData]) -> None:
+            send_metrics(metrics)
+            if len(self.backend.batches) == 3:
+                command.stop_event.set()
+
+        with (
+            patch.object(self.backend, "send_metrics", side_effect=send_and_stop),
+            patch(f"{COMMAND_MODULE}.IntervalScheduler.next_delay", return_value=0),
+        ):
+            asyncio.run(command.export(RQMetricsCollector(["default"]), 60))
+        self.assertEqual(len(self.backend.batches), 3)
+
+    @override_settings(THELAB_INSTRUMENTATION={"RQ_LEADER_ELECTION": False})
+    def test_loop_survives_errors(self) -> None:
+        """Test that a failed collection is logged and retried on the next tick."""
+        command = Command()
+        collector = RQMetricsCollector(["default"])
+        collect = collector.collect
+        calls = 0
+
+        def flaky_collect() -> list[MetricData]:
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                raise RuntimeError("boom")
+            command.stop_event.set()
+            return collect()
+
+        with (
+            patch.object(collector, "collect", side_effect=flaky_collect),
+            patch(f"{COMMAND_MODULE}.IntervalScheduler.next_delay", return_value=0),
+            patch(f"{COMMAND_MODULE}.sentry_sdk") as mock_sentry_sdk,
+            self.assertLogs(COMMAND_MODULE, "ERROR"),
+        ):
+            asyncio.run(command.export(collector, 60))
+        mock_sentry_sdk.capture_exception.assert_called_once_with()
+        self.assertEqual(len(self.backend.batches), 1)
+
+
+class RQMetricsExporterBackendTestCase(SimpleTestCase):
+    """Test that the exporter publishes with the configured backend."""
+
+    def setUp(self) -> None:
+        self.connection = django_rq.get_connection()
+        self.connection.flushdb()
+        self.addCleanup(self.connection.flushdb)
+
+    @override_settings(
+        THELAB_INSTRUMENTATION={
+            "BACKEND": "thelabinstrumentation.tests.utils.RecordingBackend",
+            "RQ_LEADER_ELECTION": False,
+        }
+    )
+    def test_uses_configured_backend(self) -> None:
+        """Test that metrics go to BACKEND, not to the default async backend."""
+        call_command("rq_metrics_exporter", "--once", "--queue", "default")
+        backend = get_backend()
+        assert isinstance(backend, RecordingBackend)
+        self.assertEqual(len(backend.batches), 1)
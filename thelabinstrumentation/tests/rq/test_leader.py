@@ -0,0 +1,72 @@
+from unittest import TestCase
+from unittest.mock import patch
+import time
+import uuid
+
+import django_rq
+
+from ...rq.leader import RedisLease
+
+
+class RedisLeaseTestCase(TestCase):
+    """Test cases for the Redis leader lease."""
+
+    def setUp(self) -> None:
+        self.connection = django_rq.get_connection()
+        self.key = f"test-lease:{uuid.uuid4().hex}"
+        self.addCleanup(self.connection.delete, self.key)
+
+    def _lease(self, ttl: float = 10) -> RedisLease:
+        return RedisLease(self.connection, self.key, ttl)
+
+    def test_only_one_holder(self) -> None:
+        """Test that only the first process acquires the lease."""
+        a, b = self._lease(), self._lease()
+        self.assertTrue(a.refresh())
+        self.assertFalse(b.refresh())
+        self.assertTrue(a.refresh())
+        self.assertFalse(b.refresh())
+        self.assertEqual(self.connection.get(self.key), a.token.encode())
+
+    def test_renew_extends_expiry(self) -> None:
+        """Test that refreshing a held lease pushes back its expiry."""
+        lease = self._lease(ttl=10)
+        lease.refresh()
+        self.connection.pexpire(self.key, 100)
+        self.assertTrue(lease.refresh())
+        self.assertGreater(self.connection.pttl(self.key), 5_000)
+
+    def test_release_hands_over(self) -> None:
+        """Test that releasing lets another process acquire immediately."""
+        a, b = self._lease(), self._lease()
+        a.refresh()
+        a.release()
+        self.assertFalse(a.held)
+        self.assertTrue(b.refresh())
+
+    def test_release_does_not_delete_other_holders_lease(self) -> None:
+        """Test that a stale holder can't release someone else's lease."""
+        a, b = self._lease(ttl=0.05), self._lease()
+        a.refresh()
+        time.sleep(0.1)
+        self.assertTrue(b.refresh())
+        a.release()
+        self.assertEqual(self.connection.get(self.key), b.token.encode())
+
+    def test_failover_after_expiry(self) -> None:
+        """Test that the lease moves on once the holder stops renewing it."""
+        a, b = self._lease(ttl=0.05), self._lease(ttl=0.05)
+        self.assertTrue(a.refresh())
+        time.sleep(0.1)
+        self.assertTrue(b.refresh())
+        self.assertFalse(a.refresh())
+        self.assertFalse(a.held)
+
+    def test_reset_after_fork(self) -> None:
+        """Test that a forked child doesn't inherit its parent's lease."""
+        lease = self._lease()
+        lease.refresh()
+        token = lease.token
+        with patch("thelabinstrumentation.rq.leader.os.getpid", return_value=-1):
+            self.assertFalse(lease.refresh())
+            self.assertNotEqual(lease.token, token)
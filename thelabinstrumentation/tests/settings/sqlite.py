@@ -7,6 +7,9 @@ from fakeredis import TcpFakeServer
 # Start a fakeredis server thread
 redis_addr = ("127.0.0.1", random.randrange(20_000, 30_000))
 server = TcpFakeServer(redis_addr, server_type="redis")
+# Don't keep the test process alive for clients which never disconnect, such as
+# the RQ metrics sender's leader lease.
+server.daemon_threads = True
 t = Thread(target=server.serve_forever, daemon=True)
 t.start()
 
@@ -1,14 +1,23 @@
 from __future__ import annotations
 
-from unittest.mock import MagicMock, patch
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from unittest import skipUnless
+from unittest.mock import AsyncMock, MagicMock, patch
 import asyncio
+import os
+import threading
+import time
+import timeit
 
 from django.test import SimpleTestCase, override_settings
 import httpx
+import urllib3.connection
 import urllib3.connectionpool
 import urllib3.exceptions
 import urllib3.response
 
+from ...metrics import MetricsRegistry
 from ...structlog import outgoing_http
 
 
@@ -109,6 +118,115 @@ class RedactUrlTest(SimpleTestCase):
         )
 
 
+class FastRedactUrlTest(SimpleTestCase):
+    """Tests that the single-pass redactor matches the urllib.parse one."""
+
+    URLS = (
+        "https://s3.amazonaws.com/bucket/key",
+        "https://s3.amazonaws.com/bucket/key?X-Amz-Credential=a%2Fb&X-Amz-Signature=c",
+        "https://example.com/v1?a b=1&c%20d=2&&e&a+b=&~=1&ü=2&%ZZ=3",
+        "https://example.com/v1?a=1;b=2&x==1=2",
+        "https://example.com/v1?#fragment",
+        "https://example.com/v1?&&#fragment",
+        "https://example.com/v1#fragment?key=value",
+        "https://example.com/v1?key=value#",
+        "https://user:pass@[::1]:8443/v1?key=value",
+        "https://example.com?key=value",
+        "/v1/items?key=value#top",
+        "//example.com/v1?key=value",
+        "///v1?key=value",
+        "http:///v1?key=value",
+        "http:////v1?key=value",
+        "HTTPS://example.com/v1?key=value",
+        " https://example.com/v1?key=value",
+        "https://example.com/v1\t?key=value",
+    )
+
+    def test_same_output_as_urllib_parse(self) -> None:
+        for url in self.URLS:
+            with self.subTest(url=url):
+                self.assertEqual(
+                    outgoing_http._redact_url(url),
+                    outgoing_http._redact_url_slow(url),
+                )
+
+    def test_pool_urls_are_cached(self) -> None:
+        outgoing_http._pool_base_url.cache_clear()
+        for value in range(3):
+            self.assertEqual(
+                outgoing_http._redacted_pool_url(
+                    "https", "sqs.aws", 443, f"/?a={value}&b=2#top"
+                ),
+                "https://sqs.aws/?a=REDACTED&b=REDACTED#top",
+            )
+        self.assertEqual(outgoing_http._pool_base_url.cache_info().hits, 2)
+        self.assertEqual(outgoing_http._pool_base_url.cache_info().currsize, 1)
+
+    def test_pool_urls_same_output_as_urllib_parse(self) -> None:
+        for path in ("/v1", "/v1?key=value#top", "/v1#top?key=value", "?", "/v1?"):
+            with self.subTest(path=path):
+                self.assertEqual(
+                    outgoing_http._redacted_pool_url(
+                        "https", "example.com", 8443, path
+                    ),
+                    outgoing_http._redact_url_slow(f"https://example.com:8443{path}"),
+                )
+
+    @skipUnless(os.environ.get("THELAB_BENCHMARKS"), "set THELAB_BENCHMARKS to run")
+    def test_benchmark(self) -> None:
+        """Micro-benchmark: the single-pass redactor beats urllib.parse."""
+        url = (
+            "https://s3.amazonaws.com/bucket/key?X-Amz-Algorithm=AWS4-HMAC-SHA256"
+            "&X-Amz-Credential=abc&X-Amz-Date=20260101T000000Z&X-Amz-Signature=def"
+        )
+        fast = min(timeit.repeat(lambda: outgoing_http._redact_url(url), number=2000))
+        slow = min(
+            timeit.repeat(lambda: outgoing_http._redact_url_slow(url), number=2000)
+        )
+        self.assertLess(fast * 2, slow)
+
+
+class RequestIdTest(SimpleTestCase):
+    """Tests for the prefix-plus-counter request IDs."""
+
+    def test_unique_across_threads(self) -> None:
+        ids: list[str] = []
+
+        def generate() -> None:
+            ids.extend(outgoing_http._new_request_id() for _ in range(1000))
+
+        threads = [threading.Thread(target=generate) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(set(ids)), 4000)
+        self.assertEqual(len({request_id.split("-")[0] for request_id in ids}), 1)
+
+    def test_increasing(self) -> None:
+        first = outgoing_http._new_request_id()
+        second = outgoing_http._new_request_id()
+        self.assertEqual(first.split("-")[0], second.split("-")[0])
+        self.assertEqual(int(second.split("-")[1]), int(first.split("-")[1]) + 1)
+
+    @skipUnless(hasattr(os, "fork"), "requires os.fork")
+    def test_new_prefix_after_fork(self) -> None:
+        parent = outgoing_http._new_request_id()
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover
+            try:
+                os.write(write_fd, outgoing_http._new_request_id().encode())
+            finally:
+                os._exit(0)
+        os.close(write_fd)
+        with os.fdopen(read_fd) as pipe:
+            child = pipe.read()
+        os.waitpid(pid, 0)
+        self.assertNotEqual(child.split("-")[0], parent.split("-")[0])
+        self.assertEqual(child.split("-")[1], "1")
+
+
 # ---------------------------------------------------------------------------
 # urllib3 tests
 # ---------------------------------------------------------------------------
@@ -627,3 +745,443 @@ class AsyncHttpxLoggingTest(SimpleTestCase):
         done_kw = mock_logger.warning.call_args[1]
         self.assertIsNone(done_kw["outgoing_http_status"])
         self.assertEqual(done_kw["error"], "ConnectError")
+
+
+# ---------------------------------------------------------------------------
+# Sampling tests
+# ---------------------------------------------------------------------------
+
+
+class SamplingTest(SimpleTestCase):
+    """Tests for head sampling, tail keeping, and per-host rate limits."""
+
+    def setUp(self) -> None:
+        self._saved_urlopen = urllib3.connectionpool.HTTPConnectionPool.urlopen
+        outgoing_http._installed_urllib3 = False
+        self.response = MagicMock(spec=urllib3.response.HTTPResponse)
+        self.response.status = 200
+        self.fake_urlopen = MagicMock(return_value=self.response)
+        urllib3.connectionpool.HTTPConnectionPool.urlopen = self.fake_urlopen  # type: ignore[method-assign]
+        outgoing_http.install()
+        self.pool = urllib3.HTTPSConnectionPool(host="s3.amazonaws.com", port=443)
+
+    def tearDown(self) -> None:
+        urllib3.connectionpool.HTTPConnectionPool.urlopen = self._saved_urlopen  # type: ignore[method-assign]
+        outgoing_http._installed_urllib3 = False
+
+    def _events(self, mock_logger: MagicMock) -> list[tuple[str, dict[str, Any]]]:
+        return [
+            (call.args[0], call.kwargs)
+            for call in mock_logger.info.call_args_list
+            + mock_logger.warning.call_args_list
+        ]
+
+    @override_settings(THELAB_INSTRUMENTATION={"OUTGOING_HTTP_SAMPLE_RATE": 0})
+    @patch.object(outgoing_http, "logger")
+    @patch.object(outgoing_http, "_redact_url")
+    def test_unsampled_requests_are_not_logged(
+        self, mock_redact: MagicMock, mock_logger: MagicMock
+    ) -> None:
+        self.assertIs(self.pool.urlopen("GET", "/bucket/key?X-Amz=1"), self.response)
+        self.assertEqual(self._events(mock_logger), [])
+        # URLs of unsampled requests are never built.
+        mock_redact.assert_not_called()
+
+    @override_settings(
+        THELAB_INSTRUMENTATION={
+            "OUTGOING_HTTP_SAMPLE_RATE": 0,
+            "OUTGOING_HTTP_SAMPLE_RATES": {"POST": 1, "s3.amazonaws.com": 0.5},
+        }
+    )
+    @patch("random.random", return_value=0.25)
+    @patch.object(outgoing_http, "logger")
+    def test_rates_by_host_then_method(
+        self, mock_logger: MagicMock, mock_random: MagicMock
+    ) -> None:
+        self.pool.urlopen("GET", "/bucket/key")
+        other = urllib3.HTTPSConnectionPool(host="api.example.com", port=443)
+        other.urlopen("POST", "/v1")
+        other.urlopen("GET", "/v1")
+        events = self._events(mock_logger)
+        self.assertEqual(
+            [(event, kw["outgoing_http_method"]) for event, kw in events],
+            [
+                ("outgoing_http_request.start", "GET"),
+                ("outgoing_http_request.done", "GET"),
+                ("outgoing_http_request.start", "POST"),
+                ("outgoing_http_request.done", "POST"),
+            ],
+        )
+        self.assertEqual(events[0][1]["outgoing_http_sample_rate"], 0.5)
+        self.assertNotIn("outgoing_http_sample_rate", events[2][1])
+
+    @override_settings(
+        THELAB_INSTRUMENTATION={
+            "OUTGOING_HTTP_SAMPLE_RATE": 0,
+            "OUTGOING_HTTP_SLOW_MS": 0,
+        }
+    )
+    @patch.object(outgoing_http, "logger")
+    def test_slow_requests_are_kept(self, mock_logger: MagicMock) -> None:
+        self.pool.urlopen("GET", "/bucket/key")
+        events = self._events(mock_logger)
+        self.assertEqual([event for event, _ in events], ["outgoing_http_request.done"])
+        self.assertFalse(events[0][1]["outgoing_http_sampled"])
+        self.assertEqual(
+            events[0][1]["outgoing_http_url"], "https://s3.amazonaws.com/bucket/key"
+        )
+
+    @override_settings(THELAB_INSTRUMENTATION={"OUTGOING_HTTP_SAMPLE_RATE": 0})
+    @patch.object(outgoing_http, "logger")
+    def test_errors_are_kept(self, mock_logger: MagicMock) -> None:
+        self.response.status = 503
+        self.pool.urlopen("GET", "/bucket/key")
+        self.fake_urlopen.side_effect = urllib3.exceptions.NewConnectionError(
+            MagicMock(), "refused"
+        )
+        with self.assertRaises(urllib3.exceptions.NewConnectionError):
+            self.pool.urlopen("GET", "/bucket/key")
+        mock_logger.info.assert_not_called()
+        statuses = [
+            call.kwargs["outgoing_http_status"]
+            for call in mock_logger.warning.call_args_list
+        ]
+        self.assertEqual(statuses, [503, None])
+
+    @override_settings(
+        THELAB_INSTRUMENTATION={
+            "OUTGOING_HTTP_RATE_LIMIT": 0.001,
+            "OUTGOING_HTTP_RATE_LIMIT_BURST": 2,
+            "OUTGOING_HTTP_LOG_START": False,
+        }
+    )
+    @patch.object(outgoing_http, "logger")
+    def test_rate_limit_per_host(self, mock_logger: MagicMock) -> None:
+        for _ in range(5):
+            self.pool.urlopen("GET", "/bucket/key")
+        other = urllib3.HTTPSConnectionPool(host="sqs.amazonaws.com", port=443)
+        other.urlopen("POST", "/")
+        hosts = [kw["outgoing_http_host"] for _, kw in self._events(mock_logger)]
+        self.assertEqual(
+            hosts, ["s3.amazonaws.com", "s3.amazonaws.com", "sqs.amazonaws.com"]
+        )
+
+
+class TokenBucketTest(SimpleTestCase):
+    """Tests for the per-host token bucket."""
+
+    def test_refills_over_time(self) -> None:
+        with patch("time.monotonic", return_value=100.0):
+            bucket = outgoing_http._TokenBucket(rate=2, burst=3)
+            self.assertEqual([bucket.take() for _ in range(4)], [True] * 3 + [False])
+        with patch("time.monotonic", return_value=101.0):
+            self.assertEqual([bucket.take() for _ in range(3)], [True, True, False])
+        with patch("time.monotonic", return_value=200.0):
+            self.assertEqual([bucket.take() for _ in range(4)], [True] * 3 + [False])
+
+
+# ---------------------------------------------------------------------------
+# Metrics tests
+# ---------------------------------------------------------------------------
+
+
+@override_settings(
+    THELAB_INSTRUMENTATION={
+        "OUTGOING_HTTP_METRICS": True,
+        "OUTGOING_HTTP_SAMPLE_RATE": 0,
+    }
+)
+class MetricsTest(SimpleTestCase):
+    """Tests for the aggregated outgoing HTTP metrics."""
+
+    def setUp(self) -> None:
+        self._saved_urlopen = urllib3.connectionpool.HTTPConnectionPool.urlopen
+        self._saved_async_send = httpx.AsyncClient.send
+        self._saved_send = httpx.Client.send
+        outgoing_http._installed_urllib3 = False
+        outgoing_http._installed_httpx = False
+        self.registry = MetricsRegistry()
+        patcher = patch("thelabinstrumentation.metrics.registry", self.registry)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        outgoing_http._call_metrics.clear()
+        self.addCleanup(outgoing_http._call_metrics.clear)
+        logger_patcher = patch.object(outgoing_http, "logger")
+        logger_patcher.start()
+        self.addCleanup(logger_patcher.stop)
+
+    def tearDown(self) -> None:
+        urllib3.connectionpool.HTTPConnectionPool.urlopen = self._saved_urlopen  # type: ignore[method-assign]
+        httpx.Client.send = self._saved_send  # type: ignore[method-assign]
+        httpx.AsyncClient.send = self._saved_async_send  # type: ignore[method-assign]
+        outgoing_http._installed_urllib3 = False
+        outgoing_http._installed_httpx = False
+
+    def _collect(self) -> dict[tuple[str, str, str, str], float]:
+        datapoints, histograms = self.registry.collect()
+        collected: dict[tuple[str, str, str, str], float] = {}
+        for metric in datapoints:
+            dims = metric["dimensions"]
+            key = (metric["name"], dims["Host"], dims["Method"], dims["StatusClass"])
+            collected[key] = metric["value"]
+        for data in histograms:
+            dims = data["dimensions"]
+            key = (data["name"], dims["Host"], dims["Method"], dims["StatusClass"])
+            collected[key] = data["histogram"].count
+        return collected
+
+    def test_urllib3_calls_are_aggregated(self) -> None:
+        response = MagicMock(spec=urllib3.response.HTTPResponse)
+        response.status = 200
+        fake_urlopen = MagicMock(return_value=response)
+        urllib3.connectionpool.HTTPConnectionPool.urlopen = fake_urlopen  # type: ignore[method-assign]
+        outgoing_http.install()
+        pool = urllib3.HTTPSConnectionPool(host="s3.amazonaws.com", port=443)
+        for _ in range(3):
+            pool.urlopen("GET", "/bucket/key")
+        response.status = 503
+        pool.urlopen("GET", "/bucket/key")
+        fake_urlopen.side_effect = urllib3.exceptions.NewConnectionError(
+            MagicMock(), "refused"
+        )
+        with self.assertRaises(urllib3.exceptions.NewConnectionError):
+            pool.urlopen("PUT", "/bucket/key")
+
+        host = "s3.amazonaws.com"
+        self.assertEqual(
+            self._collect(),
+            {
+                ("outgoing-http.requests", host, "GET", "2xx"): 3,
+                ("outgoing-http.duration", host, "GET", "2xx"): 3,
+                ("outgoing-http.requests", host, "GET", "5xx"): 1,
+                ("outgoing-http.errors", host, "GET", "5xx"): 1,
+                ("outgoing-http.duration", host, "GET", "5xx"): 1,
+                ("outgoing-http.requests", host, "PUT", "none"): 1,
+                ("outgoing-http.errors", host, "PUT", "none"): 1,
+                ("outgoing-http.duration", host, "PUT", "none"): 1,
+            },
+        )
+        # Counters publish deltas, so nothing is left after collecting.
+        self.assertEqual(self._collect(), {})
+
+    def test_httpx_calls_are_aggregated(self) -> None:
+        response = MagicMock(spec=httpx.Response)
+        response.status_code = 404
+        httpx.Client.send = MagicMock(return_value=response)  # type: ignore[method-assign]
+        httpx.AsyncClient.send = AsyncMock(return_value=response)  # type: ignore[method-assign]
+        outgoing_http.install()
+        request = httpx.Request("POST", "https://api.example.com/v1")
+        httpx.Client().send(request)
+        asyncio.run(httpx.AsyncClient().send(request))
+        collected = self._collect()
+        key = ("api.example.com", "POST", "4xx")
+        self.assertEqual(collected[("outgoing-http.requests", *key)], 2)
+        self.assertEqual(collected[("outgoing-http.errors", *key)], 2)
+
+    def _request_hosts(self, *hosts: str) -> dict[str, float]:
+        """Requests made per Host dimension."""
+        response = MagicMock(spec=urllib3.response.HTTPResponse)
+        response.status = 200
+        urllib3.connectionpool.HTTPConnectionPool.urlopen = MagicMock(  # type: ignore[method-assign]
+            return_value=response
+        )
+        outgoing_http.install()
+        for host in hosts:
+            urllib3.HTTPSConnectionPool(host=host).urlopen("GET", "/")
+        return {
+            key[1]: value
+            for key, value in self._collect().items()
+            if key[0] == "outgoing-http.requests"
+        }
+
+    @override_settings(
+        THELAB_INSTRUMENTATION={
+            "OUTGOING_HTTP_METRICS": True,
+            "OUTGOING_HTTP_METRICS_MAX_HOSTS": 2,
+        }
+    )
+    def test_hosts_are_bounded(self) -> None:
+        self.assertEqual(
+            self._request_hosts(
+                "a.example.com", "b.example.com", "c.example.com", "a.example.com"
+            ),
+            {"a.example.com": 2, "b.example.com": 1, "other": 1},
+        )
+
+    @override_settings(
+        THELAB_INSTRUMENTATION={
+            "OUTGOING_HTTP_METRICS": True,
+            "OUTGOING_HTTP_METRICS_HOSTS": ["b.example.com"],
+        }
+    )
+    def test_host_allow_list(self) -> None:
+        self.assertEqual(
+            self._request_hosts("a.example.com", "b.example.com"),
+            {"b.example.com": 1, "other": 1},
+        )
+
+    @override_settings(THELAB_INSTRUMENTATION={})
+    def test_disabled_by_default(self) -> None:
+        response = MagicMock(spec=urllib3.response.HTTPResponse)
+        response.status = 200
+        urllib3.connectionpool.HTTPConnectionPool.urlopen = MagicMock(  # type: ignore[method-assign]
+            return_value=response
+        )
+        outgoing_http.install()
+        urllib3.HTTPSConnectionPool(host="s3.amazonaws.com").urlopen("GET", "/")
+        self.assertEqual(self._collect(), {})
+
+
+# ---------------------------------------------------------------------------
+# Phase timing tests
+# ---------------------------------------------------------------------------
+
+
+class _BodyHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        body = b"x" * 10_000
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class _BodyServer(ThreadingHTTPServer):
+    def handle_error(self, request: Any, client_address: Any) -> None:
+        # Clients closing responses early reset the connection.
+        pass
+
+
+class PhaseTimingTest(SimpleTestCase):
+    """Tests for connect, TTFB and body timings against a local server."""
+
+    def setUp(self) -> None:
+        # The app installed the instrumentation when it was loaded.
+        self.server = _BodyServer(("127.0.0.1", 0), _BodyHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.port = self.server.server_address[1]
+        logger_patcher = patch.object(outgoing_http, "logger")
+        self.logger = logger_patcher.start()
+        self.addCleanup(logger_patcher.stop)
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        outgoing_http._installed_urllib3 = False
+        outgoing_http._installed_httpx = False
+
+    def _events(self) -> list[tuple[str, dict[str, Any]]]:
+        return [
+            (call.args[0], call.kwargs)
+            for call in self.logger.info.call_args_list
+            if call.args[0] != "outgoing_http_request.start"
+        ]
+
+    def test_urllib3_preloaded_body(self) -> None:
+        with urllib3.HTTPConnectionPool("127.0.0.1", self.port) as pool:
+            self.assertEqual(len(pool.request("GET", "/").data), 10_000)
+            pool.request("GET", "/")
+        (_, first), (_, second) = self._events()
+        for timings in (first, second):
+            self.assertGreaterEqual(timings["ttfb_ms"], 0)
+            self.assertGreaterEqual(timings["body_ms"], 0)
+            self.assertEqual(timings["response_bytes"], 10_000)
+            self.assertNotIn("tls_ms", timings)
+        self.assertGreaterEqual(first["connect_ms"], 0)
+        # The second request reuses the pooled connection.
+        self.assertNotIn("connect_ms", second)
+
+    @override_settings(THELAB_INSTRUMENTATION={"OUTGOING_HTTP_LOG_BODY": True})
+    def test_urllib3_streamed_body(self) -> None:
+        with urllib3.HTTPConnectionPool("127.0.0.1", self.port) as pool:
+            response = pool.request("GET", "/", preload_content=False)
+            self.assertEqual(self._events()[0][0], "outgoing_http_request.done")
+            self.assertNotIn("body_ms", self._events()[0][1])
+            time.sleep(0.01)
+            self.assertEqual(sum(len(c) for c in response.stream(1024)), 10_000)
+        (_, done), (event, body) = self._events()
+        self.assertEqual(event, "outgoing_http_request.body")
+        self.assertEqual(
+            body["outgoing_http_request_id"], done["outgoing_http_request_id"]
+        )
+        self.assertEqual(body["response_bytes"], 10_000)
+        self.assertGreaterEqual(body["body_ms"], 10)
+        self.assertGreaterEqual(body["duration_ms"], done["duration_ms"] + 10)
+
+    @override_settings(THELAB_INSTRUMENTATION={"OUTGOING_HTTP_METRICS": True})
+    def test_body_metrics(self) -> None:
+        registry = MetricsRegistry()
+        with (
+            patch("thelabinstrumentation.metrics.registry", registry),
+            patch.dict(outgoing_http._call_metrics, clear=True),
+            urllib3.HTTPConnectionPool("127.0.0.1", self.port) as pool,
+        ):
+            pool.request("GET", "/")
+            response = pool.request("GET", "/", preload_content=False)
+            time.sleep(0.01)
+            self.assertEqual(len(response.read()), 10_000)
+            datapoints, histograms = registry.collect()
+        values = {m["name"]: m["value"] for m in datapoints}
+        self.assertEqual(values["outgoing-http.response-bytes"], 20_000)
+        body_durations = {
+            data["name"]: data["histogram"]
+            for data in histograms
+            if data["name"] == "outgoing-http.body-duration"
+        }["outgoing-http.body-duration"]
+        self.assertEqual(body_durations.count, 2)
+        self.assertGreaterEqual(body_durations.max, 10)
+
+    def test_streamed_body_not_logged_by_default(self) -> None:
+        with urllib3.HTTPConnectionPool("127.0.0.1", self.port) as pool:
+            response = pool.request("GET", "/", preload_content=False)
+            self.assertEqual(len(response.read()), 10_000)
+        ((event, done),) = self._events()
+        self.assertEqual(event, "outgoing_http_request.done")
+        self.assertNotIn("body_ms", done)
+
+    @override_settings(THELAB_INSTRUMENTATION={"OUTGOING_HTTP_LOG_BODY": True})
+    def test_urllib3_closed_early(self) -> None:
+        with urllib3.HTTPConnectionPool("127.0.0.1", self.port) as pool:
+            response = pool.request("GET", "/", preload_content=False)
+            response.read(100)
+            response.close()
+        (_, _), (event, body) = self._events()
+        self.assertEqual(event, "outgoing_http_request.body")
+        self.assertLess(body["response_bytes"], 10_000)
+
+    @override_settings(THELAB_INSTRUMENTATION={"OUTGOING_HTTP_LOG_BODY": True})
+    def test_httpx_phases(self) -> None:
+        traced: list[str] = []
+        with httpx.Client() as client:
+            client.get(
+                f"http://127.0.0.1:{self.port}/",
+                extensions={"trace": lambda name, info: traced.append(name)},
+            )
+            with client.stream("GET", f"http://127.0.0.1:{self.port}/") as response:
+                self.assertEqual(len(response.read()), 10_000)
+        (_, first), (_, streamed), (event, body) = self._events()
+        self.assertGreaterEqual(first["connect_ms"], 0)
+        self.assertGreaterEqual(first["ttfb_ms"], 0)
+        self.assertEqual(first["response_bytes"], 10_000)
+        self.assertNotIn("connect_ms", streamed)
+        self.assertNotIn("body_ms", streamed)
+        self.assertEqual(event, "outgoing_http_request.body")
+        self.assertEqual(body["response_bytes"], 10_000)
+        # The caller's own trace callback still receives the events.
+        self.assertIn("connection.connect_tcp.complete", traced)
+
+    def test_async_httpx_phases(self) -> None:
+        async def fetch() -> None:
+            async with httpx.AsyncClient() as client:
+                await client.get(f"http://127.0.0.1:{self.port}/")
+
+        asyncio.run(fetch())
+        ((_, done),) = self._events()
+        self.assertGreaterEqual(done["connect_ms"], 0)
+        self.assertGreaterEqual(done["body_ms"], 0)
+        self.assertEqual(done["response_bytes"], 10_000)
@@ -0,0 +1,48 @@
+from django.test import SimpleTestCase, override_settings
+
+from ..conf import InstrumentationConfig
+
+
+class ConfigSnapshotTestCase(SimpleTestCase):
+    """Test cases for the precomputed configuration snapshot."""
+
+    def test_snapshot_is_reused(self) -> None:
+        """Test that the settings are only read once while they're unchanged."""
+        cfg = InstrumentationConfig()
+        self.assertIs(cfg.snapshot, cfg.snapshot)
+
+    def test_snapshot_is_rebuilt_when_setting_changes(self) -> None:
+        """Test that changing THELAB_INSTRUMENTATION invalidates the snapshot."""
+        cfg = InstrumentationConfig()
+        with override_settings(THELAB_INSTRUMENTATION={"UPDATE_INTERVAL": 1}):
+            self.assertEqual(cfg.update_interval, 1)
+            with override_settings(THELAB_INSTRUMENTATION={"UPDATE_INTERVAL": 2}):
+                self.assertEqual(cfg.update_interval, 2)
+            self.assertEqual(cfg.update_interval, 1)
+
+    @override_settings(
+        THELAB_INSTRUMENTATION={
+            "DIMENSIONS": {"Environment": "test"},
+            "OUTGOING_HTTP_EXCLUDE_HOSTS": ["a.example.com", "b.example.com"],
+        }
+    )
+    def test_snapshot_is_immutable(self) -> None:
+        """Test that shared configuration can't be modified by callers."""
+        cfg = InstrumentationConfig()
+        self.assertEqual(cfg.dimensions, {"Environment": "test"})
+        with self.assertRaises(TypeError):
+            cfg.dimensions["Environment"] = "prod"  # type: ignore[index]
+        self.assertEqual(
+            cfg.outgoing_http_exclude_hosts,
+            frozenset({"a.example.com", "b.example.com"}),
+        )
+
+    @override_settings(
+        THELAB_INSTRUMENTATION={"STRUCTLOG_REQUEST_HEADERS": {"x-request-id": "rid"}}
+    )
+    def test_structlog_request_meta_keys(self) -> None:
+        """Test that header names are precomputed as request.META keys."""
+        cfg = InstrumentationConfig()
+        self.assertEqual(
+            cfg.snapshot.structlog_request_meta_keys, (("HTTP_X_REQUEST_ID", "rid"),)
+        )
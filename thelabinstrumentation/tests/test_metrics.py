@@ -0,0 +1,196 @@
+from unittest import TestCase
+from unittest.mock import Mock, patch
+import threading
+
+from .. import metrics
+from ..metrics import (
+    Counter,
+    Gauge,
+    MetricsRegistry,
+    RegistryFlushThread,
+    Timer,
+    counter,
+    ensure_flush_thread_running,
+)
+from .utils import RecordingBackend
+
+
+class MetricsRegistryTestCase(TestCase):
+    """Test cases for the in-process metrics registry."""
+
+    def setUp(self) -> None:
+        self.registry = MetricsRegistry()
+        self.backend = RecordingBackend()
+
+    def test_metrics_are_cached_by_name_and_dimensions(self) -> None:
+        """Test that the same name and dimensions return the same object."""
+        a = self.registry.counter("requests", {"a": "1", "b": "2"})
+        b = self.registry.counter("requests", {"b": "2", "a": "1"})
+        c = self.registry.counter("requests", {"a": "2"})
+        self.assertIs(a, b)
+        self.assertIsNot(a, c)
+        self.assertIsInstance(a, Counter)
+        self.assertIsNot(
+            self.registry.gauge("requests"), self.registry.counter("requests")
+        )
+
+    def test_counter_publishes_delta(self) -> None:
+        """Test that counters publish the increase since the last flush."""
+        requests = self.registry.counter("requests", {"View": "home"})
+        requests.inc()
+        requests.inc(2)
+        self.registry.flush(self.backend)
+        requests.inc()
+        self.registry.flush(self.backend)
+        self.registry.flush(self.backend)
+        self.assertEqual(
+            self.backend.metrics,
+            [
+                {
+                    "name": "requests",
+                    "value": 3,
+                    "unit": "Count",
+                    "dimensions": {"View": "home"},
+                },
+                {
+                    "name": "requests",
+                    "value": 1,
+                    "unit": "Count",
+                    "dimensions": {"View": "home"},
+                },
+            ],
+        )
+
+    def test_counter_is_exact_across_threads(self) -> None:
+        """Test that concurrent increments from many threads aren't lost."""
+        requests = self.registry.counter("requests")
+
+        def work() -> None:
+            for _ in range(10_000):
+                requests.inc()
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(requests.value, 80_000)
+        self.registry.flush(self.backend)
+        self.assertEqual(self.backend.metrics[0]["value"], 80_000)
+
+    def test_gauge_publishes_last_value(self) -> None:
+        """Test that gauges publish their latest value on every flush."""
+        size = self.registry.gauge("pool.size", unit="Count")
+        self.assertIsInstance(size, Gauge)
+        self.registry.flush(self.backend)
+        self.assertEqual(self.backend.metrics, [])
+        size.set(4)
+        size.set(5)
+        self.registry.flush(self.backend)
+        self.registry.flush(self.backend)
+        self.assertEqual([m["value"] for m in self.backend.metrics], [5, 5])
+        self.assertEqual(self.backend.metrics[0]["unit"], "Count")
+
+    def test_timer_publishes_histogram(self) -> None:
+        """Test that timers publish the durations recorded since the last flush."""
+        latency = self.registry.timer("latency", {"View": "home"})
+        self.assertIsInstance(latency, Timer)
+        latency.record(10)
+        latency.record(20)
+        with latency.time():
+            pass
+        self.registry.flush(self.backend)
+        self.registry.flush(self.backend)
+        (data,) = self.backend.histograms
+        self.assertEqual(data["name"], "latency")
+        self.assertEqual(data["unit"], "Milliseconds")
+        self.assertEqual(data["dimensions"], {"View": "home"})
+        self.assertEqual(data["histogram"].count, 3)
+        self.assertEqual(data["histogram"].max, 20)
+
+    def test_after_fork_drops_parent_values(self) -> None:
+        """Test that a forked child only publishes what it recorded itself."""
+        self.registry.counter("requests").inc(3)
+        self.registry.timer("latency").record(5)
+        self.registry._after_fork()
+        self.registry.counter("requests").inc()
+        self.registry.flush(self.backend)
+        self.assertEqual([m["value"] for m in self.backend.metrics], [1])
+        self.assertEqual(self.backend.histograms, [])
+
+    def test_flush_without_data_skips_backend(self) -> None:
+        """Test that an idle registry doesn't build or call a backend."""
+        self.registry.counter("requests")
+        with patch("thelabinstrumentation.metrics.get_backend") as mock_get_backend:
+            self.registry.flush()
+        mock_get_backend.assert_not_called()
+
+
+class RegistryFlushThreadTestCase(TestCase):
+    """Test cases for the background registry flusher."""
+
+    def test_run_flushes_periodically(self) -> None:
+        """Test that the thread flushes the registry after each interval."""
+        registry = MetricsRegistry()
+        backend = RecordingBackend()
+        registry.counter("requests").inc()
+        thread = RegistryFlushThread(registry)
+        calls = 0
+
+        def wait(periods: int = 1) -> bool:
+            nonlocal calls
+            calls += 1
+            if calls == 2:
+                registry.counter("requests").inc()
+            return calls < 3
+
+        with (
+            patch("thelabinstrumentation.metrics.get_backend", return_value=backend),
+            patch.object(thread.scheduler, "wait", side_effect=wait),
+        ):
+            thread.run()
+        self.assertEqual([m["value"] for m in backend.metrics], [1, 1])
+
+    def test_backend_is_created_lazily(self) -> None:
+        """Test that the backend isn't built before there's anything to flush."""
+        registry = MetricsRegistry()
+        thread = RegistryFlushThread(registry)
+        with (
+            patch("thelabinstrumentation.metrics.get_backend") as mock_get_backend,
+            patch.object(thread.scheduler, "wait", side_effect=[True, False]),
+        ):
+            thread.run()
+        mock_get_backend.assert_not_called()
+
+    def test_no_flusher_in_work_horse(self) -> None:
+        """Test that RQ work horses never start a flusher."""
+        self.addCleanup(setattr, metrics, "_work_horse", False)
+        with (
+            patch("thelabinstrumentation.metrics._flush_thread", Mock()),
+            patch("thelabinstrumentation.metrics._forking_work_horse", True),
+            patch.object(RegistryFlushThread, "start") as mock_start,
+        ):
+            metrics._restart_after_fork()
+            self.assertIsNone(metrics._flush_thread)
+            counter("tests.requests")
+            self.assertIsNone(ensure_flush_thread_running())
+        mock_start.assert_not_called()
+
+    def test_stop(self) -> None:
+        """Test that stopping wakes the thread and joins it."""
+        thread = RegistryFlushThread(MetricsRegistry())
+        thread.start()
+        thread.stop(timeout=5)
+        self.assertFalse(thread.is_alive())
+
+    def test_module_helpers_start_flush_thread(self) -> None:
+        """Test that the default registry's helpers start a single flusher."""
+        with patch("thelabinstrumentation.metrics._flush_thread", None):
+            with (
+                patch.object(RegistryFlushThread, "start") as mock_start,
+                patch.object(RegistryFlushThread, "is_alive", return_value=True),
+            ):
+                counter("tests.requests")
+                thread = ensure_flush_thread_running()
+            mock_start.assert_called_once()
+            self.assertIsInstance(thread, RegistryFlushThread)
@@ -0,0 +1,74 @@
+from unittest import TestCase
+from unittest.mock import patch
+import threading
+
+from ..scheduling import IntervalScheduler
+
+# A wall-clock time which is a multiple of 60 seconds.
+BOUNDARY = 60 * 16_667
+
+
+class IntervalSchedulerTestCase(TestCase):
+    """Test cases for the wall-clock aligned interval scheduler."""
+
+    def _wait(
+        self, scheduler: IntervalScheduler, now: float, periods: int = 1
+    ) -> float:
+        """Call ``wait`` at the given wall-clock time and return its timeout."""
+        with (
+            patch("thelabinstrumentation.scheduling.time.time", return_value=now),
+            patch.object(
+                scheduler._stop_event, "wait", return_value=False
+            ) as mock_wait,
+        ):
+            self.assertTrue(scheduler.wait(periods))
+        return mock_wait.call_args.args[0]  # type: ignore[no-any-return]
+
+    def test_waits_until_next_boundary(self) -> None:
+        """Test that the sleep ends on the next multiple of the interval."""
+        scheduler = IntervalScheduler(60)
+        self.assertAlmostEqual(self._wait(scheduler, BOUNDARY + 12.5), 47.5)
+        self.assertAlmostEqual(self._wait(scheduler, BOUNDARY + 80), 40.0)
+
+    def test_early_wakeup_does_not_repeat_boundary(self) -> None:
+        """Test that waking just before a boundary waits for the one after it."""
+        scheduler = IntervalScheduler(60)
+        self._wait(scheduler, BOUNDARY + 12.5)
+        self.assertAlmostEqual(self._wait(scheduler, BOUNDARY + 59.5), 60.5)
+
+    def test_backoff_periods(self) -> None:
+        """Test that waiting several periods skips intermediate boundaries."""
+        scheduler = IntervalScheduler(60)
+        self.assertAlmostEqual(self._wait(scheduler, BOUNDARY + 12.5, periods=3), 167.5)
+
+    def test_skips_ahead_on_overrun(self) -> None:
+        """Test that boundaries missed by slow work are skipped, not caught up."""
+        scheduler = IntervalScheduler(60)
+        self._wait(scheduler, BOUNDARY + 12.5)
+        # The work after waking at BOUNDARY + 60 ran past BOUNDARY + 120.
+        self.assertAlmostEqual(self._wait(scheduler, BOUNDARY + 150), 30.0)
+        self.assertEqual(scheduler.skipped, 1)
+
+    def test_jitter_offsets_boundaries(self) -> None:
+        """Test that jitter shifts every boundary by the same fixed offset."""
+        with patch("thelabinstrumentation.scheduling.random.uniform", return_value=7):
+            scheduler = IntervalScheduler(60, jitter=10)
+        self.assertEqual(scheduler.offset, 7)
+        self.assertAlmostEqual(self._wait(scheduler, BOUNDARY + 12.5), 54.5)
+        self.assertAlmostEqual(self._wait(scheduler, BOUNDARY + 97), 30.0)
+
+    def test_stop_wakes_waiter(self) -> None:
+        """Test that stopping interrupts a pending wait."""
+        scheduler = IntervalScheduler(3600)
+        results: list[bool] = []
+        thread = threading.Thread(target=lambda: results.append(scheduler.wait()))
+        thread.start()
+        scheduler.stop()
+        thread.join(5)
+        self.assertEqual(results, [False])
+        self.assertFalse(scheduler.wait())
+
+    def test_invalid_interval(self) -> None:
+        """Test that a non-positive interval is rejected."""
+        with self.assertRaises(ValueError):
+            IntervalScheduler(0)
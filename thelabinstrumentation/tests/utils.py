@@ -0,0 +1,32 @@
+"""Helpers shared by the test modules."""
+
+import threading
+
+from ..backends.base import HistogramData, MetricData, MetricsBackend
+
+
+class RecordingBackend(MetricsBackend):
+    """Backend which records every batch it is sent."""
+
+    def __init__(self) -> None:
+        self.batches: list[list[MetricData]] = []
+        self.histograms: list[HistogramData] = []
+        # Set whenever anything is sent, for tests of background senders.
+        self.received = threading.Event()
+
+    @property
+    def metrics(self) -> list[MetricData]:
+        """Every metric sent, across batches."""
+        return [metric for batch in self.batches for metric in batch]
+
+    @property
+    def values(self) -> list[float]:
+        return [metric["value"] for metric in self.metrics]
+
+    def send_metrics(self, metrics: list[MetricData]) -> None:
+        self.batches.append(metrics)
+        self.received.set()
+
+    def send_histograms(self, histograms: list[HistogramData]) -> None:
+        self.histograms += histograms
+        self.received.set()